@@ -201,6 +201,31 @@ ENCLOSED = 2
 # Method on object
 METHOD = 4
 
+# Hook id of the handshake to intern a function handle
+# Note that negative integers are hook ids, positive integers are interned handles
+HANDSHAKE = -3
+
+# Hook id of the command timing logger
+TIMING = -4
+
+
+def payload_size(obj, depth=2):
+    """
+    Estimate the number of bytes of the arguments or return value of a gui call.
+
+    Only arrays, bytes and strings are counted, containers are followed
+    up to depth levels deep.
+    """
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    elif isinstance(obj, (bytes, bytearray, memoryview, str)):
+        return len(obj)
+    elif depth > 0 and isinstance(obj, (list, tuple)):
+        return sum(payload_size(item, depth - 1) for item in obj)
+    elif depth > 0 and isinstance(obj, dict):
+        return sum(payload_size(item, depth - 1) for item in obj.values())
+    return 0
+
                                
 class GuiProxy(object):    
     """
@@ -225,8 +250,24 @@ class GuiProxy(object):
         self.reg_obj = dict()
         self.proxies = dict()
         
+        # Interned function handles
+        # handles: handle -> [func, refcount or None, key]
+        self.handles = dict()
+        self.handle_keys = dict()
+        self.handle_lock = threading.Lock()
+        self.handle_count = 0
+        
+        # Handles as interned by the proxy at the other side of the queues
+        self.remote_handles = dict()
+        
+        # Cache of decoded static functions
+        self.decoded = dict()
+        
         self.block = True
         self._qapp = qapp
+
+        # Estimated bytes passed to and from the gui by this proxy
+        self.ipc_bytes = 0
                 
         self.call_queue = master_call_queue
         self.return_queue = master_return_queue     
@@ -286,25 +327,123 @@ class GuiProxy(object):
             self.reg_obj.pop(key)
         return func_id
 
+    def register_handle(self, func, key, counted=False):
+        """
+        Register a callable and return a small integer handle to it.
+        A callable with the same key is only registered once.
+        
+        :param func: The callable
+        :param key: Hashable key identifying the callable
+        :param bool counted: Release the handle after it is retrieved
+            as many times as it was registered.
+            Otherwise it lives as long as this proxy.
+        :returns: The handle
+        :rtype: int
+        """
+        with self.handle_lock:
+            handle = self.handle_keys.get(key)
+            
+            if handle is None:
+                self.handle_count += 1
+                handle = self.handle_count
+                self.handles[handle] = [func, 1 if counted else None, key]
+                self.handle_keys[key] = handle
+                
+            elif counted:
+                self.handles[handle][1] += 1
+                
+        return handle
+        
+    def retrieve_handle(self, handle):
+        with self.handle_lock:
+            entry = self.handles[handle]
+            func, count, key = entry
+            
+            if count == 1:
+                self.handles.pop(handle)
+                self.handle_keys.pop(key)
+                
+            elif not count is None:
+                entry[1] -= 1
+                
+        return func
+        
+    def define_handle(self, func_id):
+        """
+        Handshake requested by the proxy at the other side of the queues.
+        Decode the static function once and return the handle to use for it.
+        
+        :meta private:
+        """
+        try:
+            func = self.decode_func(func_id)
+            
+        except Exception:
+            logger.exception(f'Could not intern {func_id}')
+            return None
+            
+        return self.register_handle(func, func_id)
+        
+    def intern_func(self, func):
+        """
+        Encode a function to the handle as interned by the other side of the queues.
+        Only the first call of every static function does the handshake.
+        
+        :meta private:
+        """
+        if not isinstance(func, (types.FunctionType, type)) \
+                or not getattr(func, '__closure__', None) is None:
+            return self.encode_func(func)
+            
+        handle = self.remote_handles.get(func)
+        
+        if handle is None:
+            func_id = self.encode_func(func)
+            self.call_queue.put((True, HANDSHAKE, (func_id,), {}))
+            handle = self.return_queue.get()
+            
+            if handle is None:
+                #The other side could not decode it
+                return func_id
+                
+            self.remote_handles[func] = handle
+            
+        return handle
+
     def is_main(self):
         return (not self._qapp is None and threading.currentThread().name == 'MainThread')
 
     def encode_func(self, func, register=False):
+        """
+        Encode a function to be passed through a queue.
+        
+        :param func: The function or method
+        :param bool register: The function is registered to a handle which
+            is released after it is decoded by this proxy.
+            Typically used for callbacks.
+        """
         if isinstance(func, (int, tuple)):
             #It is already encoded
             func_id = func
             
+        elif register and isinstance(func, types.MethodType):
+            #The bound method object is kept by the registry, so the id stays valid
+            func_id = self.register_handle(func, (func.__func__, id(func.__self__)), counted=True)
+            
+        elif register and isinstance(func, (types.FunctionType, type)):
+            func_id = self.register_handle(func, func, counted=True)
+            
         elif isinstance(func, (types.FunctionType, type)):                 
             module = func.__module__
             qualname = func.__qualname__        
             
-            if func.__closure__ is None:
+            if getattr(func, '__closure__', None) is None:
                 func_id = STATIC, module, qualname
             else:
                 closere_id = self.register_object(func.__closure__)
                 func_id = ENCLOSED, module, qualname, closere_id            
             
-        elif isinstance(func, (types.MethodType, type)):                 
+        elif isinstance(func, types.MethodType):                 
             module = func.__module__
             qualname = func.__qualname__
             self_key = self.register_object(func.__self__)
@@ -312,45 +451,60 @@ class GuiProxy(object):
             
         else:
             raise AttributeError(f'Type of {func} is not valid')
-            func_id = func.__name__            
                    
         return func_id
             
     def decode_func(self, func_id):        
         if isinstance(func_id, int):
-            #For some limit cases, this a a quicker decoding
-            #Used for stdout flushing and process_ready
-            func = self.hooks[func_id] 
-                
-        elif isinstance(func_id, tuple):
-            lib = importlib.import_module(func_id[1])            
-            attrs = func_id[2]
-            parts = attrs.split('.')
+            if func_id < 0:
+                #For some limit cases, this a a quicker decoding
+                #Used for stdout flushing and process_ready
+                func = self.hooks[func_id] 
                 
-            if func_id[0] in [STATIC, ENCLOSED]:
-                tmp = lib
-                closure = None if func_id[0] == STATIC else self.retrieve_object(func_id[3])
-                for i, attr in enumerate(parts):
-                    if attr == '<locals>':
-                        tmp = find_nested_func(tmp, parts[i+1], lib.__dict__, closure)
-                        break
-                    else:
-                        tmp = getattr(tmp, attr)
+            else:
+                func = self.retrieve_handle(func_id)
                 
-                func = tmp                             
+        elif isinstance(func_id, tuple):
+            if func_id[0] == STATIC:
+                func = self.decoded.get(func_id)
                 
-            elif func_id[0] == METHOD:
-                obj = self.retrieve_object(func_id[3])
-                tmp = lib                
-                for i, attr in enumerate(parts):
-                    tmp = getattr(tmp, attr)                    
-                func = types.MethodType(tmp, obj)                                   
+                if func is None:
+                    func = self.decoded[func_id] = self.decode_func_id(func_id)
+                    
+            else:
+                func = self.decode_func_id(func_id)
                 
         else:
             #already decoded, was not encoded
             func = func_id                             
                 
         return func    
+        
+    def decode_func_id(self, func_id):
+        lib = importlib.import_module(func_id[1])            
+        attrs = func_id[2]
+        parts = attrs.split('.')
+            
+        if func_id[0] in [STATIC, ENCLOSED]:
+            tmp = lib
+            closure = None if func_id[0] == STATIC else self.retrieve_object(func_id[3])
+            for i, attr in enumerate(parts):
+                if attr == '<locals>':
+                    tmp = find_nested_func(tmp, parts[i+1], lib.__dict__, closure)
+                    break
+                else:
+                    tmp = getattr(tmp, attr)
+            
+            func = tmp                             
+            
+        elif func_id[0] == METHOD:
+            obj = self.retrieve_object(func_id[3])
+            tmp = lib                
+            for i, attr in enumerate(parts):
+                tmp = getattr(tmp, attr)                    
+            func = types.MethodType(tmp, obj)                                   
+            
+        return func
 
     def gui_call(self, func, *args, **kwargs):
         if self.is_main():
@@ -367,20 +521,30 @@ class GuiProxy(object):
         return self._call_base(False, func, *args, **kwargs)
             
     def _call_base(self, wait, func, *args, **kwargs):                    
+        if args or kwargs:
+            self.ipc_bytes += payload_size(args) + payload_size(kwargs)
+            
         if self.call_queue is None:
             #Multi Threading Child
             #Direct handover to eventloop
             func = self.decode_func(func)
-            return self._qapp.handover.send(wait, func, *args, **kwargs)
+            value = self._qapp.handover.send(wait, func, *args, **kwargs)
+            if wait:
+                self.ipc_bytes += payload_size(value)
+            return value
             
         else:
             #Multi Processing Child
             #Handover to Gui Process                
-            func = self.encode_func(func)
+            if self._qapp is None:
+                func = self.intern_func(func)
+            else:
+                func = self.encode_func(func)
                 
             if wait:
                 self.call_queue.put((True, func, args, kwargs))
                 value = self.return_queue.get()
+                self.ipc_bytes += payload_size(value)
                 return value
                 
             else:
@@ -396,8 +560,14 @@ class GuiProxy(object):
         """
         while True:
             backval, func, args, kwargs = self.call_queue.get()
-            func = self.decode_func(func)
-            value = self._qapp.handover.send(True, func, *args, **kwargs)
+            
+            if func == HANDSHAKE:
+                value = self.define_handle(*args)
+                
+            else:
+                func = self.decode_func(func)
+                value = self._qapp.handover.send(True, func, *args, **kwargs)
+                
             if backval:
                 self.return_queue.put(value)                     
     
@@ -524,6 +694,45 @@ class GuiProxy(object):
         """
         return gui.qapp.history.tail(count)     
 
+    @StaticGuiCall 
+    def _history_timing(pattern='%', since=None, count=None):
+        return gui.qapp.history.timing(pattern, since, count)
+
+    def history_timing(self, pattern='%', since=None, count=None, plot=True):
+        """
+        The logged wall time, cpu time, peak memory increase and gui traffic
+        of the executed commands matching a pattern.
+
+        Usage:
+
+            gui.history_timing('%process_day%')
+            gui.history_timing('%process_day%', since='2024-01-01', plot=False)
+
+        :param str pattern: SQL LIKE pattern on the command text, % is the wildcard
+        :param str since: Only from this time on, example '2024-01-31'
+        :param int count: Only the last count entries
+        :param bool plot: Plot the wall and cpu time against the time of execution
+        :returns: List of (time, cmd, wall, cpu, peak_rss, ipc_bytes, error_code)
+        """
+        rows = self._history_timing(pattern, since, count)
+
+        if plot and rows:
+            from datetime import datetime
+            import matplotlib.pyplot as plt
+
+            moments = [datetime.strptime(row[0], '%Y-%m-%d %H:%M:%S') for row in rows]
+            plt.figure()
+            plt.plot(moments, [row[2] for row in rows], '.-', label='wall')
+            plt.plot(moments, [row[3] for row in rows], '.-', label='cpu')
+            plt.title(f'Timing of {pattern}')
+            plt.ylabel('Time [s]')
+            plt.legend()
+            plt.grid(True)
+            plt.gcf().autofmt_xdate()
+            plt.show()
+
+        return rows
+
     @StaticGuiCall 
     def push(obj):
         """
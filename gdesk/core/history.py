@@ -1,8 +1,10 @@
 import sys
 import sqlite3
 import time
+import queue
 import shutil
 import logging
+import threading
 from pathlib import Path
 
 if sys.platform == 'win32':
@@ -20,6 +22,11 @@ from .conf import config
 
 logger = logging.getLogger()
 
+
+def history_config(key, default):
+    return config.get('console', {}).get(f'history_{key}', default)
+
+
 class LogDir(object):
 
     def __init__(self, rootpath):
@@ -113,7 +120,20 @@ class LogDir(object):
         return logpath, priorlogpath
 
 class History(object):
+    """
+    The history of commands, opened paths and command timing in a sqlite database.
+
+    With a database file, the writes are queued to a background thread which
+    commits them in batches. The database is in WAL mode, so the reads
+    are not blocked by the writer. A read first waits for the queued writes.
+    Old entries are removed automatically, see compact.
+    """
+
     def __init__(self, logdir):
+        self.writer = None
+        self.write_queue = queue.Queue()
+        self.write_count = 0
+        self.fts = False
         self.init_server(logdir)
         
     def init_server(self, logdir=None):
@@ -127,11 +147,123 @@ class History(object):
                 logdir.mkdir(parents=True)                
             logdir = logdir.absolute()
             self.server_file = logdir / 'ghhist.db'
-            #Python 3.6 doesn't understand Path
-            self.server = sqlite3.connect(str(self.server_file))
+            self.server = self.connect()
+            journal_mode = self.server.execute(f'PRAGMA journal_mode={history_config("journal_mode", "wal")}').fetchone()[0]
+            logger.debug(f'History journal mode: {journal_mode}')
             self.define_tables()
+            self.start_writer()
+
+        self.compact()
+
+    def connect(self):
+        #Python 3.6 doesn't understand Path
+        server = sqlite3.connect(str(self.server_file), timeout=30)
+        server.execute('PRAGMA synchronous=NORMAL')
+        return server
+
+    def start_writer(self):
+        self.writer = threading.Thread(target=self.write_loop, name='HistoryWriter', daemon=True)
+        self.writer.start()
+
+    def close(self):
+        """Commit the queued writes and stop the writer."""
+        if self.writer is None:
+            return
+        self.write_queue.put(None)
+        self.writer.join()
+        self.writer = None
+
+    def write_loop(self):
+        server = self.connect()
+        stop = False
+
+        while not stop:
+            batch = [self.write_queue.get()]
+            while len(batch) < 1000:
+                try:
+                    batch.append(self.write_queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                for item in batch:
+                    if item is None:
+                        stop = True
+                    elif callable(item):
+                        #Runs outside the transaction, it can vacuum
+                        server.commit()
+                        item(server)
+                    else:
+                        for query, parameters in item:
+                            server.execute(query, parameters)
+                server.commit()
+
+            except sqlite3.Error:
+                logger.exception('Writing to the command history failed')
+                server.rollback()
+
+            finally:
+                for item in batch:
+                    self.write_queue.task_done()
+
+        server.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        server.close()
+
+    def write(self, *statements):
+        """
+        Execute and commit the statements in one transaction.
+        In the writer thread if there is one.
+
+        :param statements: (query, parameters) tuples
+        """
+        if self.writer is None:
+            with self.server:
+                for query, parameters in statements:
+                    self.server.execute(query, parameters)
+        else:
+            self.write_queue.put(statements)
+
+        self.write_count += 1
+        if self.write_count % history_config('compact_interval', 1000) == 0:
+            self.compact()
+
+    def sync(self):
+        """Wait until the queued writes are committed."""
+        if self.writer is not None:
+            self.write_queue.join()
+
+    def compact(self, keep_commands=None, keep_paths=None, vacuum=False):
+        """
+        Remove the oldest entries.
+
+        Is done at start and every console/history_compact_interval writes.
+
+        :param int keep_commands: Number of commands and command timings to keep,
+            default is console/history_keep_commands
+        :param int keep_paths: Number of paths per category to keep,
+            default is console/history_keep_paths
+        :param bool vacuum: Also shrink the database file
+        """
+        keep_commands = history_config('keep_commands', 100000) if keep_commands is None else keep_commands
+        keep_paths = history_config('keep_paths', 200) if keep_paths is None else keep_paths
+
+        def compact(server):
+            with server:
+                for table in ['CMDHIST', 'CMDTIMING']:
+                    server.execute(f'DELETE FROM {table} WHERE ID <= (SELECT ID FROM {table} ORDER BY ID DESC LIMIT 1 OFFSET ?)', (keep_commands,))
+                server.execute("""DELETE FROM PATHHIST WHERE ID IN (SELECT ID FROM (
+SELECT ID, ROW_NUMBER() OVER (PARTITION BY CATEGORY ORDER BY ID DESC) AS N FROM PATHHIST) WHERE N > ?)""", (keep_paths,))
+            if vacuum:
+                server.execute('VACUUM')
+            server.execute('PRAGMA optimize')
+
+        if self.writer is None:
+            compact(self.server)
+        else:
+            self.write_queue.put(compact)
             
     def import_command_history(self, other_logfile):  
+        self.sync()
         self.server.execute('ATTACH [%s] as OTHERDB' % str(other_logfile))
         q = 'INSERT INTO CMDHIST (TIME, CMD) SELECT TIME, CMD FROM [OTHERDB].[CMDHIST]'
         self.server.execute(q)
@@ -147,12 +279,45 @@ ID INTEGER PRIMARY KEY, TIME TEXT, CMD TEXT, LOGTYPE TEXT)"""
 ID INTEGER PRIMARY KEY, CATEGORY TEXT, TIME TEXT, PATH TEXT)"""
         self.server.execute(query)   
 
+        query = """CREATE TABLE IF NOT EXISTS CMDTIMING (
+ID INTEGER PRIMARY KEY, TIME TEXT, CMD TEXT, WALL REAL, CPU REAL, PEAK_RSS INTEGER, IPC_BYTES INTEGER, ERROR_CODE INTEGER)"""
+        self.server.execute(query)
+
         self.add_logtype_if_not_exists()
-            
+
+        self.server.execute('CREATE INDEX IF NOT EXISTS CMDHIST_CMD ON CMDHIST (CMD, ID)')
+        self.server.execute('CREATE INDEX IF NOT EXISTS CMDHIST_LOGTYPE ON CMDHIST (LOGTYPE, ID)')
+        self.server.execute('CREATE INDEX IF NOT EXISTS PATHHIST_PATH ON PATHHIST (PATH)')
+        self.server.execute('CREATE INDEX IF NOT EXISTS PATHHIST_CATEGORY ON PATHHIST (CATEGORY, ID)')
+
+        self.define_fts()
+        self.server.commit()
+
+    def define_fts(self):
+        """Substring search on the commands with a FTS5 trigram index, if available."""
+        exists = next(self.execfetch("SELECT COUNT(*) FROM sqlite_master WHERE NAME = 'CMDFTS'", sync=False))[0] > 0
+
+        try:
+            self.server.execute("""CREATE VIRTUAL TABLE IF NOT EXISTS CMDFTS USING fts5(
+CMD, content='CMDHIST', content_rowid='ID', tokenize='trigram')""")
+        except sqlite3.OperationalError:
+            logger.info('No sqlite FTS5 trigram tokenizer, command history searched without index')
+            self.fts = False
+            return
+
+        self.server.execute("""CREATE TRIGGER IF NOT EXISTS CMDHIST_INSERT AFTER INSERT ON CMDHIST BEGIN
+INSERT INTO CMDFTS (rowid, CMD) VALUES (new.ID, new.CMD); END""")
+        self.server.execute("""CREATE TRIGGER IF NOT EXISTS CMDHIST_DELETE AFTER DELETE ON CMDHIST BEGIN
+INSERT INTO CMDFTS (CMDFTS, rowid, CMD) VALUES ('delete', old.ID, old.CMD); END""")
+
+        if not exists:
+            self.server.execute("INSERT INTO CMDFTS (CMDFTS) VALUES ('rebuild')")
+
+        self.fts = True
             
     def add_logtype_if_not_exists(self):
         
-        for row in self.execfetch('PRAGMA table_info(CMDHIST)'):
+        for row in self.execfetch('PRAGMA table_info(CMDHIST)', sync=False):
             rid, name, *others = row
             if name == 'LOGTYPE':
                 return
@@ -163,7 +328,9 @@ ADD COLUMN LOGTYPE TEXT"""
         self.server.execute(query)
 
             
-    def execfetch(self, query, parameters=()):        
+    def execfetch(self, query, parameters=(), sync=True):        
+        if sync:
+            self.sync()
         cur = self.server.cursor()
         cur.execute(query, parameters)
         row = cur.fetchone()
@@ -174,27 +341,53 @@ ADD COLUMN LOGTYPE TEXT"""
     def logcmd(self, cmd, logtype='cmd'):
         now = time.strftime('%Y-%m-%d %H:%M:%S')
         query = "INSERT INTO CMDHIST (TIME, CMD, LOGTYPE) VALUES (?, ?, ?)"
-        self.server.execute(query, (now, cmd, logtype))
-        self.server.commit()
+        self.write((query, (now, cmd, logtype)))
         self.skip = -1
-        rowid = None
-        for col in self.execfetch("SELECT last_insert_rowid()"):
-            rowid = col[0]
-        return rowid
          
+    def logtiming(self, timing):
+        """
+        Log the resources used by an executed command.
+
+        :param dict timing: With the keys cmd, wall, cpu, peak_rss, ipc_bytes and error_code
+        """
+        now = time.strftime('%Y-%m-%d %H:%M:%S')
+        query = "INSERT INTO CMDTIMING (TIME, CMD, WALL, CPU, PEAK_RSS, IPC_BYTES, ERROR_CODE) VALUES (?, ?, ?, ?, ?, ?, ?)"
+        self.write((query, (now, timing['cmd'], timing['wall'], timing['cpu'],
+            timing['peak_rss'], timing['ipc_bytes'], timing['error_code'])))
+
+    def timing(self, pattern='%', since=None, count=None):
+        """
+        The logged timing of the commands matching a pattern, oldest first.
+
+        :param str pattern: SQL LIKE pattern on the command text
+        :param str since: Only from this time on, example '2024-01-31'
+        :param int count: Only the last count entries
+        :returns: List of (time, cmd, wall, cpu, peak_rss, ipc_bytes, error_code)
+        """
+        query = "SELECT TIME, CMD, WALL, CPU, PEAK_RSS, IPC_BYTES, ERROR_CODE FROM CMDTIMING WHERE CMD LIKE ?"
+        parameters = [pattern]
+
+        if not since is None:
+            query += " AND TIME >= ?"
+            parameters.append(since)
+
+        query += " ORDER BY ID DESC"
+
+        if not count is None:
+            query += " LIMIT ?"
+            parameters.append(count)
+
+        return list(self.execfetch(query, parameters))[::-1]
+
     def storepath(self, path, delete_old_entry=True, category='image'):
+        statements = []
         if delete_old_entry:
-            self.server.execute("DELETE FROM PATHHIST WHERE PATH = ?", (path,))        
+            statements.append(("DELETE FROM PATHHIST WHERE PATH = ?", (path,)))
             
         now = time.strftime('%Y-%m-%d %H:%M:%S')
         query = "INSERT INTO PATHHIST (CATEGORY, TIME, PATH) VALUES (?, ?, ?)\n"
-        self.server.execute(query, (category, now, path,))
-        self.server.commit()
-
-        rowid = None
-        for col in self.execfetch("SELECT last_insert_rowid()"):
-            rowid = col[0]
-        return rowid      
+        statements.append((query, (category, now, path,)))
+        self.write(*statements)
 
     def yield_recent_paths(self, count=20, category='image'):        
         for row in self.execfetch("SELECT ID, TIME, PATH FROM PATHHIST WHERE CATEGORY = ? ORDER BY ID DESC LIMIT ?", (category, count)):
@@ -203,9 +396,9 @@ ADD COLUMN LOGTYPE TEXT"""
         
     def retrievecmd(self, part='', from_id=None, distinct=True, back=True, prefix=True, logtype='cmd'):        
             
-        query = self.make_retrieve_query(1, part, from_id, distinct, back, prefix, logtype)
+        query, parameters = self.make_retrieve_query(1, part, from_id, distinct, back, prefix, logtype)
         
-        for cmdid, cmd in self.execfetch(query):
+        for cmdid, cmd in self.execfetch(query, parameters):
             return cmdid, cmd
             
         return from_id, part
@@ -213,9 +406,9 @@ ADD COLUMN LOGTYPE TEXT"""
     def tail(self, count=20, part='', from_id=None, distinct=False, back=True, prefix=True, reverse=True, logtype='cmd'):
         cmds = []
         
-        query = self.make_retrieve_query(count, part, from_id, distinct, back, prefix, logtype)
+        query, parameters = self.make_retrieve_query(count, part, from_id, distinct, back, prefix, logtype)
             
-        for row in self.execfetch(query):
+        for row in self.execfetch(query, parameters):
             cmds.append(row)
             
         if reverse:
@@ -224,38 +417,60 @@ ADD COLUMN LOGTYPE TEXT"""
             return cmds
             
     def make_retrieve_query(self, count=20, part='', from_id=None, distinct=False, back=True, prefix=True, logtype='cmd'):
-    
+        """
+        Query for the commands before or after from_id.
+
+        :param bool distinct: Only the last occurrence of every command
+        :param bool prefix: Commands starting with part, case sensitive.
+            Otherwise commands containing part, case insensitive.
+        :returns: The query and its parameters
+        """
+        if logtype == 'cmd':
+            logtype_cond = "IFNULL(LOGTYPE, 'cmd') = 'cmd'"
+            logtype_params = []
+        else:
+            logtype_cond = "LOGTYPE = ?"
+            logtype_params = [logtype]
+
+        conditions = [logtype_cond]
+        parameters = list(logtype_params)
+
         if back:
             order = 'DESC'
             if not (from_id is None or from_id == 0):
-                rng = f" WHERE ID < {from_id}"
-            else:
-                rng = ''
+                conditions.append('ID < ?')
+                parameters.append(from_id)
         else:
             order = 'ASC'
             if not (from_id is None or from_id == 0):
-                rng = f" WHERE ID > {from_id}"            
-            else:
-                rng = ''
-                
-        if prefix:
-            wild = ''
-        else:
-            wild = '%'
-            
-        part = part.replace("'","''")
-        
-        if logtype == 'cmd':
-            logtype_cond = "(LOGTYPE = 'cmd' OR LOGTYPE IS NULL)"
+                conditions.append('ID > ?')
+                parameters.append(from_id)
+
+        if part == '':
+            pass
+
+        elif prefix:
+            #A range on the CMD index
+            conditions.append('CMD >= ? AND CMD < ?')
+            parameters.extend([part, part + '\U0010ffff'])
+
+        elif self.fts and len(part) >= 3 and not ('%' in part or '_' in part):
+            conditions.append('ID IN (SELECT rowid FROM CMDFTS WHERE CMDFTS MATCH ?)')
+            parameters.append('"' + part.replace('"', '""') + '"')
+
         else:
-            logtype_cond = f"LOGTYPE = '{logtype}'"
-            
+            conditions.append('CMD LIKE ?')
+            parameters.append(f'%{part}%')
+
         if distinct:
-            query = f"SELECT LASTID AS ID, CMD FROM (SELECT MAX(ID) AS LASTID, CMD FROM CMDHIST WHERE CMD LIKE '{wild}{part}%' AND {logtype_cond} GROUP BY CMD ORDER BY LASTID {order}){rng} LIMIT {count}"
-        else:
-            query = f"SELECT ID, CMD FROM (SELECT ID, CMD FROM CMDHIST WHERE CMD LIKE '{part}%'{rng} AND {logtype_cond} ORDER BY ID {order}){rng} LIMIT {count}"
+            #No later occurrence of the same command
+            conditions.append(f'NOT EXISTS (SELECT 1 FROM CMDHIST AS LATER WHERE LATER.CMD = CMDHIST.CMD AND LATER.ID > CMDHIST.ID AND {logtype_cond})')
+            parameters.extend(logtype_params)
 
-        return query
+        query = f"SELECT ID, CMD FROM CMDHIST WHERE {' AND '.join(conditions)} ORDER BY ID {order} LIMIT ?"
+        parameters.append(count)
+
+        return query, parameters
         
         
     def item_count(self):
@@ -263,11 +478,6 @@ ADD COLUMN LOGTYPE TEXT"""
         
         
     def delete_all_but_last(self, keep_count=100):
-        count = self.item_count()
-        keep_count = min(count, keep_count)
-        keep_id = next(self.execfetch(f'SELECT ID FROM CMDHIST ORDER BY ID DESC LIMIT {keep_count}, 1'))[0]
-        self.server.execute(f'DELETE FROM CMDHIST WHERE ID < {keep_id}')
-        self.server.execute('COMMIT')
-        self.server.execute('REINDEX CMDHIST')
-        self.server.execute('VACUUM')
-            
+        """Remove all but the last keep_count commands and shrink the database file."""
+        self.compact(keep_commands=keep_count, vacuum=True)
+        self.sync()
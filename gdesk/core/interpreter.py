@@ -20,10 +20,17 @@ from pathlib import Path
 
 import psutil
 
+try:
+    import resource
+except ImportError:
+    #Not available on Windows
+    resource = None
+
 from .conf import config
 from . import stdinout
 from .stdinout import ProcessStdInput
-from .gui_proxy import GuiProxy, GuiMap, gui
+from .sampler import StackSampler
+from .gui_proxy import GuiProxy, GuiMap, gui, TIMING
 
 logger = logging.getLogger(__file__)
 
@@ -31,6 +38,84 @@ class SyncBreaked(Exception):
     pass
     
 
+class SyncBreaker(object):
+    """
+    Raise SyncBreaked in a running command, at the start of a line.
+
+    Nothing is hooked until a break is requested. On Python 3.12+, line
+    events of sys.monitoring are enabled until the break is raised, once.
+    The except and finally blocks of the command, and the traceback
+    printing, run without being interrupted again. Code of this module is
+    not interrupted, so the interpreter can clean up.
+    On older versions, SyncBreaked is sent as an asynchronous exception,
+    which the interpreter checks periodically between bytecodes, not at
+    line boundaries.
+    """
+    tool_id = None
+    lock = threading.Lock()
+    pending = dict()
+
+    @classmethod
+    def available(cls):
+        return hasattr(sys, 'monitoring')
+
+    @classmethod
+    def request(cls, queue_interpreter):
+        if not cls.available():
+            queue_interpreter.break_sent = True
+            async_raise(queue_interpreter.thread_id, SyncBreaked)
+            return
+
+        monitoring = sys.monitoring
+
+        with cls.lock:
+            if cls.tool_id is None:
+                for tool_id in (3, 4, monitoring.PROFILER_ID, monitoring.OPTIMIZER_ID):
+                    if monitoring.get_tool(tool_id) is None:
+                        monitoring.use_tool_id(tool_id, 'gdesk sync break')
+                        monitoring.register_callback(tool_id, monitoring.events.LINE, cls.line_event)
+                        cls.tool_id = tool_id
+                        break
+                else:
+                    raise RuntimeError('No free sys.monitoring tool id')
+
+            cls.pending[queue_interpreter.thread_id] = queue_interpreter
+            #The lines disabled by a previous break have to report again
+            monitoring.restart_events()
+            monitoring.set_events(cls.tool_id, monitoring.events.LINE)
+
+    @classmethod
+    def cancel(cls, thread_id):
+        if not cls.pending:
+            return
+
+        with cls.lock:
+            cls.pending.pop(thread_id, None)
+            if not cls.pending:
+                sys.monitoring.set_events(cls.tool_id, 0)
+
+    @classmethod
+    def line_event(cls, code, line_number):
+        if code.co_filename == __file__:
+            return sys.monitoring.DISABLE
+
+        thread_id = threading.get_ident()
+        queue_interpreter = cls.pending.get(thread_id)
+        if queue_interpreter is None:
+            #Line events of other threads only while a break is pending
+            return None if cls.pending else sys.monitoring.DISABLE
+        if not queue_interpreter.breakable:
+            return
+
+        #One shot, the cleanup code of the command is not interrupted again
+        with cls.lock:
+            if cls.pending.pop(thread_id, None) is None:
+                return
+            if not cls.pending:
+                sys.monitoring.set_events(cls.tool_id, 0)
+        raise SyncBreaked('Breaked by sync break')
+    
+
 class QueueInterpreter(object):
     def __init__(self, shell, cqs, gui_proxy=None, console_id=None):
     
@@ -43,7 +128,6 @@ class QueueInterpreter(object):
         self.console_id = console_id
         
         self.enable_trace = config['console'].get('trace', False)
-        self.prevent_trace = config['console'].get('prevent_trace', False)
         self.clear_stdin_on_break = config['console'].get('clear_on_break', True)
         self.clear_stdin_on_errr = config['console'].get('clear_on_error', True)
         
@@ -51,12 +135,14 @@ class QueueInterpreter(object):
         self.break_sent = False
         self.stop = False
         self.timeit = False
+        self.log_timing = config['console'].get('log_timing', True)
         self.enable_inspect = False
         
         self.enable_profile = False
         self.profile_sortby = 'cumulative'
         
         self.control_thread = None
+        self.sampler = None
         
         if gui_proxy is None:        
             self.gui_proxy = GuiProxy(None, cqs.gui_call_queue, cqs.gui_return_queue)
@@ -134,16 +220,12 @@ class QueueInterpreter(object):
                 flowcode = self.execute()   
 
         finally:
+            self.stdout.close()
             self.unregister_thread()
             sys.__stdout__.write(f'Exiting command loop of thread {self.thread_id}\n')
             sys.__stdout__.flush()            
             
         
-    def system_tracer(self, *args):
-        if self.enable_trace and self.stop:
-            raise SyncBreaked('Breaked by system tracer')
-        return None
-        
     def get_current_trace(self, back=50):
         lines = ''
         for frame in self.interpreter.get_code_frames(back):        
@@ -227,12 +309,31 @@ class QueueInterpreter(object):
                 callbackargs = (mode, 0, 'Locals printed')
                 retvalue = 1
 
+            elif cmd == 'start_sampling':
+                if self.sampler is not None and self.sampler.running:
+                    self.sampler.stop()
+                self.sampler = StackSampler(self.thread_id, cargs[0], lambda: self.breakable)
+                self.sampler.start()
+                callbackargs = (mode, 0, f'Sampling every {cargs[0] * 1000:.1f} ms')
+                retvalue = 1
+
+            elif cmd == 'stop_sampling':
+                if self.sampler is None:
+                    callbackargs = (mode, 1, 'Sampling was not started')
+                else:
+                    callbackargs = (mode, 0, self.sampler.stop())
+                    self.sampler = None
+                retvalue = 1
+
             elif cmd == 'sync_break':
-                if not threading.currentThread().ident == self.thread_id and self.enable_trace:
+                if not self.enable_trace:
+                    callbackargs = (mode, 1, 'Tracing is not enabled')
+                elif threading.currentThread().ident == self.thread_id or not self.breakable:
+                    callbackargs = (mode, 1, 'No command running')
+                else:
                     self.stop = True
+                    SyncBreaker.request(self)
                     callbackargs = (mode, 0, 'Thread is asked to stop')
-                else:
-                    callbackargs = (mode, 1, 'Tracing is not enabled')
                 retvalue = 1
 
             elif cmd == 'KeyboardInterrupt':
@@ -358,6 +459,16 @@ class QueueInterpreter(object):
         return retvalue
         
         
+    def cpu_time(self):
+        """
+        Cpu time of this console.
+        A console in its own process also counts the threads started by the command.
+        """
+        if self.gui_proxy.call_queue is None:
+            return time.thread_time()
+        else:
+            return time.process_time()
+
     def clear_stdin_queue(self):
         cqs = self.cqs
         
@@ -388,28 +499,27 @@ class QueueInterpreter(object):
             except queue.Empty:
                 pass
             
-            except KeyboardInterrupt:
+            except (KeyboardInterrupt, SyncBreaked):
                 pass
 
         if mode in ['interprete', 'func', 'func_ext']:
             error_code = None
             result = None
             
+            start_moment = time.perf_counter()
+            start_cpu = self.cpu_time()
+            start_rss = peak_rss()
+            start_ipc = gui_proxy.ipc_bytes
+            
+            self.shell.command_started()
+            
             try:                
                 self.stop = False
-                                
-                if not self.prevent_trace:
-                    #the tracer seemed to be disabled after every sync break ???
-                    if self.enable_trace:
-                        sys.settrace(self.system_tracer)
-                    else:
-                        sys.settrace(None)
                     
                 if self.enable_profile:
                     self.profile = cProfile.Profile()
                     self.profile.enable()
                 
-                start_moment = end_moment = time.perf_counter()
                 redbull_timeout = config['console']['redbull']
                 if redbull_timeout > 0:
                     self.gui_proxy.redbull.enable(redbull_timeout)
@@ -418,8 +528,10 @@ class QueueInterpreter(object):
                 
                 if mode == 'interprete':
                     self.breakable = True
-                    error_code, result = interpreter.use_one_command(*args)
-                    self.breakable = False                    
+                    try:
+                        error_code, result = interpreter.use_one_command(*args)
+                    finally:
+                        self.breakable = False
                 
                 elif mode in ['func', 'func_ext']:
                     func = gui_proxy.decode_func(args[0])
@@ -446,8 +558,10 @@ class QueueInterpreter(object):
                             print('source not found')
 
                     self.breakable = True
-                    error_code, result = interpreter.use_one_func(func, func_args, func_kwargs)
-                    self.breakable = False
+                    try:
+                        error_code, result = interpreter.use_one_func(func, func_args, func_kwargs)
+                    finally:
+                        self.breakable = False
 
                 if error_code == 5:
                     # An error occured and traceback is printed
@@ -468,9 +582,6 @@ class QueueInterpreter(object):
                     except KeyboardInterrupt:
                         raise KeyboardInterrupt()
                         
-                if not self.prevent_trace:
-                    sys.settrace(None)                        
-                        
                 if self.enable_profile:
                     self.profile.disable()
                     self.enable_profile = False                    
@@ -497,13 +608,26 @@ class QueueInterpreter(object):
             finally:
                 #Finish the side thread
                 self.breakable = False
+                SyncBreaker.cancel(self.thread_id)
+                self.shell.command_finished()
                 self.break_sent = False                    
                 self.gui_proxy.redbull.disable()
                 
+                end_moment = time.perf_counter()
+                
                 if self.timeit:
-                    end_moment =  time.perf_counter()                 
                     print(f'Elapased time {end_moment-start_moment} s')                                
                     
+                if self.log_timing and mode == 'interprete':
+                    timing = {
+                        'cmd': args[0],
+                        'wall': end_moment - start_moment,
+                        'cpu': self.cpu_time() - start_cpu,
+                        'peak_rss': peak_rss() - start_rss,
+                        'ipc_bytes': gui_proxy.ipc_bytes - start_ipc,
+                        'error_code': error_code}
+                    gui_proxy._call_no_wait(TIMING, timing)
+                    
                 callbackargs = (mode, error_code, result)
                 retvalue = 1 
                 self.set_console_mode('interprete')                
@@ -717,6 +841,19 @@ class Interpreter(object):
             yield frame         
 
 
+def peak_rss():
+    """
+    The peak resident memory of this process in bytes.
+    The difference before and after a command is the growth of the peak.
+    """
+    if resource is None:
+        return psutil.Process().memory_info().peak_wset
+    elif sys.platform == 'darwin':
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    else:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
 def async_raise(thread_id, exctype):
         """
         Raise the exception to the thread tid, performs cleanup if needed.
@@ -0,0 +1,265 @@
+"""
+Map a function over items with a pool of gdesk child processes.
+
+The workers are standby processes of the process pool, claimed as worker
+instead of as console. Every worker has its own queues: the items are sent
+over the stdin queue, the results come back over the return queue.
+Large array results are moved through shared memory. A worker keeps its
+shared arrays until the console confirms it opened them.
+"""
+
+import os
+import sys
+import time
+import queue
+import pickle
+import logging
+import traceback
+
+import numpy as np
+
+from .conf import config
+from ..utils.shared import SharedArray
+
+logger = logging.getLogger(__name__)
+
+# Messages to the worker
+SETUP = 'setup'
+ITEM = 'item'
+STOP = 'stop'
+
+# Messages from the worker
+RESULT = 'result'
+ERROR = 'error'
+
+
+def encode_func(func):
+    """
+    Reference to a function which can be send to a worker.
+
+    Functions of live scripts are referred by module and name,
+    they are loaded with use() by the worker.
+    """
+    module = getattr(func, '__module__', None)
+
+    if module is not None and module not in sys.modules:
+        return ('live', module, func.__qualname__)
+
+    try:
+        pickle.dumps(func)
+    except Exception as ex:
+        raise TypeError(f'{func} can not be send to a worker process. '
+            'Define it in a module or live script.') from ex
+
+    return ('object', func)
+
+
+def decode_func(func_ref):
+    if func_ref[0] == 'live':
+        from gdesk import use
+        _, module, qualname = func_ref
+        func = use(module)
+        for attr in qualname.split('.'):
+            func = getattr(func, attr)
+        return func
+
+    return func_ref[1]
+
+
+def pack_result(result, shared):
+    """Move a large array to shared memory."""
+    if shared and isinstance(result, np.ndarray) and result.nbytes >= config['console'].get('pmap_shared_min_bytes', 65536):
+        return SharedArray.from_ndarray(result)
+    return result
+
+
+def unpack_result(result):
+    if isinstance(result, SharedArray):
+        return result.ndarray
+    return result
+
+
+def worker_loop(cqs):
+    """
+    Main loop of a worker process.
+
+    :param cqs: The CommQueues of the standby process.
+    """
+    func = None
+    args, kwargs = (), {}
+    shared = False
+    kept = dict()
+
+    while True:
+        command, payload, release = cqs.stdin_queue.get()
+
+        for index in release:
+            kept.pop(index, None)
+
+        if command == STOP:
+            break
+
+        elif command == SETUP:
+            from .shellmod import Shell
+            from ..live import manager
+            func_ref, args, kwargs, shared, sys_paths, live_paths = payload
+            Shell.add_sys_paths(sys_paths)
+            manager.path[:] = live_paths
+            func = decode_func(func_ref)
+
+        elif command == ITEM:
+            index, item = payload
+
+            try:
+                result = pack_result(func(item, *args, **kwargs), shared)
+
+            except BaseException as ex:
+                tb_message = traceback.format_exc()
+                try:
+                    pickle.dumps(ex)
+                except Exception:
+                    ex = RuntimeError(repr(ex))
+                cqs.return_queue.put((ERROR, index, (ex, tb_message)))
+
+            else:
+                if isinstance(result, SharedArray):
+                    kept[index] = result
+                cqs.return_queue.put((RESULT, index, result))
+
+
+class Worker(object):
+    """The console side of a worker process."""
+
+    def __init__(self, standby):
+        self.standby = standby
+        self.cqs = standby.cqs
+        self.pending = []
+        self.release = []
+
+    def send(self, command, payload=None):
+        self.cqs.stdin_queue.put((command, payload, self.release))
+        self.release = []
+
+    def is_alive(self):
+        return self.standby.process.is_alive()
+
+    def stop(self, deadline):
+        self.standby.process.join(max(deadline - time.perf_counter(), 0))
+        if self.standby.process.is_alive():
+            self.standby.process.terminate()
+
+
+class PoolMap(object):
+    """
+    Iterate over the results of func(item, *args, **kwargs) for every item,
+    computed by a pool of worker processes.
+
+    :param func: Function importable by the workers or a function of a live script
+    :param items: Iterable of picklable items, consumed lazily
+    :param int workers: Number of worker processes
+    :param bool ordered: Yield the results in the order of the items,
+        otherwise in the order of completion.
+    :param int prefetch: Number of items queued per worker
+    :param progress: Callable(done, count), count is None for an iterator of unknown length
+    """
+
+    def __init__(self, func, items, workers=None, ordered=True, args=(), kwargs=None, prefetch=2, progress=None):
+        self.func_ref = encode_func(func)
+        self.items = items
+        self.workers = workers or config['console'].get('pmap_workers', 0) or max(os.cpu_count() - 1, 1)
+        self.ordered = ordered
+        self.args = args
+        self.kwargs = kwargs or {}
+        self.prefetch = prefetch
+        self.progress = progress
+        self.shared = config['console'].get('pmap_shared_mem', False)
+        self.poll_interval = 0.005
+
+    def start_workers(self, workers):
+        from .tasks import process_pool, ProcessPool
+        from .shellmod import Shell
+
+        setup = (self.func_ref, self.args, self.kwargs, self.shared,
+            Shell.get_sys_paths(), Shell.get_live_paths())
+
+        for i in range(self.workers):
+            standby = process_pool.claim_or_start()
+            standby.claim_queue.put(ProcessPool.WORKER)
+            worker = Worker(standby)
+            worker.send(SETUP, setup)
+            workers.append(worker)
+
+    def __iter__(self):
+        items = enumerate(self.items)
+        count = len(self.items) if hasattr(self.items, '__len__') else None
+        done = 0
+        exhausted = False
+        waiting = dict()
+        next_index = 0
+
+        workers = []
+
+        try:
+            self.start_workers(workers)
+
+            while True:
+                if not exhausted:
+                    for worker in workers:
+                        while len(worker.pending) < self.prefetch:
+                            try:
+                                index, item = next(items)
+                            except StopIteration:
+                                exhausted = True
+                                break
+                            worker.pending.append(index)
+                            worker.send(ITEM, (index, item))
+
+                if exhausted and not any(worker.pending for worker in workers):
+                    break
+
+                received = False
+                for worker in workers:
+                    if not worker.pending:
+                        continue
+
+                    try:
+                        kind, index, result = worker.cqs.return_queue.get_nowait()
+                    except queue.Empty:
+                        if not worker.is_alive():
+                            raise RuntimeError(f'Worker process {worker.standby.process.pid} died')
+                        continue
+
+                    received = True
+                    worker.pending.remove(index)
+
+                    if kind == ERROR:
+                        from .tasks import ProcessError
+                        raise ProcessError(*result)
+
+                    if isinstance(result, SharedArray):
+                        worker.release.append(index)
+
+                    done += 1
+                    if self.progress is not None:
+                        self.progress(done, count)
+
+                    if not self.ordered:
+                        yield unpack_result(result)
+                        continue
+
+                    waiting[index] = result
+                    while next_index in waiting:
+                        yield unpack_result(waiting.pop(next_index))
+                        next_index += 1
+
+                if not received:
+                    time.sleep(self.poll_interval)
+
+        finally:
+            #Also on a KeyboardInterrupt or a break of the console
+            for worker in workers:
+                worker.send(STOP)
+
+            deadline = time.perf_counter() + 1
+            for worker in workers:
+                worker.stop(deadline)
@@ -0,0 +1,148 @@
+"""
+Statistical profiler for the command of a console thread.
+
+A side thread takes the stack of the console thread from
+sys._current_frames at a fixed interval. Identical stacks are counted.
+The console thread itself is not instrumented.
+"""
+
+import sys
+import time
+import threading
+import collections
+from pathlib import Path
+
+here = Path(__file__).parent
+
+# Frames of these files at the bottom of a stack belong to the console,
+# not to the command.
+CONSOLE_FILES = {str(here / 'interpreter.py'), str(here / 'tasks.py'), str(here / 'shellmod.py')}
+
+
+class StackSampler(object):
+    """
+    Count the stacks of a thread at every interval.
+
+    :param int thread_id: Ident of the thread to sample.
+    :param float interval: Time between samples in seconds.
+    :param active: Optional callable, only sample when it returns True.
+    """
+
+    def __init__(self, thread_id, interval=0.005, active=None, max_depth=256):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.active = active
+        self.max_depth = max_depth
+        self.stacks = collections.Counter()
+        self.samples = 0
+        self.duration = 0.0
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self):
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.sample_loop, name=f'Sampler-{self.thread_id}', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop sampling and return the profile."""
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+        return self.profile()
+
+    def sample_loop(self):
+        prior = time.perf_counter()
+
+        while not self.stop_event.wait(self.interval):
+            now = time.perf_counter()
+            elapsed, prior = now - prior, now
+
+            if self.active is not None and not self.active():
+                continue
+
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+
+            stack = self.frame_stack(frame)
+            del frame
+
+            if stack:
+                self.stacks[stack] += 1
+                self.samples += 1
+                self.duration += elapsed
+
+    def frame_stack(self, frame):
+        """Tuple of (filename, function, first line) from the root to the leaf."""
+        stack = []
+        while frame is not None and len(stack) < self.max_depth:
+            code = frame.f_code
+            stack.append((code.co_filename, code.co_name, code.co_firstlineno))
+            frame = frame.f_back
+        stack.reverse()
+
+        skip = 0
+        while skip < len(stack) and stack[skip][0] in CONSOLE_FILES:
+            skip += 1
+
+        return tuple(stack[skip:])
+
+    def profile(self):
+        return {
+            'thread_id': self.thread_id,
+            'interval': self.interval,
+            'samples': self.samples,
+            'duration': self.duration,
+            'stacks': list(self.stacks.items())}
+
+
+class CallNode(object):
+    """A function in the call tree with its sample counts."""
+
+    __slots__ = ('key', 'total', 'own', 'children')
+
+    def __init__(self, key):
+        self.key = key
+        self.total = 0
+        self.own = 0
+        self.children = dict()
+
+    def child(self, key):
+        node = self.children.get(key)
+        if node is None:
+            node = self.children[key] = CallNode(key)
+        return node
+
+
+def call_tree(profile):
+    """Merge the sampled stacks of a profile into a tree of CallNodes."""
+    root = CallNode(None)
+    for stack, count in profile['stacks']:
+        node = root
+        node.total += count
+        for key in stack:
+            node = node.child(key)
+            node.total += count
+        node.own += count
+    return root
+
+
+def hot_spots(profile):
+    """
+    Per function: the samples in the function itself and the samples
+    with the function anywhere on the stack.
+
+    :returns: dict of key: (own, total)
+    """
+    own = collections.Counter()
+    total = collections.Counter()
+    for stack, count in profile['stacks']:
+        own[stack[-1]] += count
+        for key in set(stack):
+            total[key] += count
+    return {key: (own[key], total[key]) for key in total}
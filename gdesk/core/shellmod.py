@@ -1,5 +1,6 @@
 import sys
 import os
+import time
 import threading
 import multiprocessing
 import builtins
@@ -15,6 +16,8 @@ import inspect
 from pathlib import Path
 from itertools import islice
 
+import numpy as np
+
 from . import stdinout
 from .interpreter import QueueInterpreter
 from .stdinout import ProcessStdInput
@@ -51,6 +54,9 @@ class Shell(object):
         self.wsdict['use'] = use     
         self.wsdict['__name__'] = '__main__'        
         self.input_frame = None
+        self.ns_version = 0
+        self.ns_busy = 0
+        self.ns_lock = threading.Lock()
         
         if redirect:
             self.redirect_stdout()            
@@ -508,6 +514,75 @@ class Shell(object):
         QueueInterpreter.create_and_interact(self, cqs, None, console_id)              
         
         
+    def pmap(self, func, items, workers=None, show=False, ordered=True, args=(), kwargs=None):
+        """
+        Map func over the items with a pool of child processes.
+        
+        Usage:
+        
+            results = shell.pmap(process_file, paths, workers=4)
+            results = shell.pmap(use('filters').denoise, frames, show=True, ordered=False)
+        
+        The function has to be importable by the child processes: defined in a
+        module or in a live script. Large array results are moved through shared
+        memory if console/pmap_shared_mem is set. The progress is shown in the
+        status bar of the console. Break the console to cancel, the child processes
+        are stopped.
+        
+        :param func: Called as func(item, *args, **kwargs)
+        :param items: Iterable of picklable items
+        :param int workers: Number of child processes, default console/pmap_workers
+        :param bool show: Show every array result in the image viewer as it completes
+        :param bool ordered: Results in the order of the items, otherwise in order of completion
+        :returns: List of the results
+        """
+        from .pmap import PoolMap
+        
+        interpreter = self.this_interpreter()
+        console_id = None if interpreter is None else interpreter.console_id
+        last_report = [0]
+        
+        def progress(done, count):
+            now = time.perf_counter()
+            if console_id is None: return
+            if done != count and now - last_report[0] < 0.25: return
+            last_report[0] = now
+            total = '?' if count is None else count
+            gui.console.show_progress(f'pmap: {done}/{total} done', console_id)
+        
+        results = []
+        for result in PoolMap(func, items, workers, ordered, args, kwargs, progress=progress):
+            if show and isinstance(result, np.ndarray):
+                gui.show(result)
+            results.append(result)
+            
+        return results
+        
+    def command_started(self):
+        with self.ns_lock:
+            self.ns_version += 1
+            self.ns_busy += 1
+        self.clear_completer_cache()
+            
+    def command_finished(self):
+        with self.ns_lock:
+            self.ns_version += 1
+            self.ns_busy -= 1
+        self.clear_completer_cache()
+        
+    def clear_completer_cache(self):
+        #The cached objects of the previous namespace version are not needed anymore
+        if isinstance(self.comp, LiveCompleter):
+            self.comp.clear_cache()
+            
+    def namespace_version(self):
+        """
+        A number which changes when a command is executed in the workspace.
+        None while a command is running.
+        """
+        with self.ns_lock:
+            return None if self.ns_busy > 0 else self.ns_version
+        
     @staticmethod
     def get_completer_data(text, max=1000, wild=False, wsmode=None):        
         
@@ -524,6 +599,10 @@ class Shell(object):
                 
         else:
             comp = shell.comp
+            
+        if isinstance(comp, LiveCompleter):
+            comp.namespace_version = shell.namespace_version()
+            return comp.completions(text, wild)[:max]
         
         items = []
         for state in range(max):
@@ -650,7 +729,8 @@ class Shell(object):
         
     @staticmethod
     def reload_scripts():
-        manager.update_now(True)
+        reload_times = manager.update_now(True)
+        print(f'Reloaded {len(reload_times)} scripts in {sum(reload_times.values()):.3f} s')
         
         
     def who(self, varname=None):
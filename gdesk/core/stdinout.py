@@ -1,8 +1,10 @@
 import io
 import sys
+import atexit
 import threading
 import time
 import logging
+import collections
 from logging.handlers import RotatingFileHandler
 from logging import StreamHandler, Handler
 from queue import Queue
@@ -159,39 +161,129 @@ def enable_ghstream_handler():
     logging.root.addHandler(streamhandler)       
 
 
+def dropped_summary(lines, nbytes):
+    return f'{ESC}38;5;8m... {lines} lines ({nbytes} characters) dropped ...{ESC}0m\n'
+
+
+class StreamRing(object):
+    """
+    Bounded buffer of (mode, text) chunks of an output stream.
+    
+    Consecutive chunks of the same mode are coalesced when taken.
+    If more than max_size characters are buffered, the oldest chunks
+    are dropped and replaced by a summary line.
+    """
+    
+    def __init__(self, max_size=None):
+        self.chunks = collections.deque()
+        self.size = 0
+        self.max_size = max_size
+        self.dropped_lines = 0
+        self.dropped_size = 0
+        self.lock = threading.Lock()
+        
+    def __len__(self):
+        return self.size
+        
+    def put(self, mode, text):
+        with self.lock:
+            self.chunks.append((mode, text))
+            self.size += len(text)
+            
+            if self.max_size is None:
+                return
+            
+            while self.size > self.max_size and len(self.chunks) > 1:
+                mode, text = self.chunks.popleft()
+                self.size -= len(text)
+                self.dropped_lines += text.count('\n')
+                self.dropped_size += len(text)
+                
+    def take(self, budget=None):
+        """
+        Take the buffered chunks, coalesced by mode.
+        
+        :param int budget: Stop taking chunks once this amount of characters is taken
+        :returns: list of (mode, text)
+        """
+        runs = []
+        taken = 0
+        
+        with self.lock:
+            if self.dropped_size > 0:
+                runs.append(('ansi', [dropped_summary(self.dropped_lines, self.dropped_size)]))
+                self.dropped_lines = 0
+                self.dropped_size = 0
+            
+            while len(self.chunks) > 0 and (budget is None or taken < budget):
+                mode, text = self.chunks.popleft()
+                self.size -= len(text)
+                taken += len(text)
+                
+                if len(runs) > 0 and runs[-1][0] == mode:
+                    runs[-1][1].append(text)
+                else:
+                    runs.append((mode, [text]))
+                
+        return [(mode, ''.join(texts)) for mode, texts in runs]
+        
+
 class FlushReducer(object):
-    def __init__(self, flusher):
-        self.q = Queue()
+    """
+    Reduce many flush requests to at most one flush per time slice.
+    """
+    
+    def __init__(self, flusher, interval=0.01):
+        self.event = threading.Event()
         self.flusher = flusher
+        self.interval = interval
+        self.closed = False
         self.thread = threading.Thread(target=self.reduce, name='FlushReducer', daemon=True)
         self.thread.start()
         
     def __call__(self):
-        self.q.put(1)
+        self.event.set()
         
     def reduce(self):
         while True:
-            t = self.q.get()
-            if t is sentinel:
-                return
-            time.sleep(0.01)
-            self.q.queue.clear()
+            self.event.wait()
+            if not self.closed:
+                time.sleep(self.interval)
+            self.event.clear()
             self.flusher()
+            if self.closed:
+                return
             
     def close(self):
-        #wait on an empty queue
-        while not self.q.empty():
-            time.sleep(0.01)
-        self.q.put(sentinel)
+        """Stop the thread after a last flush."""
+        if self.closed:
+            return
+        self.closed = True
+        self.event.set()
+        self.thread.join()
 
         
 class FlushPipeStream(io.TextIOBase):
+    """
+    Output stream to the stdout queue of a console.
+    
+    The writes are buffered in a ring and pushed to the queue
+    coalesced, once per time slice. An explicit flush, and the exit
+    of the process, push the buffered text right away.
+    """
+    
     def __init__(self, streamqueue, flusher):
+        console_config = config.get('console', {})
         self.streamqueue = streamqueue
         self.echo = None
         self.echo_prefix = ''
         self.echo_enabled = False
-        self.flusher = FlushReducer(flusher)
+        self.ring = StreamRing(console_config.get('stdout_ring_size', 4000000))
+        self.gui_flusher = flusher
+        self.push_lock = threading.Lock()
+        self.flusher = FlushReducer(self.push, console_config.get('flush_interval', 0.01))
+        #Text written just before the exit is not lost
+        atexit.register(self.flusher.close)
         
     def write(self, text):
         self._write_mode(text, config['stdoutmode'])
@@ -200,18 +292,37 @@ class FlushPipeStream(io.TextIOBase):
         self._write_mode(text, 'ansi')
         
     def _write_mode(self, text, mode, prefix='', suffix=''):            
-        if mode == 'ansi':
-            text_fmt = f'{prefix}{text}{suffix}'
+        text_fmt = f'{prefix}{text}{suffix}'
             
-        self.streamqueue.put((mode, text_fmt))
+        self.ring.put(mode, text_fmt)
         
         if not self.echo is None and self.echo_enabled:
             self.echo._write_mode(text_fmt, mode, f'{self.echo_prefix}{prefix}', suffix)
             
-        self.flush()               
+        self.flusher()
+        
+    def push(self):
+        """
+        Push the buffered text to the queue and flush the gui side.
+        """
+        #Keep the order of the chunks of concurrent pushes
+        with self.push_lock:
+            chunks = self.ring.take()
+            
+            if len(chunks) == 0:
+                return
+                
+            for chunk in chunks:
+                self.streamqueue.put(chunk)
+            
+        self.gui_flusher()
         
     def flush(self): 
-        self.flusher()      
+        self.push()
+        
+    def close(self):
+        self.flusher.close()
+        atexit.unregister(self.flusher.close)
 
 
 class ErrLogStream(io.TextIOBase):
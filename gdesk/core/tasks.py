@@ -14,6 +14,7 @@ import time
 import collections
 import platform
 import logging
+import importlib
 from multiprocessing import Process, Lock
 from queue import Queue, Empty
     
@@ -38,7 +39,7 @@ process_name = multiprocessing.current_process().name
 logger.debug(f'import of {__name__} by {process_name}\n')
 
 from .shellmod import Shell
-from .gui_proxy import GuiProxy, gui
+from .gui_proxy import GuiProxy, gui, TIMING
 from .interpreter import Interpreter, QueueInterpreter
 from .comm import NonDuplexQueue, ZmqQueues, CommQueues
 
@@ -260,6 +261,14 @@ class TaskBase(object):
     def enable_profiling(self):
         self.flow("enable_profiling")         
         
+    def start_sampling(self, interval=None):
+        if interval is None:
+            interval = config['console'].get('sample_interval', 0.005)
+        self.flow("start_sampling", interval)
+        
+    def stop_sampling(self, callback):
+        self.send_func_and_call("flow", ("stop_sampling",), callback)
+        
     def kill(self):
         import psutil
         
@@ -302,6 +311,9 @@ class TaskBase(object):
 
     def set_flusher(self, func):
         self.gui_proxy.set_func_hook(-1, func)  
+
+    def set_timing_logger(self, func):
+        self.gui_proxy.set_func_hook(TIMING, func)
         
     def wait_process_ready(self, timeout=3):
         from qtpy import QtWidgets
@@ -361,9 +373,14 @@ class ThreadTask(TaskBase):
 class ProcessTask(TaskBase):
     def __init__(self, mainshell, cqs=None):
         super().__init__('child')
+        self.standby = None
         
         if cqs is None:
-            self.cqs = CommQueues(multiprocessing.Queue, process=True)
+            self.standby = process_pool.claim()
+            if self.standby is None:
+                self.cqs = CommQueues(multiprocessing.Queue, process=True)
+            else:
+                self.cqs = self.standby.cqs
             self.start_child = True
         else:
             self.cqs = cqs            
@@ -377,14 +394,19 @@ class ProcessTask(TaskBase):
     def start(self):
         #no existing queue from an existing master process
         #Start a new child process
-        if self.start_child:
+        if self.standby is not None:
+            #Wake up the standby process of the pool
+            self.process = self.standby.process
+            self.standby.claim_queue.put(self.panid)
+
+        elif self.start_child:
             self.process = Process(target=ProcessTask.start_child_process, args=(config['config_files'], self.cqs, self.panid), daemon=True)
             self.process.start()                   
         
         self.flusher = None
                 
     @staticmethod    
-    def start_child_process(config_files, cqs, panid=None):
+    def start_child_process(config_files, cqs, panid=None, claim_queue=None):
         try:
             config_kwargs = {}
             config_kwargs['path_config_files'] = config_files
@@ -393,6 +415,23 @@ class ProcessTask(TaskBase):
             
             shell = Shell()
             refer_shell_instance(shell)
+            
+            if claim_queue is not None:
+                #Standby process of the pool, wait for a console
+                for module_name in config['console'].get('process_pool_preload', []):
+                    try:
+                        importlib.import_module(module_name)
+                    except Exception:
+                        logger.exception(f'Could not preload {module_name}')
+                        
+                panid = claim_queue.get()
+                if panid == ProcessPool.STOP: return
+                
+                if panid == ProcessPool.WORKER:
+                    from .pmap import worker_loop
+                    worker_loop(cqs)
+                    return
+                
             shell.start_in_this_thread(cqs, panid)
             
         finally:
@@ -402,6 +441,125 @@ class ProcessTask(TaskBase):
             proc = psutil.Process()
             proc.kill()
 
+class StandbyProcess(object):
+    """A child process started in advance, waiting to be claimed."""
+    
+    def __init__(self, config_files):
+        self.cqs = CommQueues(multiprocessing.Queue, process=True)
+        self.claim_queue = multiprocessing.Queue()
+        self.process = Process(target=ProcessTask.start_child_process,
+            args=(config_files, self.cqs, None, self.claim_queue), daemon=True)
+        self.process.start()
+        
+    def stop(self):
+        self.claim_queue.put(ProcessPool.STOP)
+
+
+class ProcessPool(object):
+    """
+    Keep a number of configured child processes on standby.
+    
+    A new ProcessTask claims one instead of starting and configuring a
+    process from scratch. The pool is refilled on the gui thread, one
+    process per pass of the event loop. Forking from another thread while
+    Qt is running can deadlock the child.
+    """
+    STOP = -1
+    WORKER = -2
+    
+    def __init__(self):
+        self.size = 0
+        self.standby = collections.deque()
+        self.lock = threading.Lock()
+        self.refill_pending = False
+        
+    def start(self, size):
+        self.size = size
+        self.refill()
+        
+    def stop(self):
+        self.size = 0
+        with self.lock:
+            while self.standby:
+                self.standby.popleft().stop()
+                
+    def refill(self):
+        """Start the missing standby processes, can be called from any thread."""
+        if self.size <= 0 or not gui.valid():
+            #Refilled at the next claim from a thread with a gui
+            return
+            
+        if gui.is_main():
+            self.schedule_refill()
+        else:
+            gui._call_no_wait(refill_process_pool)
+            
+    def schedule_refill(self):
+        from qtpy import QtCore
+        
+        if self.refill_pending: return
+        self.refill_pending = True
+        QtCore.QTimer.singleShot(0, self.refill_one)
+        
+    def refill_one(self):
+        self.refill_pending = False
+        
+        with self.lock:
+            if len(self.standby) >= self.size: return
+            
+        try:
+            standby = start_standby_process()
+        except Exception:
+            logger.exception('Could not start a standby process')
+            return
+            
+        with self.lock:
+            self.standby.append(standby)
+            
+        self.schedule_refill()
+                    
+    def claim(self):
+        """Return a StandbyProcess or None if the pool is empty."""
+        standby = None
+        
+        with self.lock:
+            while self.standby and standby is None:
+                candidate = self.standby.popleft()
+                if candidate.process.is_alive():
+                    standby = candidate
+                    
+        self.refill()
+            
+        return standby
+        
+    def claim_or_start(self):
+        """
+        Return a claimed StandbyProcess, or a new one if the pool is empty.
+        
+        In the gui process, the new one is started on the gui thread.
+        """
+        standby = self.claim()
+        
+        if standby is None:
+            if gui.valid() and not gui._qapp is None and not gui.is_main():
+                standby = gui.gui_call(start_standby_process)
+            else:
+                standby = start_standby_process()
+                
+        return standby
+            
+
+process_pool = ProcessPool()
+
+
+def refill_process_pool():
+    process_pool.schedule_refill()
+    
+    
+def start_standby_process():
+    return StandbyProcess(config['config_files'])
+            
+
 class ProcessThreadTask(TaskBase):
     def __init__(self, mainshell, master_process_task, queue_type='pipe'):
         super().__init__('child-thread')
@@ -30,6 +30,7 @@ from qtpy.QtCore import Qt
 from .. import gui, config, PROGNAME
 
 from ..core.history import History
+from ..core import tasks
 from ..core.watcher import CommandServer
 
 from ..utils import new_id_using_keys
@@ -453,9 +454,14 @@ def eventloop(shell, init_code=None, init_file=None, console_id=0, pictures=None
     
     if config['watcher']:
         qapp.cmdserver.start(qapp)    
+
+    tasks.process_pool.start(config['console'].get('process_pool', 0))
         
     qapp.exec_()
     
+    tasks.process_pool.stop()
+    qapp.history.close()
+    
     #Kill all the children
     if not config.get('keep_children', False):
         parent = psutil.Process(os.getpid())
@@ -2,7 +2,7 @@ import struct
 
 import numpy as np
 
-from qtpy import QtCore, QtGui
+from qtpy import QtCore, QtGui, API_NAME
 
 Colors = {
     'b': (0,0,255,255),
@@ -180,18 +180,10 @@ def arrayToQPath(x, y, connect='all'):
     ##
     ## All values are big endian--pack using struct.pack('>d') or struct.pack('>i')
 
-    path = QtGui.QPainterPath()
-
     #profiler = debug.Profiler()
     n = x.shape[0]
     # create empty array, pad with extra space on either end
-    arr = np.empty(n+2, dtype=[('x', '>f8'), ('y', '>f8'), ('c', '>i4')])
-    # write first two integers
-    #profiler('allocate empty')
-    byteview = arr.view(dtype=np.ubyte)
-    byteview[:12] = 0
-    byteview.data[12:20] = struct.pack('>ii', n, 0)
-    #profiler('pack header')
+    arr = vertexBuffer(n)
     # Fill array with vertex values
     arr[1:-1]['x'] = x
     arr[1:-1]['y'] = y
@@ -211,10 +203,34 @@ def arrayToQPath(x, y, connect='all'):
         raise Exception('connect argument must be "all", "pairs", "finite", or array')
 
     #profiler('fill array')
+    return vertexBufferToQPath(arr)
+
+
+def vertexBuffer(n):
+    """
+    Empty QDataStream buffer for a QPainterPath of n vertices.
+
+    The vertices are arr[1:-1], the header and footer are already written.
+    """
+    arr = np.empty(n+2, dtype=[('x', '>f8'), ('y', '>f8'), ('c', '>i4')])
+    # write first two integers
+    byteview = arr.view(dtype=np.ubyte)
+    byteview[:12] = 0
+    byteview.data[12:20] = struct.pack('>ii', n, 0)
+    #profiler('pack header')
     # write last 0
     lastInd = 20*(n+1)
     byteview.data[lastInd:lastInd+4] = struct.pack('>i', 0)
     #profiler('footer')
+    return arr
+
+
+def vertexBufferToQPath(arr):
+    """Stream a buffer of vertexBuffer into a QPainterPath."""
+    path = QtGui.QPainterPath()
+    lastInd = 20*(arr.shape[0]-1)
+    byteview = arr.view(dtype=np.ubyte)
+
     # create datastream object and stream into path
 
     ## Avoiding this method because QByteArray(str) leaks memory in PySide
@@ -231,4 +247,88 @@ def arrayToQPath(x, y, connect='all'):
     ds >> path
     #profiler('load')
 
-    return path    
+    return path
+
+
+def stepVertices(starts, values, stepwidth):
+    """
+    The vertices of a step curve: every value is a horizontal line
+    from its start to start + stepwidth.
+
+    :returns: x and y, both of length 2 * len(starts)
+    """
+    n = len(starts)
+    x = np.empty(2 * n, np.result_type(starts, stepwidth, np.float32))
+    x[0::2] = starts
+    np.add(starts, stepwidth, out=x[1::2])
+    y = np.empty(2 * n, np.result_type(values, np.float32))
+    y[0::2] = values
+    y[1::2] = values
+    return x, y
+
+
+def polygonBuffer(n):
+    """
+    QPolygonF of n points with a float64 array of shape (n, 2) on its memory.
+
+    :returns: (polygon, array), or None if the Qt binding gives no access to the memory
+    """
+    try:
+        polygon = QtGui.QPolygonF()
+        polygon.resize(n)
+        ptr = polygon.data()
+        if API_NAME == 'PySide6':
+            import shiboken6
+            buf = shiboken6.VoidPtr(ptr, 16 * n, True)
+        elif API_NAME == 'PySide2':
+            import shiboken2
+            buf = shiboken2.VoidPtr(ptr, 16 * n, True)
+        else:
+            ptr.setsize(16 * n)
+            buf = ptr
+        arr = np.frombuffer(buf, np.float64).reshape(n, 2)
+    except Exception:
+        return None
+    return polygon, arr
+
+
+def stepsToQPath(starts, values, stepwidth, zero_ends=True):
+    """
+    QPainterPath of the step curve of stepVertices.
+
+    The vertices are written from starts and values straight into the memory
+    of a QPolygonF, without intermediate vertex arrays. If the Qt binding
+    gives no access to that memory, into the QDataStream buffer instead.
+    With zero_ends, the curve starts and ends at zero.
+    """
+    n = len(starts)
+    if n == 0:
+        return QtGui.QPainterPath()
+
+    ends = 1 if zero_ends else 0
+    count = 2 * n + 2 * ends
+
+    polygon = polygonBuffer(count)
+    if polygon is None:
+        arr = vertexBuffer(count)
+        arr['c'][1:-1] = 1
+        x, y = arr['x'][1:-1], arr['y'][1:-1]
+    else:
+        polygon, arr = polygon
+        x, y = arr[:, 0], arr[:, 1]
+
+    x[ends:count-ends:2] = starts
+    np.add(starts, stepwidth, out=x[ends+1:count-ends:2])
+    y[ends:count-ends:2] = values
+    y[ends+1:count-ends:2] = values
+
+    if ends:
+        x[0], y[0] = x[1], 0
+        x[-1], y[-1] = x[-2], 0
+
+    if polygon is None:
+        return vertexBufferToQPath(arr)
+
+    path = QtGui.QPainterPath()
+    path.addPolygon(polygon)
+    return path
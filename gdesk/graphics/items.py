@@ -1,7 +1,8 @@
 import numpy as np
 from qtpy import QtCore, QtGui, QtWidgets
 from qtpy.QtGui import QColor
-from .functions import arrayToQPath
+from .functions import arrayToQPath, stepVertices, stepsToQPath
+from .lod import MIN_POINTS, is_sorted, decimate_minmax
 
 QtSignal = QtCore.Signal
 
@@ -24,8 +25,151 @@ class VectorCurve(QtWidgets.QGraphicsPathItem):
         self.yvector = yvector
 
 
+class LodCurve(VectorCurve):
+    """
+    Curve drawn as a min/max envelope per pixel column of the view.
 
-def createCurve(x, y, color=None, z=0, fill=50, zero_ends=True):
+    The xvector and yvector keep the full resolution data for readout.
+    The path covers the visible range with a margin of one view on each side
+    and is only decimated again if the view leaves that range or zooms.
+
+    :param int axis: 0 if the points are sorted on x, 1 if sorted on y
+    """
+
+    def __init__(self, xvector, yvector, zero_ends=True, axis=0):
+        super().__init__(QtGui.QPainterPath(), xvector, yvector)
+        self.zero_ends = zero_ends
+        self.axis = axis
+        self.set_data(xvector, yvector)
+
+    def set_data(self, xvector, yvector, zero_ends=None):
+        """
+        Replace the data of the curve.
+
+        The item stays in the scene with its pen, brush and z value,
+        only the path is replaced.
+        """
+        self.xvector = xvector = np.asarray(xvector)
+        self.yvector = yvector = np.asarray(yvector)
+        if not zero_ends is None:
+            self.zero_ends = zero_ends
+
+        self.lod_enabled = len(xvector) >= MIN_POINTS and is_sorted(yvector if self.axis else xvector)
+        self.lod_range = None
+
+        if len(xvector) > 0:
+            self.data_rect = QtCore.QRectF(QtCore.QPointF(float(np.nanmin(xvector)), float(np.nanmin(yvector))),
+                QtCore.QPointF(float(np.nanmax(xvector)), float(np.nanmax(yvector))))
+        else:
+            self.data_rect = QtCore.QRectF()
+
+        scene = self.scene()
+        if self.lod_enabled and not scene is None and len(scene.views()) > 0:
+            self.updateLod(scene.views()[0])
+        elif not self.lod_enabled or not scene is None:
+            self.setPath(self.makePath(self.xvector, self.yvector))
+
+    def dataRect(self):
+        """The bounding rectangle of the full data, the path can be decimated."""
+        return self.data_rect
+
+    def makePath(self, x, y):
+        if self.zero_ends and len(x) > 0:
+            zero = np.zeros(1, y.dtype)
+            if self.axis == 0:
+                return arrayToQPath(np.r_[x[:1], x, x[-1:]], np.r_[zero, y, zero])
+            else:
+                return arrayToQPath(np.r_[zero, x, zero], np.r_[y[:1], y, y[-1:]])
+        return arrayToQPath(x, y)
+
+    def itemChange(self, change, value):
+        if change == QtWidgets.QGraphicsItem.ItemSceneHasChanged and self.lod_enabled:
+            scene = self.scene()
+            if not scene is None and len(scene.views()) > 0:
+                self.updateLod(scene.views()[0])
+            else:
+                self.setPath(self.makePath(self.xvector, self.yvector))
+        return super().itemChange(change, value)
+
+    def updateLod(self, view):
+        """Decimate again for the visible range and scale of the view."""
+        if not self.lod_enabled:
+            return
+
+        p0 = view.mapToScene(0, 0)
+        p1 = view.mapToScene(view.viewport().width(), view.viewport().height())
+
+        if self.axis == 0:
+            pos0, pos1 = sorted((p0.x(), p1.x()))
+            columns = max(view.viewport().width(), 1)
+            pos, val = self.xvector, self.yvector
+        else:
+            pos0, pos1 = sorted((p0.y(), p1.y()))
+            columns = max(view.viewport().height(), 1)
+            pos, val = self.yvector, self.xvector
+
+        span = pos1 - pos0
+        if span <= 0:
+            return
+
+        if not self.lod_range is None:
+            lod0, lod1, lod_span = self.lod_range
+            if abs(lod_span - span) <= 1e-9 * span and lod0 <= pos0 and pos1 <= lod1:
+                return
+
+        self.lod_range = (pos0 - span, pos1 + span, span)
+        pos, val = decimate_minmax(pos, val, pos0 - span, pos1 + span, 3 * columns)
+
+        if self.axis == 0:
+            self.setPath(self.makePath(pos, val))
+        else:
+            self.setPath(self.makePath(val, pos))
+
+
+class StepCurve(LodCurve):
+    """
+    Histogram like curve: every value is a step from its start to start + stepwidth.
+
+    The step vertices are kept for readout and decimation, but the full
+    resolution path is written straight from the starts and values.
+    """
+
+    def __init__(self, starts, values, stepwidth, zero_ends=True):
+        self.steps = None
+        super().__init__(np.empty(0), np.empty(0), zero_ends)
+        self.set_steps(starts, values, stepwidth)
+
+    def set_steps(self, starts, values, stepwidth, zero_ends=None):
+        """Replace the steps of the curve, see LodCurve.set_data."""
+        starts = np.asarray(starts)
+        values = np.asarray(values)
+        self.steps = (starts, values, stepwidth)
+        x, y = stepVertices(starts, values, stepwidth)
+        super().set_data(x, y, zero_ends)
+
+    def set_data(self, xvector, yvector, zero_ends=None):
+        #Arbitrary vertices, no steps anymore
+        self.steps = None
+        super().set_data(xvector, yvector, zero_ends)
+
+    def makePath(self, x, y):
+        if not self.steps is None and x is self.xvector:
+            starts, values, stepwidth = self.steps
+            return stepsToQPath(starts, values, stepwidth, self.zero_ends)
+        return super().makePath(x, y)
+
+
+def update_lod_curves(view):
+    """Decimate the LodCurve items of the scene of view again."""
+    scene = view.scene()
+    if scene is None:
+        return
+    for item in scene.items():
+        if isinstance(item, LodCurve):
+            item.updateLod(view)
+
+
+def setCurveStyle(curve, color=None, fill=50):
     if color is None:
         pen = QtGui.QPen(QtCore.Qt.black, 0, QtCore.Qt.SolidLine)
         if not fill is None:
@@ -36,23 +180,36 @@ def createCurve(x, y, color=None, z=0, fill=50, zero_ends=True):
         if not fill is None:
             brush = QtGui.QBrush(QtGui.QColor(R,G,B,fill))        
 
-    if zero_ends:
-        path = arrayToQPath(np.r_[x[0], x, x[-1]], np.r_[0, y, 0])    
-    else:
-        path = arrayToQPath(x, y)    
-            
+    if fill is None:
+        brush = QtGui.QBrush(QtCore.Qt.NoBrush)
+
+    if curve.pen() != pen:
+        curve.setPen(pen)
+
+    if curve.brush() != brush:
+        curve.setBrush(brush)
+
+
+def createCurve(x, y, color=None, z=0, fill=50, zero_ends=True, axis=0):
     #transform the Path to a PathItem                                    
     #curve = QtWidgets.QGraphicsPathItem(path)
-    curve = VectorCurve(path, np.array(x), np.array(y))
+    curve = LodCurve(np.array(x), np.array(y), zero_ends, axis)
     if z != 0:
         curve.setZValue(z)
         
-    curve.setPen(pen)
-    
-    if not fill is None:
-        curve.setBrush(brush)
+    setCurveStyle(curve, color, fill)
     
     return curve
+
+
+def createStepCurve(starts, values, stepwidth, color=None, z=0, fill=50, zero_ends=True):
+    curve = StepCurve(starts, values, stepwidth, zero_ends)
+    if z != 0:
+        curve.setZValue(z)
+
+    setCurveStyle(curve, color, fill)
+
+    return curve
     
     
 class LabelItem(QtWidgets.QGraphicsPolygonItem):
@@ -0,0 +1,66 @@
+"""
+Level of detail for curves with many points.
+
+A curve is reduced to at most 4 points per pixel column of the view:
+the first, minimum, maximum and last value in the column. Drawn as a
+line, this envelope looks the same as the full curve at that scale.
+"""
+
+import numpy as np
+
+#Curves with less points are not decimated
+MIN_POINTS = 4096
+
+
+def is_sorted(vector):
+    return len(vector) < 2 or bool(np.all(vector[1:] >= vector[:-1]))
+
+
+def decimate_minmax(pos, val, pos0, pos1, columns):
+    """
+    Reduce the points in the range pos0 to pos1 to a min/max envelope.
+
+    The first and last point of the full curve, and one point on each side
+    of the range, are kept, so lines to points outside the range stay
+    outside.
+
+    :param pos: Sorted, ascending positions
+    :param val: The values at the positions
+    :param int columns: Number of pixel columns in the range
+    :returns: The reduced pos and val
+    """
+    n = len(pos)
+    start = max(int(np.searchsorted(pos, pos0, 'left')) - 1, 0)
+    stop = min(int(np.searchsorted(pos, pos1, 'right')) + 1, n)
+
+    window_pos = pos[start:stop]
+    window_val = val[start:stop]
+
+    if len(window_pos) > 4 * columns:
+        edges = np.linspace(pos0, pos1, columns + 1)[1:-1]
+        starts = np.r_[0, np.searchsorted(window_pos, edges)]
+        ends = np.r_[starts[1:], len(window_pos)]
+        nonempty = ends > starts
+        starts, ends = starts[nonempty], ends[nonempty]
+
+        envelope_pos = np.empty((len(starts), 4), pos.dtype)
+        envelope_val = np.empty((len(starts), 4), np.result_type(val.dtype, np.float32))
+        envelope_pos[:, :3] = window_pos[starts, None]
+        envelope_pos[:, 3] = window_pos[ends - 1]
+        envelope_val[:, 0] = window_val[starts]
+        envelope_val[:, 1] = np.fmin.reduceat(window_val, starts)
+        envelope_val[:, 2] = np.fmax.reduceat(window_val, starts)
+        envelope_val[:, 3] = window_val[ends - 1]
+
+        window_pos = envelope_pos.ravel()
+        window_val = envelope_val.ravel()
+
+    if start > 0:
+        window_pos = np.r_[pos[0], window_pos]
+        window_val = np.r_[val[0], window_val]
+
+    if stop < n:
+        window_pos = np.r_[window_pos, pos[-1]]
+        window_val = np.r_[window_val, val[-1]]
+
+    return window_pos, window_val
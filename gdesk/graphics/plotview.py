@@ -10,6 +10,7 @@ except:
     
 from .point import Point
 from . import functions as fn
+from .items import update_lod_curves
 
 QtSignal = QtCore.Signal
 
@@ -64,6 +65,7 @@ class PlotView(QtWidgets.QGraphicsView):
         
         fullrange = QtCore.QRectF(-1e6, -1e6, 2e6, 2e6)
         self.setSceneRect(fullrange)
+        self.matrixUpdated.connect(lambda: update_lod_curves(self))
         self.updateMatrix()
         
         self.initMenu()
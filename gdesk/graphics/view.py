@@ -3,6 +3,7 @@ from qtpy import QtCore, QtGui, QtWidgets
 QtSignal = QtCore.Signal
 
 from .point import Point
+from .items import update_lod_curves
 
 #Point = QtCore.QPointF
 
@@ -79,6 +80,7 @@ class SceneView(QtWidgets.QGraphicsView):
             0  , 0  , 1))
                 
         self.centerOn(*self.center)       
+        update_lod_curves(self)
         self.viewport().update()
 
     def translate(self, dx, dy):
@@ -104,6 +106,7 @@ class SceneView(QtWidgets.QGraphicsView):
             0    , t.m22(), 0,\
             0    , 0      , 1))                    
         self.centerOn(*self.center)       
+        update_lod_curves(self)
         
     def setXLimits(self, low, high, left_border=0, right_border=0):
         self.scale[0] = (self.width() - left_border - right_border)/ (high - low)
@@ -124,6 +127,7 @@ class SceneView(QtWidgets.QGraphicsView):
             0      , scale, 0,\
             0      , 0    , 1))                    
         self.centerOn(*self.center)  
+        update_lod_curves(self)
         
     def setYLimits(self, low, high, bottom_border=0, top_border=0):
         self.scale[1] = (self.height() - bottom_border - top_border) / (low - high)
@@ -0,0 +1,151 @@
+"""
+Cache of the compiled code objects of live scripts.
+
+Like __pycache__, the code objects are marshalled to files, but all in one
+directory outside the script tree. An entry is valid if the python magic
+number, the modify time, the size and the hash of the source match.
+A hit touches the entry. The least recently used entries are removed if
+the cache grows too large. The size of the cache is only scanned at the
+first write and at a trim, the writes in between update a running total.
+"""
+
+import os
+import struct
+import marshal
+import hashlib
+import logging
+import importlib.util
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# magic, modify time, size, source hash
+HEADER = struct.Struct('4sdq8s')
+
+
+class CodeCache(object):
+    """
+    :param directory: Directory of the cache files
+    :param int max_bytes: Remove the least recently used entries above this size
+    """
+
+    def __init__(self, directory, max_bytes=64 * 2**20):
+        self.directory = Path(directory).expanduser()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.directory_ready = False
+        #Bytes in the cache directory, None until scanned
+        self.total_bytes = None
+
+    def entry_path(self, path):
+        key = hashlib.sha1(os.path.normcase(os.path.abspath(str(path))).encode('utf-8')).hexdigest()
+        return self.directory / f'{Path(path).stem}.{key[:16]}.pyc'
+
+    def compile(self, source, path, mtime, size):
+        """
+        Return the code object of the source, from the cache if valid.
+
+        :param bytes source: The content of the file
+        :param path: The path of the file, used as filename of the code
+        :param float mtime: Modify time of the file
+        :param int size: Size of the file
+        """
+        header = HEADER.pack(importlib.util.MAGIC_NUMBER, mtime, size, importlib.util.source_hash(source))
+        entry = self.entry_path(path)
+
+        code = self.read(entry, header)
+        if code is not None:
+            self.hits += 1
+            return code
+
+        self.misses += 1
+        code = compile(source, str(path), 'exec')
+        self.write(entry, header, code)
+        return code
+
+    def read(self, entry, header):
+        try:
+            with open(entry, 'rb') as fp:
+                if fp.read(HEADER.size) != header:
+                    return None
+                code = marshal.loads(fp.read())
+            os.utime(entry)
+
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+
+        return code
+
+    def write(self, entry, header, code):
+        try:
+            if not self.directory_ready:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                self.directory_ready = True
+
+            if self.total_bytes is None:
+                self.total_bytes = sum(size for mtime, size, path in self.entry_stats())
+
+            try:
+                replaced = os.path.getsize(entry)
+            except OSError:
+                replaced = 0
+
+            tmp = entry.with_name(f'{entry.name}.{os.getpid()}.tmp')
+            with open(tmp, 'wb') as fp:
+                fp.write(header)
+                marshal.dump(code, fp)
+                written = fp.tell()
+            os.replace(tmp, entry)
+
+        except OSError:
+            logger.debug(f'Could not write {entry}', exc_info=True)
+            return
+
+        self.total_bytes += written - replaced
+        if self.total_bytes > self.max_bytes:
+            self.trim()
+
+    def entries(self):
+        try:
+            return [entry for entry in os.scandir(self.directory) if entry.name.endswith('.pyc')]
+        except OSError:
+            return []
+
+    def entry_stats(self):
+        """List of (mtime, size, path) of the entries."""
+        stats = []
+        for entry in self.entries():
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            stats.append((stat.st_mtime, stat.st_size, entry.path))
+        return stats
+
+    def trim(self):
+        """Remove the least recently used entries if the cache is too large."""
+        entries = self.entry_stats()
+        total = sum(size for mtime, size, path in entries)
+        self.total_bytes = total
+        if total <= self.max_bytes:
+            return
+
+        for mtime, size, path in sorted(entries):
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            if total <= self.max_bytes * 0.75:
+                break
+
+        self.total_bytes = total
+
+    def clear(self):
+        for entry in self.entries():
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+        self.total_bytes = None
@@ -29,9 +29,11 @@ Notes:
 
 """
 
+import re
 import atexit
 import builtins
 import __main__
+from collections import OrderedDict
 from .manage import LiveScriptScan, LiveScriptTree, LiveScriptModuleReference
 
 __all__ = ["Completer"]
@@ -56,6 +58,84 @@ def is_property(obj, attr):
         return False   
     return False
     
+def match_rank(part, word, wild=False):
+    """
+    Rank of word as completion of part, lower is better.
+
+    0 for a prefix, 1 for a case insensitive prefix. If wild, also 2 for a
+    case insensitive substring and 3 for the characters of part appearing
+    in order in word. None if word does not match.
+    """
+    if word.startswith(part):
+        return 0
+
+    if not wild:
+        return None
+
+    lpart, lword = part.lower(), word.lower()
+    if lword.startswith(lpart):
+        return 1
+    if lpart in lword:
+        return 2
+
+    pos = 0
+    for char in lpart:
+        pos = lword.find(char, pos) + 1
+        if pos == 0:
+            return None
+    return 3
+
+
+def rank_matches(matches, part, offset, wild=False):
+    """
+    Filter the completions on their match with part.
+    If wild, sort them on rank, public before private names and alphabetic.
+
+    :param matches: Completions, the word starts at offset
+    :param int offset: Length of the text in front of the completed word
+    """
+    if not wild:
+        return [match for match in matches if match[offset:].startswith(part)]
+
+    ranked = []
+    for match in matches:
+        word = match[offset:].rstrip('(: ')
+        rank = match_rank(part, word, wild)
+        if rank is not None:
+            #Scattered matches in shorter words first
+            length = len(word) if rank == 3 else 0
+            ranked.append((rank, word.startswith('_'), length, word.lower(), match))
+    ranked.sort()
+    return [item[-1] for item in ranked]
+
+
+def split_word(text):
+    """Split text in the head and the name being typed at the end."""
+    word = re.search(r'\w*$', text).group()
+    return text[:len(text) - len(word)], word
+
+
+def narrow_matches(last_text, last_matches, text, wild=False):
+    """
+    Derive the completions of text from the completions of a shorter text.
+
+    Only possible if text extends last_text with name characters.
+    The completions of '' and '_' hide the private names, so they can not be narrowed.
+
+    :returns: The completions or None if they have to be computed again.
+    """
+    if not text.startswith(last_text) or not is_matched(text, '[', ']'):
+        return None
+
+    head, word = split_word(text)
+    last_head, last_word = split_word(last_text)
+
+    if head != last_head or last_word in ('', '_'):
+        return None
+
+    return rank_matches(last_matches, word, len(head), wild)
+
+
 def is_matched(expression, opening='({[', closing=')}]'):
     """
     Finds out how balanced an expression is.
@@ -80,7 +160,7 @@ def is_matched(expression, opening='({[', closing=')}]'):
     return not queue    
 
 class Completer:
-    def __init__(self, namespace = None, multikey=False):
+    def __init__(self, namespace = None, multikey=False, cache_size=16):
         """Create a new completer for the command line.
 
         Completer([namespace]) -> completer instance.
@@ -93,6 +173,11 @@ class Completer:
         readline via the set_completer() call:
 
         readline.set_completer(Completer(my_namespace).complete)
+
+        Set namespace_version to a value which changes with the content of
+        the namespace to enable the caching of the attributes per object
+        and the narrowing of the previous completions. It is None by default,
+        disabling the caching.
         """
 
         if namespace and not isinstance(namespace, dict):
@@ -109,6 +194,12 @@ class Completer:
             self.use_main_ns = 0
             self.namespace = namespace
 
+        self.namespace_version = None
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.cache_version = None
+        self.last = None
+
     def complete(self, text, state, wild=False):
         """Return the next possible completion for 'text'.
 
@@ -134,21 +225,117 @@ class Completer:
                 return None
 
         if state == 0:
-            self.wild = wild
-            if not is_matched(text, '[', ']'):
-                if self.multikey:
-                    self.matches = self.multi_key_matches(text)                        
-                else:
-                    self.matches = self.key_matches(text)
-            elif "." in text:
-                self.matches = self.attr_matches(text)                
-            else:
-                self.matches = self.global_matches(text)
+            self.matches = self.completions(text, wild)
         try:
             return self.matches[state]
         except IndexError:
             return None
 
+    def completions(self, text, wild=False):
+        """List of all completions of text."""
+        if self.use_main_ns:
+            self.namespace = __main__.__dict__
+
+        version = self.namespace_version
+
+        if version is None:
+            self.last = None
+
+        elif self.last is not None:
+            last_version, last_wild, last_text, last_matches = self.last
+            if last_version == version and last_wild == wild:
+                matches = narrow_matches(last_text, last_matches, text, wild)
+                if matches is not None:
+                    self.last = (version, wild, text, matches)
+                    return matches
+
+        self.wild = wild
+        if not is_matched(text, '[', ']'):
+            if self.multikey:
+                matches = self.multi_key_matches(text)
+            else:
+                matches = self.key_matches(text)
+        elif "." in text:
+            matches = self.attr_matches(text)
+        else:
+            matches = self.global_matches(text)
+
+        if version is not None:
+            self.last = (version, wild, text, matches)
+
+        return matches
+
+    def object_entry(self, thisobject):
+        """
+        The attribute names of the object and a dict for their completions.
+
+        Kept per object identity while the namespace_version does not change.
+        The object is kept in the entry, so its id can not be reused. The
+        owner of the namespace calls clear_cache when it bumps the version,
+        so the objects are not kept alive after that.
+        """
+        version = self.namespace_version
+        cachable = version is not None and not isinstance(thisobject,
+            (LiveScriptModuleReference, LiveScriptTree, LiveScriptScan))
+
+        if cachable:
+            if version != self.cache_version:
+                self.cache.clear()
+                self.cache_version = version
+            entry = self.cache.get(id(thisobject))
+            if entry is not None:
+                self.cache.move_to_end(id(thisobject))
+                return entry
+
+        entry = (thisobject, self.object_words(thisobject), dict())
+
+        if cachable:
+            self.cache[id(thisobject)] = entry
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+
+        return entry
+
+    def clear_cache(self):
+        """Release the cached objects."""
+        #A new dict, a completion in another thread can still use the old one
+        self.cache = OrderedDict()
+        self.cache_version = None
+
+    def object_words(self, thisobject):
+        # get the content of the object, except __builtins__
+        words = set(dir(thisobject))
+        words.discard("__builtins__")
+
+        # Get the class-level attributes, but only if these are not explicitly hidden.
+        if isinstance(thisobject, (LiveScriptTree, LiveScriptScan)):
+            #getattr on _AUTO_COMPLETE_HIDE_CLASS_ATTRIBUTES causes a search
+            #to _AUTO_COMPLETE_HIDE_CLASS_ATTRIBUTES.py
+            hide_class_level_attributes = False
+        else:
+            hide_class_level_attributes = getattr(thisobject, "_AUTO_COMPLETE_HIDE_CLASS_ATTRIBUTES", False)
+
+        if hasattr(thisobject, '__class__'):
+            words.add('__class__')
+            if not hide_class_level_attributes:
+                words.update(get_class_members(thisobject.__class__))
+
+        return words
+
+    def attr_completion(self, thisobject, word, match):
+        if is_property(thisobject, word):
+            #Don't do getattr on the property
+            #It would call the getter, which can start executing code
+            #Which can be anyoing
+            return match
+        elif isinstance(thisobject, (LiveScriptScan, LiveScriptTree)):
+            return match
+        try:
+            val = getattr(thisobject, word)
+        except Exception:
+            return match  # Include even if attribute not set
+        return self._callable_postfix(val, match)
+
     def _callable_postfix(self, val, word):
         if callable(val):
             word = word + "("
@@ -167,7 +354,7 @@ class Completer:
         n = len(text)
         for word in keyword.kwlist:
             if self.wild:
-                test = text.lower() in word.lower()
+                test = match_rank(text, word, wild=True) is not None
             else:
                 test = word[:n] == text
             if test:
@@ -182,12 +369,14 @@ class Completer:
         for nspace in [self.namespace, builtins.__dict__]:
             for word, val in nspace.items():
                 if self.wild:
-                    test = text.lower() in word.lower() and word not in seen
+                    test = word not in seen and match_rank(text, word, wild=True) is not None
                 else:
                     test = word[:n] == text and word not in seen
                 if test:
                     seen.add(word)
                     matches.append(self._callable_postfix(val, word))
+        if self.wild:
+            matches = rank_matches(matches, text, 0, wild=True)
         return matches
 
     def attr_matches(self, text):
@@ -217,24 +406,13 @@ class Completer:
             
         if isinstance(thisobject, LiveScriptModuleReference):
             thisobject.__script_manager__.mark_for_update()
-        
 
-        # get the content of the object, except __builtins__
-        words = set(dir(thisobject))
-        words.discard("__builtins__")
+        thisobject, words, completions = self.object_entry(thisobject)
+
+        if self.wild:
+            matches = ["%s.%s" % (expr, word) for word in words]
+            return rank_matches(matches, attr, len(expr) + 1, wild=True)
 
-        # Get the class-level attributes, but only if these are not explicitly hidden.
-        if isinstance(thisobject, (LiveScriptTree, LiveScriptScan)):
-            #getattr on _AUTO_COMPLETE_HIDE_CLASS_ATTRIBUTES causes a search
-            #to _AUTO_COMPLETE_HIDE_CLASS_ATTRIBUTES.py
-            hide_class_level_attributes = False
-        else:
-            hide_class_level_attributes = getattr(thisobject, "_AUTO_COMPLETE_HIDE_CLASS_ATTRIBUTES", False)            
-            
-        if hasattr(thisobject, '__class__'):
-            words.add('__class__')
-            if not hide_class_level_attributes:
-                words.update(get_class_members(thisobject.__class__))
         matches = []
         n = len(attr)
         if attr == '':
@@ -245,26 +423,12 @@ class Completer:
             noprefix = None
         while True:
             for word in words:
-                if self.wild and attr.lower() in word.lower():
-                    match = "%s.%s" % (expr, word)
-                    matches.append(match)                    
-                elif (word[:n] == attr and
+                if (word[:n] == attr and
                     not (noprefix and word[:n+1] == noprefix)):
-                    match = "%s.%s" % (expr, word)
-                    if is_property(thisobject, word):
-                        #Don't do getattr on the property
-                        #It would call the getter, which can start executing code
-                        #Which can be anyoing
-                        pass
-                    elif isinstance(thisobject, (LiveScriptScan, LiveScriptTree)):
-                        pass
-                    else:
-                        try:
-                            val = getattr(thisobject, word)
-                        except Exception:
-                            pass  # Include even if attribute not set
-                        else:
-                            match = self._callable_postfix(val, match)
+                    match = completions.get(word)
+                    if match is None:
+                        match = self.attr_completion(thisobject, word, "%s.%s" % (expr, word))
+                        completions[word] = match
                     matches.append(match)
             if matches or not noprefix:
                 break
@@ -364,11 +528,10 @@ class Completer:
         
 
 def get_class_members(klass):
-    ret = dir(klass)
-    if hasattr(klass,'__bases__'):
-        for base in klass.__bases__:
-            ret = ret + get_class_members(base)
-    return ret
+    members = set()
+    for cls in getattr(klass, '__mro__', (klass,)):
+        members.update(dir(cls))
+    return members
 
 try:
     import readline
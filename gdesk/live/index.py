@@ -0,0 +1,166 @@
+"""
+Persistent index of the live scripts for searching.
+
+Per script the index stores the modify time and size, the top-level
+functions and classes (found with ast, the script is not executed) and the
+content. Only scripts with a changed modify time or size are read again
+at an update. The content is searched with a sqlite FTS5 trigram index if
+available. A content row has the rowid of its FILES row.
+"""
+
+import os
+import ast
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 2
+
+
+def top_level_definitions(source):
+    """List of (name, kind, lineno) of the top-level functions and classes."""
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return []
+
+    definitions = []
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            definitions.append((node.name, 'function', node.lineno))
+        elif isinstance(node, ast.ClassDef):
+            definitions.append((node.name, 'class', node.lineno))
+    return definitions
+
+
+class ScriptIndex(object):
+    """
+    :param db_path: The sqlite file, None for an index in memory
+    """
+
+    def __init__(self, db_path=None):
+        if db_path is None:
+            self.server = sqlite3.connect(':memory:', check_same_thread=False)
+        else:
+            db_path = Path(db_path).expanduser()
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+            self.server = sqlite3.connect(str(db_path), timeout=10, check_same_thread=False)
+        self.lock = threading.RLock()
+        self.define_tables()
+
+    def define_tables(self):
+        with self.lock:
+            #Version 2: CONTENT keyed by the rowid of FILES
+            if self.server.execute('PRAGMA user_version').fetchone()[0] < SCHEMA_VERSION:
+                for table in ['FILES', 'DEFS', 'CONTENT']:
+                    self.server.execute(f'DROP TABLE IF EXISTS {table}')
+                self.server.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+            self.server.execute("""CREATE TABLE IF NOT EXISTS FILES (
+ID INTEGER PRIMARY KEY, PATH TEXT UNIQUE, ROOT TEXT, RELPATH TEXT, MTIME REAL, SIZE INTEGER)""")
+            self.server.execute("""CREATE TABLE IF NOT EXISTS DEFS (
+PATH TEXT, NAME TEXT, KIND TEXT, LINENO INTEGER)""")
+            self.server.execute("CREATE INDEX IF NOT EXISTS DEFS_PATH ON DEFS (PATH)")
+
+            try:
+                self.server.execute("CREATE VIRTUAL TABLE IF NOT EXISTS CONTENT USING fts5(BODY, tokenize='trigram')")
+                self.trigram = True
+            except sqlite3.OperationalError:
+                logger.info('No sqlite FTS5 trigram tokenizer, content search without index')
+                self.server.execute("CREATE TABLE IF NOT EXISTS CONTENT (ID INTEGER PRIMARY KEY, BODY TEXT)")
+                self.trigram = False
+
+            self.server.commit()
+
+    def update(self, roots):
+        """
+        Index the new and modified scripts of the roots, remove the deleted ones.
+
+        :returns: Number of scripts read
+        """
+        with self.lock:
+            known = dict()
+            for path, root, mtime, size in self.server.execute('SELECT PATH, ROOT, MTIME, SIZE FROM FILES'):
+                known[path] = (root, mtime, size)
+
+            found = set()
+            updated = 0
+
+            for root in roots:
+                root = str(Path(root).absolute())
+                for dirpath, dirnames, filenames in os.walk(root):
+                    dirnames[:] = [name for name in dirnames if not name.startswith(('.', '__pycache__'))]
+                    for filename in filenames:
+                        if not filename.lower().endswith('.py'):
+                            continue
+                        path = os.path.join(dirpath, filename)
+                        try:
+                            stat = os.stat(path)
+                        except OSError:
+                            continue
+                        found.add(path)
+                        if known.get(path) == (root, stat.st_mtime, stat.st_size):
+                            continue
+                        self.index_file(path, root, stat)
+                        updated += 1
+
+            for path in set(known) - found:
+                self.remove_file(path)
+
+            self.server.commit()
+            return updated
+
+    def index_file(self, path, root, stat):
+        try:
+            with open(path, 'rb') as fp:
+                source = fp.read()
+        except OSError:
+            return
+
+        self.remove_file(path)
+        file_id = self.server.execute('INSERT INTO FILES (PATH, ROOT, RELPATH, MTIME, SIZE) VALUES (?, ?, ?, ?, ?)',
+            (path, root, os.path.relpath(path, root), stat.st_mtime, stat.st_size)).lastrowid
+        self.server.executemany('INSERT INTO DEFS (PATH, NAME, KIND, LINENO) VALUES (?, ?, ?, ?)',
+            [(path, name, kind, lineno) for name, kind, lineno in top_level_definitions(source)])
+        self.server.execute('INSERT INTO CONTENT (rowid, BODY) VALUES (?, ?)',
+            (file_id, source.decode('utf-8', errors='replace')))
+
+    def remove_file(self, path):
+        row = self.server.execute('SELECT ID FROM FILES WHERE PATH = ?', (path,)).fetchone()
+        if row is None:
+            return
+        self.server.execute('DELETE FROM CONTENT WHERE rowid = ?', row)
+        self.server.execute('DELETE FROM DEFS WHERE PATH = ?', (path,))
+        self.server.execute('DELETE FROM FILES WHERE ID = ?', row)
+
+    def files(self, roots):
+        """List of (path, root, relpath) of the scripts in the roots, in the order of the roots."""
+        roots = [str(Path(root).absolute()) for root in roots]
+        with self.lock:
+            rows = list(self.server.execute('SELECT PATH, ROOT, RELPATH FROM FILES ORDER BY RELPATH'))
+        order = {root: i for i, root in enumerate(roots)}
+        rows = [row for row in rows if row[1] in order]
+        rows.sort(key=lambda row: order[row[1]])
+        return rows
+
+    def definitions(self, part):
+        """List of (path, name, kind, lineno) with part in the name, case insensitive."""
+        escaped = part.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        with self.lock:
+            return list(self.server.execute(
+                "SELECT PATH, NAME, KIND, LINENO FROM DEFS WHERE NAME LIKE ? ESCAPE '\\' ORDER BY PATH, LINENO",
+                (f'%{escaped}%',)))
+
+    def content(self, part):
+        """List of (path, body) of the scripts containing part."""
+        with self.lock:
+            select = 'SELECT FILES.PATH, CONTENT.BODY FROM CONTENT JOIN FILES ON FILES.ID = CONTENT.rowid'
+            if self.trigram and len(part) >= 3:
+                rows = self.server.execute(f'{select} WHERE CONTENT.BODY MATCH ?', ('"' + part.replace('"', '""') + '"',))
+            else:
+                rows = self.server.execute(f'{select} WHERE instr(CONTENT.BODY, ?) > 0', (part,))
+            #The trigram match is case insensitive
+            return [(path, body) for path, body in rows if part in body]
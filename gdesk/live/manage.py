@@ -13,6 +13,10 @@ import types
 
 import logging
 
+from .watch import make_watcher, normpath
+from .codecache import CodeCache
+from .index import ScriptIndex
+
 logger = logging.getLogger(__name__)
 logger.setLevel('INFO')
 
@@ -27,6 +31,8 @@ class UpdateFlag(Enum):
     DONE = 1
     MODIFIED = 2
     ENFORCE = 3
+    # A module it depends on was reloaded
+    DEPENDENT = 4
 
 class LoadError(Enum):
     NONE = 1
@@ -192,17 +198,49 @@ class LiveScriptModule(object):
         self.code = None
         self.workspace = None
         self.ask_refresh = UpdateFlag.DONE
+        self.checking = False
+        
+        # Statistics
+        self.check_count = 0
+        self.load_count = 0
+        self.load_time = 0.0
+        self.last_load_time = 0.0
 
 
     def check_for_update(self):
         logger.debug(f'Checking {self.name}, mode={self.ask_refresh}')
         loaderror = LoadError.NONE
 
-        if self.ask_refresh == UpdateFlag.DONE: return loaderror
+        if self.ask_refresh == UpdateFlag.DONE or self.checking: return loaderror
+        
+        self.checking = True
+        try:
+            #The modules used by this module are updated first
+            for name in list(self.script_manager.dependencies.get(self.name, ())):
+                module = self.script_manager.modules.get(name)
+                if not module is None:
+                    module.check_for_update()
+                    
+            return self._check_for_update()
+            
+        finally:
+            self.checking = False
+            
+            
+    def _check_for_update(self):
+        loaderror = LoadError.NONE
+        
+        if self.ask_refresh == UpdateFlag.DEPENDENT:
+            loaderror = self.load(RAISE_LOAD_ERRORS)
 
-        if self.ask_refresh == UpdateFlag.ENFORCE or \
+        elif self.ask_refresh == UpdateFlag.ENFORCE or \
                 ((self.ask_refresh == UpdateFlag.MODIFIED) and (self.is_modified())):
             loaderror = self.load(RAISE_LOAD_ERRORS)
+            
+            if loaderror == LoadError.NONE:
+                #Modules using this module could hold references to old objects
+                for name in self.script_manager.dependents(self.name):
+                    self.script_manager.modules[name].ask_refresh = UpdateFlag.DEPENDENT
 
         if loaderror == LoadError.SUCCEED:
             self.ask_refresh = UpdateFlag.DONE
@@ -224,6 +262,7 @@ class LiveScriptModule(object):
 
 
     def is_modified(self):
+        self.check_count += 1
         modified = self.load_modify < self.modify_time()
         if self.load_modify == -1:
             logger.debug(f'First time loading {time.ctime(self.modify_time())}')
@@ -234,18 +273,43 @@ class LiveScriptModule(object):
 
     def load(self, raise_load_errors=False):
         """Import Python file (from disk, compile and execute)"""
+        #The uses are recorded again, a module which is not used anymore is dropped
+        self.script_manager.dependencies.pop(self.name, None)
+        start = time.perf_counter()
+        try:
+            loaderror = self._load(raise_load_errors)
+            
+        finally:
+            self.last_load_time = time.perf_counter() - start
+            self.load_count += 1
+            self.load_time += self.last_load_time
+            
+        if loaderror == LoadError.NONE:
+            logger.info(f'{self.name}@{time.ctime(self.load_modify)} in {self.last_load_time * 1000:.1f} ms')
+            
+        return loaderror
+            
+            
+    def _load(self, raise_load_errors=False):
         self.code = None
         self.workspace = LsWorkspace(str(self), str(self.path), self.name, self.script_manager)
 
-        with open(str(self.path), 'r', encoding='utf-8') as fp:
-            current_modify_stamp = self.modify_time()
+        with open(str(self.path), 'rb') as fp:
+            stat = os.fstat(fp.fileno())
+            current_modify_stamp = stat.st_mtime
 
             logger.debug(f'{self.path} reading with time stamp {time.ctime(current_modify_stamp)}')
             pycode = fp.read()
 
         try:
-            logger.debug(f'Compiling')
-            codeobj = compile(pycode, str(self.path), 'exec')
+            code_cache = self.script_manager.code_cache
+            
+            if code_cache is None:
+                logger.debug(f'Compiling')
+                codeobj = compile(pycode, str(self.path), 'exec')
+            else:
+                codeobj = code_cache.compile(pycode, self.path, current_modify_stamp, stat.st_size)
+                
             self.code = codeobj
 
         except SyntaxError as ex:
@@ -269,7 +333,6 @@ class LiveScriptModule(object):
                 return LoadError.EXECUTE
 
         self.load_modify = current_modify_stamp
-        logger.info(f'{self.name}@{time.ctime(self.load_modify)}')
         return LoadError.NONE
         
         
@@ -413,7 +476,36 @@ class LiveScriptManager(object):
         #The loaded modules
         self.modules = dict()
         
+        #Per module, the modules it uses
+        self.dependencies = dict()
+        
         self.tree_merge = None
+        
+        #Cache of the compiled scripts
+        self._code_cache = None
+        
+        #Index for searching the scripts
+        self._index = None
+        self._index_paths = None
+        self._index_time = 0
+        self.index_interval = config.get('console', {}).get('live_index_interval', 5.0)
+        
+        #Watcher of the live paths, started at the first mark_for_update
+        self.watcher = None
+        self.watch_method = config.get('console', {}).get('live_watch', 'auto')
+        self.watch_interval = config.get('console', {}).get('live_watch_interval', 1.0)
+
+
+    @property
+    def code_cache(self):
+        """The CodeCache or None if console/path_live_cache is not set."""
+        if self._code_cache is None:
+            cache_path = config.get('console', {}).get('path_live_cache')
+            if not cache_path:
+                return None
+            max_bytes = config.get('console', {}).get('live_cache_max_bytes', 64 * 2**20)
+            self._code_cache = CodeCache(cache_path, max_bytes)
+        return self._code_cache
 
 
     def locate_script(self, modstr='test', paths=None):
@@ -448,39 +540,70 @@ class LiveScriptManager(object):
         return result
             
             
+    @property
+    def index(self):
+        """The ScriptIndex, stored in console/path_live_index or in memory."""
+        if self._index is None:
+            self._index = ScriptIndex(config.get('console', {}).get('path_live_index'))
+        return self._index
+
+
+    def update_index(self, force=False):
+        """Walk the live paths and update the index if it is older than index_interval."""
+        now = time.monotonic()
+        paths = tuple(self.path)
+        
+        if force or paths != self._index_paths or now - self._index_time >= self.index_interval:
+            self.index.update(paths)
+            self._index_paths = paths
+            self._index_time = time.monotonic()
+            
+            
+    def indexed_scripts(self, paths=None):
+        """
+        Update the index and list the scripts below the paths.
+        
+        The index is updated at most once per index_interval, unless the
+        live paths changed.
+        
+        :returns: list of (path, root, mod_str, reachable)
+        """
+        self.update_index()
+        
+        first_path = dict()
+        scripts = []
+        
+        for path, root, relpath in self.index.files(self.path):
+            mod_str = get_mod_str(Path(relpath))
+            reachable = first_path.setdefault(mod_str, path) == path
+            scripts.append((path, root, mod_str, reachable))
+            
+        if paths is not None:
+            prefixes = tuple(os.path.join(str(Path(path).absolute()), '') for path in paths)
+            scripts = [script for script in scripts if script[0].startswith(prefixes)]
+            
+        return scripts
+            
+            
     def search_script(self, part, dir_listing=False, paths=None, parent_modstr=None):        
         found_scripts = OrderedDict()
+        shown_root = None
         
-        if paths is None: paths = self.path
-        
-        for path in paths:        
-            path_shown = False
-            for p in Path(path).rglob('*.py'):
-                if part in str(p):
-                    if dir_listing and not path_shown:
-                        print()
-                        print(path)
-                        print()
-                        path_shown = True
-                        
-                    mod_path = p.relative_to(path)                
-                    mod_str = get_mod_str(mod_path)
-                    
-                    if not parent_modstr is None:
-                        mod_str = f'{parent_modstr}.{mod_str}'
+        for path, root, mod_str, reachable in self.indexed_scripts(paths):
+            if not part in path: continue
+            
+            if dir_listing:
+                if root != shown_root:
+                    print()
+                    print(root)
+                    print()
+                    shown_root = root
                     
-                    try:
-                        find_path = self.locate_script(mod_str)
-                        if find_path[0][0] == p:
-                            if dir_listing:
-                                print(f'    {mod_path} <- {mod_str}')
-                            found_scripts[mod_str] = path / mod_path
-                        else:
-                            if dir_listing:
-                                print(f'    {mod_path} <- UNREACHABLE')
-                        
-                    except KeyError:
-                        print(f'    COULD NOT LOCATE {mod_path}')
+                mod_path = os.path.relpath(path, root)
+                print(f'    {mod_path} <- {mod_str if reachable else "UNREACHABLE"}')
+                
+            if reachable:
+                found_scripts[mod_str] = path
                         
         if dir_listing:              
             print()
@@ -490,84 +613,44 @@ class LiveScriptManager(object):
         
         
     def scan_script_tree_for_function(self, node, part):
-
-        try:
-            keys = dir(node)
-            
-        except:
-            return
-            
-        for k in keys:
-
-            try:
-                item = getattr(node, k)        
-                
-            except:
-                continue
+        paths = node.__paths__ if isinstance(node, LiveScriptTree) else None
+        mod_strs = {path: mod_str for path, root, mod_str, reachable in self.indexed_scripts(paths) if reachable}
+        
+        for path, name, kind, lineno in self.index.definitions(part):
+            mod_str = mod_strs.get(path)
+            if mod_str is None: continue
             
-            if isinstance(item, LiveScriptTree):
-                self.scan_script_tree_for_function(item, part)
-                
-            elif isinstance(item, LiveScriptModuleReference):
-                self.scan_module_for_function(item, part)               
+            if kind == 'function':
+                print(f'{mod_str}.{name}(')
+            else:
+                print(f'{mod_str}.{name}')
 
 
-    def scan_module_for_function(self, module, part):
-        
-        try:
-            keys = dir(module)
-            
-        except:
-            return
-            
-        for k in keys:
-            
-            try:
-                item = getattr(module, k) 
-            except:
-                continue
-            
-            if isinstance(item, types.FunctionType):
-                if part.lower() in k.lower():
-                    print(f'{module.__name__}.{k}(')                
-            
-            
     def search_content(self, part, paths=None, parent_modstr=None): 
+        scripts = {path: (root, mod_str) for path, root, mod_str, reachable in self.indexed_scripts(paths) if reachable}
+        shown_root = None
         
-        if paths is None: paths = self.path
+        contents = dict(self.index.content(part))
         
-        for path in paths:        
+        for path, (root, mod_str) in scripts.items():
+            body = contents.get(path)
+            if body is None: continue
             
-            path_shown = False        
-            for p in Path(path).rglob('*.py'):    
-                file_show = False
-                
-                mod_path = p.relative_to(path)
-                mod_str = get_mod_str(mod_path)
-                
-                if not parent_modstr is None:
-                    mod_str = f'{parent_modstr}.{mod_str}'                
+            if root != shown_root:
+                print()
+                print(root)
+                print()
+                shown_root = root
                 
-                if not self.locate_script(mod_str)[0][0] == p: continue
-                
-                file = open(p, 'r')
-                
-                for i, line in enumerate(file):
-                    if part in line:
-                        if not path_shown:
-                            print()
-                            print(path)
-                            print()
-                            path_shown = True    
-                            
-                        if not file_show:
-                            print()
-                            print(mod_str)
-                            print()
-                            file_show = True
-                            
-                        print(f'{i:06d}: {line.rstrip()}')
+            print()
+            print(mod_str)
+            print()
+            
+            for i, line in enumerate(body.splitlines()):
+                if part in line:
+                    print(f'{i:06d}: {line.rstrip()}')
                 
+
     def append_path(self, path, resolve=True):
         path = Path(path).absolute()
         if resolve:
@@ -589,24 +672,152 @@ class LiveScriptManager(object):
         module.load(RAISE_LOAD_ERRORS)
 
 
+    def record_dependency(self, modstr, back=2):
+        """Record that the calling live script uses the module modstr."""
+        frame = sys._getframe(back)
+        
+        while frame is not None:
+            caller_globals = frame.f_globals
+            
+            if caller_globals.get('__loader__') is self:
+                name = caller_globals.get('__name__')
+                if name != modstr:
+                    self.dependencies.setdefault(name, set()).add(modstr)
+                return
+                
+            frame = frame.f_back
+            
+            
+    def dependents(self, modstr):
+        """The loaded modules using modstr, directly or indirectly."""
+        result = set()
+        todo = [modstr]
+        
+        while todo:
+            name = todo.pop()
+            for user, used in self.dependencies.items():
+                if name in used and not user in result and user != modstr and user in self.modules:
+                    result.add(user)
+                    todo.append(user)
+                    
+        return result
+        
+        
+    def topological_order(self, names):
+        """Sort the module names so a module comes after the modules it uses."""
+        names = set(names)
+        order = []
+        visited = set()
+        
+        def visit(name):
+            if name in visited: return
+            visited.add(name)
+            for used in sorted(self.dependencies.get(name, ())):
+                if used in names:
+                    visit(used)
+            order.append(name)
+            
+        for name in sorted(names):
+            visit(name)
+            
+        return order
+
+
     def update_now(self, enforce=False):
         """
         Reload the scripts in memory.
         If not enforced, load only scripts with more recent timestamps
+        and the scripts using them, in order of dependency.
+        
+        :returns: dict of module name: reload time in seconds
         """
         self.pop_missing_paths()
         
-        for module in list(self.modules.values()):
-            if enforce or module.is_modified():
-                load_error = module.load(RAISE_LOAD_ERRORS)
+        if enforce:
+            names = set(self.modules)
+            
+        else:
+            names = set()
+            for name, module in list(self.modules.items()):
+                if module.is_modified():
+                    names.add(name)
+                    names.update(self.dependents(name))
+                    
+        reload_times = dict()
+                
+        for name in self.topological_order(names):
+            module = self.modules[name]
+            load_error = module.load(RAISE_LOAD_ERRORS)
+            module.ask_refresh = UpdateFlag.DONE
+            reload_times[name] = module.last_load_time
+            
+        return reload_times
 
 
     def mark_for_update(self, enforce=False):
-        """Mark all modules to check for update at next first check_for_update() per module"""
-        logger.debug('Marking all modules for update')
-        mark = UpdateFlag.ENFORCE if enforce else UpdateFlag.MODIFIED
-        for module in self.modules.values():
-            module.ask_refresh = mark
+        """
+        Mark the modules to check for update at next first check_for_update() per module.
+        
+        With a watcher, only the modules of the files changed since the last call are marked.
+        """
+        if enforce:
+            logger.debug('Marking all modules for enforced update')
+            for module in self.modules.values():
+                module.ask_refresh = UpdateFlag.ENFORCE
+            return
+            
+        changed = None
+        
+        if self.watch_method != 'off':
+            if self.watcher is None:
+                self.start_watch()
+            self.watcher.watch(self.path)
+            changed = self.watcher.pop_changed()
+        
+        if changed is None:
+            logger.debug('Marking all modules for update')
+            for module in self.modules.values():
+                module.ask_refresh = UpdateFlag.MODIFIED
+                
+        elif changed:
+            logger.debug(f'Marking {len(changed)} changed files for update')
+            for module in self.modules.values():
+                if normpath(module.path) in changed:
+                    module.ask_refresh = UpdateFlag.MODIFIED
+                    
+                    
+    def start_watch(self, method=None):
+        """
+        Start watching the live paths for changed files.
+        
+        :param str method: 'auto', 'inotify' or 'poll'
+        """
+        self.stop_watch()
+        if method is not None:
+            self.watch_method = method
+        self.watcher = make_watcher(self, self.watch_method, self.watch_interval)
+        self.watcher.watch(self.path)
+        self.watcher.start()
+        
+        
+    def stop_watch(self):
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+            
+            
+    def reload_stats(self):
+        """
+        Number of time stamp checks, number of loads and load time per module.
+        
+        :returns: dict of module name: dict
+        """
+        return {name: {
+                'checks': module.check_count,
+                'loads': module.load_count,
+                'load_time': module.load_time,
+                'last_load_time': module.last_load_time}
+            for name, module in self.modules.items()}
 
         
     def using_modstr(self, modstr, back=1, mp=False):
@@ -639,6 +850,8 @@ class LiveScriptManager(object):
         for path, stype in path_and_stypes:
                 
             if stype == 'file':
+                self.record_dependency(modstr)
+                
                 if modstr in self.modules.keys() and self.modules[modstr].path == path:
                     return LiveScriptModuleReference(self, modstr, mp=mp)
                     
@@ -667,4 +880,5 @@ class LiveScriptManager(object):
         for k in list(self.modules):
             if not self.modules[k].path.exists():
                 self.modules.pop(k)
+                self.dependencies.pop(k, None)
         
@@ -0,0 +1,264 @@
+"""
+Watch the live script paths for modified files.
+
+The watcher collects the paths of the changed files in a background thread.
+Before a command, the script manager only marks the modules of these files
+for update, instead of checking the time stamp of every loaded module.
+
+On Linux, inotify is used. Otherwise the loaded modules are polled by the
+background thread at a fixed interval.
+inotify doesn't see the changes made by other clients of network file
+systems (nfs, cifs, smb, fuse). The modules in these paths, and in
+directories which could not be watched, are polled as well. Symlinked
+directories are followed, every real directory is watched once.
+"""
+
+import os
+import sys
+import struct
+import time
+import select
+import logging
+import threading
+import ctypes
+import ctypes.util
+
+logger = logging.getLogger(__name__)
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+EVENT_HEADER = struct.Struct('iIII')
+
+#statfs f_type of the file systems which inotify doesn't fully watch
+NETWORK_FS_TYPES = {
+    0x6969: 'nfs',
+    0xFF534D42: 'cifs',
+    0x517B: 'smb',
+    0xFE534D42: 'smb2',
+    0x65735546: 'fuse',
+}
+
+
+def normpath(path):
+    return os.path.normcase(os.path.abspath(str(path)))
+
+
+class WatcherBase(object):
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.changed = set()
+        self.check_all = True
+        self.paths = ()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.loop, name=type(self).__name__, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+
+    def watch(self, paths):
+        """Set the live paths to watch."""
+        paths = tuple(paths)
+        if paths == self.paths:
+            return
+        self.paths = paths
+        self.update_paths()
+        with self.lock:
+            # Changes during the switch could be missed
+            self.check_all = True
+
+    def update_paths(self):
+        pass
+
+    def poll_modules(self, modules):
+        for module in modules:
+            try:
+                modified = module.load_modify < os.path.getmtime(str(module.path))
+            except OSError:
+                modified = True
+            if modified:
+                self.add_changed(module.path)
+
+    def add_changed(self, path):
+        with self.lock:
+            self.changed.add(normpath(path))
+
+    def pop_changed(self):
+        """
+        The changed files since the last call.
+
+        :returns: Set of normalized paths or None if every module has to be checked.
+        """
+        with self.lock:
+            if self.check_all:
+                self.check_all = False
+                self.changed = set()
+                return None
+            changed, self.changed = self.changed, set()
+        return changed
+
+
+class PollingWatcher(WatcherBase):
+    """Check the time stamps of the loaded modules at an interval."""
+
+    def __init__(self, script_manager, interval=1.0):
+        super().__init__()
+        self.script_manager = script_manager
+        self.interval = interval
+
+    def loop(self):
+        while not self.stop_event.wait(self.interval):
+            self.poll_modules(list(self.script_manager.modules.values()))
+
+
+class InotifyWatcher(WatcherBase):
+    """
+    Receive the changes of the files in the live paths from the Linux kernel.
+
+    The modules in network paths, or in directories which could not be
+    watched, are polled at the interval.
+    """
+
+    def __init__(self, script_manager, interval=1.0):
+        super().__init__()
+        self.script_manager = script_manager
+        self.interval = interval
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self.dirs = dict()
+        #Real path of the watched directories, a symlink loop is walked once
+        self.real_dirs = dict()
+        self.dirs_lock = threading.RLock()
+        #Normalized directories of which the modules are polled
+        self.polled = set()
+
+    def fs_type(self, path):
+        """Name of the network file system of path, None for other file systems."""
+        buffer = ctypes.create_string_buffer(256)
+        if self.libc.statfs(os.fsencode(path), buffer) != 0:
+            return None
+        #f_type is the first field of struct statfs
+        f_type = ctypes.c_long.from_buffer(buffer).value & 0xFFFFFFFF
+        return NETWORK_FS_TYPES.get(f_type)
+
+    def add_tree(self, root):
+        fs_type = self.fs_type(root)
+        if fs_type is not None:
+            logger.info(f'{root} is on {fs_type}, polling it')
+            self.polled.add(normpath(root))
+            return
+
+        for dirpath, dirnames, filenames in os.walk(root, followlinks=True):
+            real = os.path.realpath(dirpath)
+            if real in self.real_dirs.values():
+                dirnames[:] = []
+                continue
+            if dirpath != root and os.path.islink(dirpath) and self.fs_type(dirpath) is not None:
+                logger.info(f'{dirpath} links to a network file system, polling it')
+                self.polled.add(normpath(dirpath))
+                dirnames[:] = []
+                continue
+            dirnames[:] = [name for name in dirnames if not name.startswith(('.', '__pycache__'))]
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(dirpath), WATCH_MASK)
+            if wd < 0:
+                logger.warning(f'Could not watch {dirpath}: {os.strerror(ctypes.get_errno())}, polling it')
+                self.polled.add(normpath(dirpath))
+                continue
+            self.dirs[wd] = dirpath
+            self.real_dirs[wd] = real
+
+    def update_paths(self):
+        with self.dirs_lock:
+            for wd in list(self.dirs):
+                self.libc.inotify_rm_watch(self.fd, wd)
+            self.dirs.clear()
+            self.real_dirs.clear()
+            self.polled.clear()
+            for path in self.paths:
+                self.add_tree(path)
+
+    def polled_modules(self):
+        with self.dirs_lock:
+            roots = tuple(root + os.sep for root in self.polled)
+        if not roots:
+            return []
+        return [module for module in list(self.script_manager.modules.values())
+            if normpath(module.path).startswith(roots)]
+
+    def stop(self):
+        super().stop()
+        os.close(self.fd)
+
+    def loop(self):
+        last_poll = time.monotonic()
+        while not self.stop_event.is_set():
+            readable, _, _ = select.select([self.fd], [], [], min(0.5, self.interval))
+            if readable:
+                data = os.read(self.fd, 65536)
+                with self.dirs_lock:
+                    self.handle(data)
+            if time.monotonic() - last_poll >= self.interval:
+                last_poll = time.monotonic()
+                self.poll_modules(self.polled_modules())
+
+    def handle(self, data):
+        pos = 0
+        while pos + EVENT_HEADER.size <= len(data):
+            wd, mask, cookie, length = EVENT_HEADER.unpack_from(data, pos)
+            pos += EVENT_HEADER.size
+            name = os.fsdecode(data[pos:pos + length].rstrip(b'\0'))
+            pos += length
+
+            if mask & IN_Q_OVERFLOW:
+                with self.lock:
+                    self.check_all = True
+                continue
+
+            dirpath = self.dirs.get(wd)
+            if dirpath is None:
+                continue
+
+            if mask & IN_IGNORED:
+                self.dirs.pop(wd)
+                self.real_dirs.pop(wd, None)
+                continue
+
+            path = os.path.join(dirpath, name)
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    self.add_tree(path)
+            elif name.endswith('.py'):
+                self.add_changed(path)
+
+
+def make_watcher(script_manager, method='auto', interval=1.0):
+    """
+    :param str method: 'inotify', 'poll' or 'auto'
+    """
+    if method in ('auto', 'inotify') and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(script_manager, interval)
+        except Exception:
+            logger.exception('Could not start inotify, falling back to polling')
+
+    return PollingWatcher(script_manager, interval)
@@ -7,11 +7,13 @@ Render to qt from agg (anti-grain).
 from .. import config
 
 import os
+import sys
 import ctypes
 import threading
 import logging
 import warnings
 import matplotlib
+import numpy as np
 
 from matplotlib.transforms import Bbox
 from matplotlib.figure import Figure
@@ -19,12 +21,13 @@ from matplotlib import cbook
 from matplotlib._pylab_helpers import Gcf
 from matplotlib.backend_bases import FigureCanvasBase, FigureManagerBase
 from matplotlib.backends.backend_agg import FigureCanvasAgg
-from matplotlib.backends.backend_qt5 import FigureCanvasQT
+from matplotlib.backends.backend_qt5 import FigureCanvasQT, TimerQT
 from matplotlib.backends.qt_compat import QT_API
 from matplotlib import rcParams
 from packaging import version
 
 from .. import gui
+from .remote import RemoteFigure
 
 
 if not version.parse('3.2') <= version.parse(matplotlib.__version__) < version.parse('3.12'):
@@ -102,6 +105,50 @@ def show(*, block=None):
         manager.show()
 
 
+def unmultiplied_rgba8888_to_premultiplied_argb32(rgba8888, storage=None):
+    """
+    Same as cbook._unmultiplied_rgba8888_to_premultiplied_argb32,
+    but written into the given storage if it is large enough.
+
+    :param rgba8888: Array of shape (height, width, 4)
+    :param storage: A flat uint8 array, reused as buffer
+    :returns: The argb32 array and the storage
+    """
+    rgba8888 = np.ascontiguousarray(rgba8888)
+    nbytes = rgba8888.size
+
+    if storage is None or len(storage) < 2 * nbytes:
+        storage = np.empty(2 * nbytes, np.uint8)
+
+    argb32 = storage[:nbytes].reshape(rgba8888.shape)
+
+    if sys.byteorder == "little":
+        # Swap the red and blue byte of every pixel, as uint32
+        # This is about twice as fast as np.take
+        pixels = rgba8888.reshape(-1).view(np.uint32)
+        swapped = storage[:nbytes].view(np.uint32)
+        temp = storage[nbytes:2 * nbytes].view(np.uint32)
+        np.bitwise_and(pixels, 0xFF00FF00, out=swapped)
+        np.left_shift(pixels, 16, out=temp)
+        np.bitwise_and(temp, 0x00FF0000, out=temp)
+        np.bitwise_or(swapped, temp, out=swapped)
+        np.right_shift(pixels, 16, out=temp)
+        np.bitwise_and(temp, 0x000000FF, out=temp)
+        np.bitwise_or(swapped, temp, out=swapped)
+        rgb24 = argb32[..., :-1]
+        alpha8 = argb32[..., -1:]
+    else:
+        np.take(rgba8888, [3, 0, 1, 2], axis=2, out=argb32)
+        alpha8 = argb32[..., :1]
+        rgb24 = argb32[..., 1:]
+
+    # Only bother premultiplying when the alpha channel is not fully opaque
+    if alpha8.size > 0 and alpha8.min() != 0xff:
+        np.multiply(rgb24, alpha8 / 0xff, out=rgb24, casting="unsafe")
+
+    return argb32, storage
+
+
 def new_figure_manager(num, *args, FigureClass=Figure, **kwargs):
     """Create a new figure manager instance."""
     # If a main-level app must be created, this (and
@@ -121,7 +168,7 @@ def new_figure_manager_given_figure(num, figure):
         # In case of coming from other Process
         # Don't do a guicall, FigureCanvasGh2 or FigureManagerQT is not picklable!
         # Is called when a figure, line, ... is depickled from the interprocess queue
-        canvas = FigureCanvasBase(figure)
+        canvas = FigureCanvasGh2Child(figure)
         manager = FigureManagerGh2Child(canvas, num)
         
     else:
@@ -131,11 +178,45 @@ def new_figure_manager_given_figure(num, figure):
     return manager        
 
 
+def request_draw(canvas):
+    """Gui side of FigureCanvasGh2.draw_idle."""
+    canvas._draw_requested = False
+    FigureCanvasQT.draw_idle(canvas)
+
+
+class TimerGh2(TimerQT):
+    """
+    Qt timer living in the gui thread.
+
+    It can be made, started and stopped from a console thread.
+    The callbacks, like the frames of an animation, run in the gui thread.
+    """
+
+    def __init__(self, *args, **kwargs):
+        gui.gui_call(TimerQT.__init__, self, *args, **kwargs)
+
+    def _timer_set_single_shot(self):
+        gui.gui_call(TimerQT._timer_set_single_shot, self)
+
+    def _timer_set_interval(self):
+        gui.gui_call(TimerQT._timer_set_interval, self)
+
+    def _timer_start(self):
+        gui.gui_call(TimerQT._timer_start, self)
+
+    def _timer_stop(self):
+        gui.gui_call(TimerQT._timer_stop, self)
+
+
 class FigureCanvasGh2(FigureCanvasAgg, FigureCanvasQT):
 
     def __init__(self, figure):
         # Must pass 'figure' as kwarg to Qt base class.
         super().__init__(figure=figure)        
+        # A draw is requested but not yet handled by the gui
+        self._draw_requested = False
+        # Reused conversion buffer of paintEvent
+        self._paint_storage = None
             
     @property
     def dev_pixel_ratio(self):
@@ -182,8 +263,8 @@ class FigureCanvasGh2(FigureCanvasAgg, FigureCanvasQT):
             bbox = Bbox([[left, bottom], [right, top]])
 
             reg: "BufferRegion" = self.copy_from_bbox(bbox)
-            buf: "numpy.ndarray" = cbook._unmultiplied_rgba8888_to_premultiplied_argb32(
-                memoryview(reg)
+            buf, self._paint_storage = unmultiplied_rgba8888_to_premultiplied_argb32(
+                memoryview(reg), self._paint_storage
             )
 
             # clear the widget canvas
@@ -202,6 +283,7 @@ class FigureCanvasGh2(FigureCanvasAgg, FigureCanvasQT):
             # leak bug in QImage under PySide on Python 3.
             # See https://github.com/thocoo/gamma-desk/issues/36
             # and https://bugreports.qt.io/browse/PYSIDE-140 .
+            # buf is a view, the storage itself is kept.
             if QT_API in ('PySide', 'PySide2'):
                 ctypes.c_long.from_address(id(buf)).value = 1
 
@@ -210,8 +292,22 @@ class FigureCanvasGh2(FigureCanvasAgg, FigureCanvasQT):
             painter.end()
             
     def draw_idle(self):
+        """
+        Request a draw in the next turn of the gui event loop.
+
+        Requests before that turn are coalesced into one draw. From a console
+        thread, it doesn't wait for the gui.
+        """
         logger.debug('calling draw_idle')
-        gui.gui_call(FigureCanvasQT.draw_idle, self) 
+        if gui.is_main():
+            FigureCanvasQT.draw_idle(self)
+
+        elif not (self._draw_requested or getattr(self, '_draw_pending', False)):
+            self._draw_requested = True
+            gui._call_no_wait(request_draw, self)
+
+    def new_timer(self, *args, **kwargs):
+        return TimerGh2(*args, **kwargs)
         
     def destroy(self, *args):
         gui.gui_call(FigureCanvasQT.destroy, self, *args)                                    
@@ -224,9 +320,10 @@ class FigureCanvasGh2(FigureCanvasAgg, FigureCanvasQT):
             bbox = self.figure.bbox
 
         # repaint uses logical pixels, not physical pixels like the renderer.
-        l, b, w, h = [int(pt / self._dpi_ratio) for pt in bbox.bounds]
+        # Only the region is converted and painted, see paintEvent.
+        l, b, w, h = [int(pt / self.dev_pixel_ratio) for pt in bbox.bounds]
         t = b + h
-        self.repaint(l, self.renderer.height / self._dpi_ratio - t, w, h)
+        gui.gui_call(self.repaint, l, int(self.renderer.height / self.dev_pixel_ratio) - t, w, h)
 
     def print_figure(self, *args, **kwargs):
         super().print_figure(*args, **kwargs)
@@ -308,6 +405,22 @@ class FigureManagerGh2(FigureManagerBase):
             pass
 
 
+class FigureCanvasGh2Child(FigureCanvasBase):
+    """
+    Canvas of a figure in a child process.
+
+    Once the figure is shown, draw_idle sends the changed data to the gui.
+    """
+
+    def draw_idle(self, *args, **kwargs):
+        #Not on every stale artist in interactive mode, only on draw() and pause()
+        if getattr(self, '_is_idle_drawing', False):
+            return
+        manager = self.manager
+        if not manager is None and not manager.remote is None:
+            manager.show()
+
+
 class FigureManagerGh2Child(FigureManagerBase):
 
     """
@@ -318,6 +431,7 @@ class FigureManagerGh2Child(FigureManagerBase):
     def __init__(self, canvas, num):
         super().__init__(canvas, num)
         self.panel = None
+        self.remote = None
     
     def show(self):
         """
@@ -325,9 +439,14 @@ class FigureManagerGh2Child(FigureManagerBase):
         For non-GUI backends, raise an exception to be caught
         by :meth:`~matplotlib.figure.Figure.show`, for an
         optional warning.
+
+        The whole figure is only sent the first time, later shows
+        only send the changed data (see remote.py).
         """
-        if gui.valid():            
-            gui.plot.show(self.canvas.figure)
+        if gui.valid():
+            if self.remote is None:
+                self.remote = RemoteFigure(self.canvas.figure, gui.plot)
+            self.remote.show()
         else:        
             raise ValueError(f'gui called from unknown thread {os.getpid()}/{threading.current_thread()}')
 
@@ -0,0 +1,243 @@
+"""
+Data level updates of figures shown from a child process.
+
+The first show of a figure from a child process pickles the whole figure
+to the gui. After that, a show only sends the data of the lines,
+collections and images which changed (set_data, set_offsets, set_array,
+...) and the changed axes limits. The gui applies them to its copy of the
+figure and calls draw_idle.
+Anything else which changed, like a new artist, a title or a line color,
+makes the whole figure to be sent again.
+
+From a child process, large arrays are moved through shared memory if
+'remote_shared_mem' is set. The call then waits until the gui has applied
+them, so the shared memory is not released before.
+"""
+
+import os
+import itertools
+
+import numpy as np
+from matplotlib.lines import Line2D
+from matplotlib.image import AxesImage
+from matplotlib.collections import Collection
+from matplotlib.colors import to_rgba
+
+from ..core.conf import config
+from ..utils.shared import SharedArray
+
+_keys = itertools.count()
+
+
+def data_artists(figure):
+    """Yield the (path, artist) of the lines, collections and images of all axes."""
+    for i, ax in enumerate(figure.axes):
+        for kind, artists in (('lines', ax.lines), ('collections', ax.collections), ('images', ax.images)):
+            for j, artist in enumerate(artists):
+                yield (i, kind, j), artist
+
+
+def artist_style(artist):
+    if isinstance(artist, Line2D):
+        return (to_rgba(artist.get_color()), artist.get_linestyle(), artist.get_linewidth(),
+            str(artist.get_marker()))
+    elif isinstance(artist, (AxesImage, Collection)):
+        return (artist.get_cmap().name,)
+    return ()
+
+
+def children_signature(artist):
+    """Identity, type and visibility of the children, any added or removed artist changes it."""
+    return tuple((id(child), type(child).__name__, child.get_visible()) for child in artist.get_children())
+
+
+def axis_signature(axis):
+    locator = axis.get_major_locator()
+    formatter = axis.get_major_formatter()
+    #Only fixed ticks, the automatic ticks follow the limits on the gui side
+    locs = getattr(locator, 'locs', None)
+    seq = getattr(formatter, 'seq', None)
+    return (type(locator).__name__, None if locs is None else tuple(np.ravel(locs)),
+        type(formatter).__name__, None if seq is None else tuple(seq),
+        any(line.get_visible() for line in axis.get_gridlines()))
+
+
+def figure_signature(figure):
+    """Everything of the figure which is not sent by a data update."""
+    signature = [tuple(figure.get_size_inches()), tuple(text.get_text() for text in figure.texts),
+        to_rgba(figure.get_facecolor()), children_signature(figure)]
+
+    for ax in figure.axes:
+        legend = ax.get_legend()
+        signature.append((type(ax).__name__, ax.get_title(), ax.get_xlabel(), ax.get_ylabel(),
+            ax.get_xscale(), ax.get_yscale(), tuple(text.get_text() for text in ax.texts),
+            None if legend is None else tuple(text.get_text() for text in legend.get_texts()),
+            to_rgba(ax.get_facecolor()), axis_signature(ax.xaxis), axis_signature(ax.yaxis),
+            children_signature(ax)))
+
+    for path, artist in data_artists(figure):
+        signature.append((path, type(artist).__name__, artist.get_label(), artist.get_visible(),
+            artist_style(artist)))
+
+    return signature
+
+
+def axes_limits(figure):
+    return [(tuple(ax.get_xlim()), tuple(ax.get_ylim())) for ax in figure.axes]
+
+
+def artist_data(artist):
+    if isinstance(artist, Line2D):
+        return ('line', np.asarray(artist.get_xdata(orig=True)), np.asarray(artist.get_ydata(orig=True)))
+    elif isinstance(artist, AxesImage):
+        return ('image', artist.get_array(), tuple(artist.get_extent()), artist.get_clim())
+    elif isinstance(artist, Collection):
+        sizes = artist.get_sizes() if hasattr(artist, 'get_sizes') else None
+        return ('collection', artist.get_offsets(), artist.get_array(), artist.get_clim(), sizes)
+
+
+def collect_updates(figure, state):
+    """
+    The data updates of the changed artists and axes limits.
+
+    :param dict state: What was sent before, updated to what is sent now.
+        'limits': the axes limits, 'arrays': the arrays of the collections.
+    """
+    updates = []
+    arrays = state.setdefault('arrays', {})
+
+    for path, artist in data_artists(figure):
+        #Collection.set_array doesn't set the stale flag
+        array_changed = isinstance(artist, Collection) and artist.get_array() is not arrays.get(path)
+
+        if artist.stale or array_changed:
+            data = artist_data(artist)
+            if data is None: continue
+            updates.append((path,) + data)
+            artist.stale = False
+            if isinstance(artist, Collection):
+                arrays[path] = artist.get_array()
+
+    #The limits after the data, setting the image extent can autoscale
+    limits = axes_limits(figure)
+    for i, (lim, sent) in enumerate(zip(limits, state.get('limits', []))):
+        if lim != sent:
+            updates.append(((i,), 'limits') + lim)
+    state['limits'] = limits
+
+    return updates
+
+
+def mark_sent(figure, state):
+    """Record the whole figure as sent."""
+    state['limits'] = axes_limits(figure)
+    state['arrays'] = dict()
+    for path, artist in data_artists(figure):
+        artist.stale = False
+        if isinstance(artist, Collection):
+            state['arrays'][path] = artist.get_array()
+
+
+def pack(updates, min_bytes=65536):
+    """Replace the large arrays by shared arrays."""
+    def pack_value(value):
+        if type(value) is np.ndarray and value.dtype != object and value.nbytes >= min_bytes:
+            return SharedArray.from_ndarray(value)
+        return value
+
+    return [update[:2] + tuple(pack_value(value) for value in update[2:]) for update in updates]
+
+
+def unpack_value(value):
+    if isinstance(value, SharedArray):
+        #The shared memory is released after the call
+        return value.ndarray.copy()
+    return value
+
+
+def apply_updates(figure, updates):
+    """Gui side, apply the data updates and redraw."""
+    artists = dict(data_artists(figure))
+
+    for path, kind, *data in updates:
+        data = [unpack_value(value) for value in data]
+
+        if kind == 'limits':
+            xlim, ylim = data
+            ax = figure.axes[path[0]]
+            ax.set_xlim(xlim)
+            ax.set_ylim(ylim)
+            continue
+
+        artist = artists[path]
+
+        if kind == 'line':
+            artist.set_data(*data)
+
+        elif kind == 'image':
+            array, extent, clim = data
+            artist.set_data(array)
+            artist.set_extent(extent)
+            artist.set_clim(*clim)
+
+        elif kind == 'collection':
+            offsets, array, clim, sizes = data
+            artist.set_offsets(offsets)
+            if not array is None:
+                artist.set_array(array)
+                artist.set_clim(*clim)
+            if not sizes is None:
+                artist.set_sizes(sizes)
+
+    figure.canvas.draw_idle()
+
+
+class RemoteFigure(object):
+    """
+    Child process side of a figure shown on a plot panel.
+
+    :param figure: The matplotlib figure
+    :param plot: The plot gui proxy
+    """
+
+    def __init__(self, figure, plot):
+        self.figure = figure
+        self.plot = plot
+        self.num = None
+        self.key = None
+        self.signature = None
+        self.state = dict()
+
+    def show(self):
+        """Send the data updates, or the whole figure if needed."""
+        if self.num is None or figure_signature(self.figure) != self.signature or not self.update():
+            self.send()
+
+    def send(self):
+        """Send the whole figure."""
+        from ..panels.matplot.plotproxy import FigureBox
+
+        #To check on the gui side that the panel still shows this figure
+        self.key = f'{os.getpid()}-{next(_keys)}'
+        self.figure._gdesk_remote_key = self.key
+        self.num = self.plot.show_figure_box(FigureBox(self.figure), panid=self.num)
+        self.signature = figure_signature(self.figure)
+        mark_sent(self.figure, self.state)
+
+    def update(self):
+        """
+        Send the data updates.
+
+        :returns: False if the figure has to be sent again.
+        """
+        updates = collect_updates(self.figure, self.state)
+
+        if not updates:
+            return True
+
+        matplotlib_config = config.get('matplotlib', {})
+
+        if matplotlib_config.get('remote_shared_mem', False):
+            updates = pack(updates, matplotlib_config.get('remote_shared_min_bytes', 65536))
+
+        return self.plot.update_figure(self.num, self.key, updates)
@@ -9,9 +9,9 @@ from pathlib import Path
 from qtpy import QtCore, QtGui, QtWidgets
 
 from qtpy.QtCore import Qt, QTimer, QSize
-from qtpy.QtGui import QFont, QFontMetrics, QTextCursor, QTextOption, QPainter, QTextCharFormat, QPalette
+from qtpy.QtGui import QFont, QFontMetrics, QTextCursor, QTextOption, QPainter, QPalette
 from qtpy.QtWidgets import (QApplication, QAction, QMainWindow, QPlainTextEdit, QSplitter, QVBoxLayout, QLineEdit, QLabel,
-    QMessageBox, QTextEdit, QWidget, QStyle, QStyleFactory, QApplication, QCompleter, QComboBox)
+    QMessageBox, QTextEdit, QWidget, QStyle, QStyleFactory, QApplication, QCompleter, QComboBox, QAbstractScrollArea)
 
 from ... import config, gui, use
 from ...core import tasks
@@ -22,13 +22,13 @@ from ...dialogs.base import messageBox
 from ...dialogs.editpaths import EditPaths
 from ...utils.syntax_light import analyze_python, ansi_highlight
 from ...utils.ansi_code_processor import QtAnsiCodeProcessor
+from ...utils.linestore import LineStore
 from ...gcore.utils import getMenuAction
 from ...core import stdinout
 
 respath = Path(config['respath'])
 logger = logging.getLogger(__name__)
 
-MAXCHARPERLINE = 10000  #Only for ansi mode
 #PREFIXWIDTH = 30  # width of the left side line numbers
 
 ANSI_ESCAPE_SYNTAX_HIGHLIGHT = {
@@ -160,6 +160,8 @@ class StdInputPanel(QPlainTextEdit):
 
         self.prior_cmd_id = None
         self.hist_prefix = None
+        self.completion_request = 0
+        self.completion_text = None
 
         self.configure(config)
         self.lineNumberArea=LineNumberArea(self)
@@ -306,7 +308,12 @@ class StdInputPanel(QPlainTextEdit):
 
         max_items = config['console']['max_complete']        
         
-        self.task.call_func(Shell.get_completer_data, (self.part, max_items, wild, wsmode), self.response_to_autocomplete, queue='flow')
+        #The response is handled when it arrives, typing continues meanwhile
+        self.completion_request += 1
+        self.completion_text = current_text
+        request = self.completion_request
+        callback = lambda tag, error_code, items: self.response_to_autocomplete(tag, error_code, items, request)
+        self.task.call_func(Shell.get_completer_data, (self.part, max_items, wild, wsmode), callback, queue='flow')
         
 
     def moveCursorToEndOfBlock(self):
@@ -447,8 +454,16 @@ class StdInputPanel(QPlainTextEdit):
 
         self.lineNumberArea.update()
 
-    def response_to_autocomplete(self, tag, error_code, items):
-        if len(items) == 0:
+    def response_to_autocomplete(self, tag, error_code, items, request=None):
+        if not request is None and request != self.completion_request:
+            #A newer completion was requested
+            return
+
+        if self.toPlainText() != self.completion_text:
+            #The text was edited while completing
+            return
+
+        if error_code != 0 or not items:
             return
 
         if len(items) == 1:
@@ -515,17 +530,38 @@ class StdInputPanel(QPlainTextEdit):
         self.moveCursor(QTextCursor.End)
 
 
-class StdPlainOutputPanel(QPlainTextEdit):
+class StdPlainOutputPanel(QAbstractScrollArea):
 
-    """Show entered code and the generated output."""
+    """Show entered code and the generated output.
+
+    The text is kept in a LineStore, only the visible lines are painted.
+    The vertical scrollbar counts lines, the horizontal one characters.
+    """
 
     def __init__(self, parent, stdout_queue):
         super().__init__(parent = parent)
         self.stdout_queue = stdout_queue
-        self.setReadOnly(True)
-        self._ansi_processor = None
+        self._ansi_processor = QtAnsiCodeProcessor()
         self.auto_scroll = True
 
+        self.store = LineStore()
+        self.styleFormats = dict()
+        self.rows = []
+        self.anchor = None
+        self.cursor = None
+        self.findText = ''
+
+        # Text received from the stdout queue, but not yet rendered
+        self.backlog = stdinout.StreamRing(config['console'].get('render_backlog', 2000000))
+        self.render_budget = config['console'].get('render_budget', 100000)
+
+        self.backlogTimer = QTimer(self)
+        self.backlogTimer.setSingleShot(True)
+        self.backlogTimer.setInterval(20)
+        self.backlogTimer.timeout.connect(self.flush)
+
+        self.viewport().setCursor(Qt.IBeamCursor)
+        self.setFocusPolicy(Qt.ClickFocus)
         self.configure(config)
 
     @property
@@ -534,26 +570,54 @@ class StdPlainOutputPanel(QPlainTextEdit):
 
     def configure(self, config):
         console_font = QFont(config['console']['font'], pointSize=config['console']['fontsize'])
+        console_font.setStyleHint(QFont.TypeWriter)
         self.setFont(console_font)
-
-        if config['console']['wrap']:
-            self.setWordWrapMode(QTextOption.WordWrap)
+        self.wrap = config['console']['wrap']
+        self.store.max_lines = config['console']['maxblockcount']
+        self.updateScrollBars()
+
+    def setFont(self, font):
+        super().setFont(font)
+        metrics = QtGui.QFontMetricsF(font)
+        self.charWidth = metrics.horizontalAdvance('M')
+        self.lineHeight = metrics.lineSpacing()
+        self.ascent = metrics.ascent()
+        self.styleFormats.clear()
+
+    def styleFormat(self, style):
+        """Return the (foreground, background, font) for a style id of the store."""
+        if style in self.styleFormats:
+            return self.styleFormats[style]
+
+        state = self.store.styles[style]
+        font = self.font()
+        if state is None:
+            fmt = (None, None, font)
         else:
-            self.setWordWrapMode(QTextOption.NoWrap)
+            foreground, background, intensity, bold, italic, underline = state
+            font = QFont(font)
+            font.setBold(bold)
+            font.setItalic(italic)
+            font.setUnderline(underline)
+            fmt = (self._ansi_processor.get_color(foreground, intensity),
+                   self._ansi_processor.get_color(background, intensity), font)
 
-        self.setMaximumBlockCount(config['console']['maxblockcount'])
+        self.styleFormats[style] = fmt
+        return fmt
 
     def flush(self):
-        text = ''
+        received = False
+        
         while not self.stdout_queue.empty():
             data = self.stdout_queue.get()
+            received = True
             if isinstance(data, tuple):
-                ttype, content = data
+                self.backlog.put(*data)
             else:
-                ttype = 'raw'
-                content = data
-            text += content
-        if not text == '':
+                self.backlog.put('raw', data)
+                
+        # Render only a limited amount per call, the rest on the next call
+        for ttype, text in self.backlog.take(self.render_budget):
             if ttype == 'raw':
                 self.addText(text)
             elif ttype == 'error':
@@ -561,93 +625,332 @@ class StdPlainOutputPanel(QPlainTextEdit):
                 self.panel.show_me()
             elif ttype == 'ansi':
                 self.addAnsiText(text)
-                #Some bug, reset format to normal
-                #self.addAnsiText('\n')
+                
+        # Poll once more, the flush request can overtake the text on the queue
+        if received or len(self.backlog) > 0:
+            self.backlogTimer.start()
 
     def addText(self, text):
-        cursor=self.textCursor()
-        cursor.movePosition(QTextCursor.End)
-        cursor.insertText(text)
-        if self.auto_scroll:
-            self.moveCursor(QTextCursor.End)
+        first = self.store.first
+        self.store.write(text)
+        self.textChanged(first)
 
     def addAnsiText(self, text):
-        cursor = self.textCursor()
-        cursor.movePosition(QTextCursor.End)
-        self._insert_ansi_escape_text(cursor, text)
+        first = self.store.first
+        self._write_ansi_escape_text(text)
+        self.textChanged(first)
+
+    def _write_ansi_escape_text(self, text):
+        store = self.store
+
+        for act in self._ansi_processor.feed(text):
+            if act.action == 'text':
+                store.write(act.text, store.intern(act.state))
+
+            # Unlike real terminal emulators, we don't distinguish
+            # between the screen and the scrollback buffer. A screen
+            # erase request clears everything.
+            elif act.action == 'erase' and act.area == 'screen':
+                store.clear()
+
+            elif act.action == 'erase' and act.area == 'line':
+                store.erase_line(act.erase_to)
+
+            # BS and CR are treated as a change in print
+            # position, rather than a backwards character
+            # deletion for output equivalence with (I)Python
+            # terminal.
+            elif act.action == 'carriage-return':
+                store.carriage_return()
+
+            elif act.action == 'backspace':
+                store.backspace()
+
+            elif act.action == 'beep':
+                gui.qapp.beep()
+
+            elif act.action == 'set-title':
+                self.panel.long_title = act.title
+
+    def textChanged(self, first):
+        dropped = self.store.first - first
+        vbar = self.verticalScrollBar()
+        value = vbar.value()
+        self.updateScrollBars()
         if self.auto_scroll:
-            self.moveCursor(QTextCursor.End)
-
-    def _insert_ansi_escape_text(self, cursor, text):
-        cursor.beginEditBlock()
-
-        if self._ansi_processor == None:
-            self._ansi_processor = QtAnsiCodeProcessor()
-
-        for substring in self._ansi_processor.split_string(text):
-            for act in self._ansi_processor.actions:
-
-                # Unlike real terminal emulators, we don't distinguish
-                # between the screen and the scrollback buffer. A screen
-                # erase request clears everything.
-                if act.action == 'erase' and act.area == 'screen':
-                    cursor.select(QTextCursor.Document)
-                    cursor.removeSelectedText()
-
-                # Simulate a form feed by scrolling just past the last line.
-                elif act.action == 'scroll' and act.unit == 'page':
-                    cursor.insertText('\n')
-                    cursor.endEditBlock()
-                    self._set_top_cursor(cursor)
-                    cursor.joinPreviousEditBlock()
-                    cursor.deletePreviousChar()
-
-                elif act.action == 'carriage-return':
-                    cursor.movePosition(
-                        QTextCursor.StartOfLine, QTextCursor.KeepAnchor)
-
-                elif act.action == 'beep':
-                    gui.qapp.beep()
-
-                elif act.action == 'backspace':
-                    cursor.movePosition(
-                        QTextCursor.PreviousCharacter, QTextCursor.KeepAnchor)
-
-                elif act.action == 'newline':
-                    cursor.movePosition(QTextCursor.EndOfLine)
-                    
-                elif act.action == 'set-title':
-                    self.panel.long_title = act.title
-
-            format = self._ansi_processor.get_format()
-
-            # This doesn't seem to work with special characters
-            # backspace seems to disable the output, no recovery
-
-            selection = cursor.selectedText()
-            if len(selection) == 0:
-                if substring is None:
-                    pass
-                elif len(substring) > MAXCHARPERLINE:
-                    cursor.insertText(substring[:MAXCHARPERLINE] + "...%d chars not displayed" % (len(substring) - MAXCHARPERLINE), format)
-                else:
-                    cursor.insertText(substring, format)
-
-            elif substring is not None:
-                # BS and CR are treated as a change in print
-                # position, rather than a backwards character
-                # deletion for output equivalence with (I)Python
-                # terminal.
-                if len(substring) >= len(selection):
-                    cursor.insertText(substring, format)
-                else:
-                    old_text = selection[len(substring):]
-                    cursor.insertText(substring + old_text, format)
-                    cursor.movePosition(QTextCursor.PreviousCharacter,
-                           QTextCursor.KeepAnchor, len(old_text))
+            vbar.setValue(vbar.maximum())
+        elif dropped > 0:
+            vbar.setValue(value - dropped)
+        self.viewport().update()
+
+    def clear(self):
+        self.store.clear()
+        self.anchor = self.cursor = None
+        self.updateScrollBars()
+        self.viewport().update()
+
+    def toPlainText(self):
+        return self.store.text()
+
+    def visibleColumns(self):
+        return max(int(self.viewport().width() / self.charWidth), 1)
+
+    def visibleLines(self):
+        return max(int(self.viewport().height() / self.lineHeight), 1)
+
+    def lineRows(self, lineno):
+        """Number of rows a line takes."""
+        if not self.wrap:
+            return 1
+        columns = self.visibleColumns()
+        return max((self.store.line_length(lineno) + columns - 1) // columns, 1)
+
+    def updateScrollBars(self):
+        store = self.store
+        visible = self.visibleLines()
+
+        if self.wrap:
+            # Find the top line for which the last line is still visible
+            rows = 0
+            top = store.last + 1
+            while top > store.first and rows + self.lineRows(top - 1) <= visible:
+                top -= 1
+                rows += self.lineRows(top)
+            top = min(top, store.last)
+            self.horizontalScrollBar().setRange(0, 0)
+
+        else:
+            top = max(store.last + 1 - visible, store.first)
+            columns = self.visibleColumns()
+            width = max(store.width, store.length)
+            self.horizontalScrollBar().setRange(0, max(width + 1 - columns, 0))
+            self.horizontalScrollBar().setPageStep(columns)
+
+        vbar = self.verticalScrollBar()
+        vbar.setRange(0, top - store.first)
+        vbar.setPageStep(visible)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        atEnd = self.verticalScrollBar().value() == self.verticalScrollBar().maximum()
+        self.updateScrollBars()
+        if atEnd:
+            self.verticalScrollBar().setValue(self.verticalScrollBar().maximum())
+
+    def layoutRows(self):
+        """List of (line number, first column) of the visible rows."""
+        store = self.store
+        rows = []
+        visible = self.visibleLines() + 1
+        lineno = store.first + self.verticalScrollBar().value()
+
+        if self.wrap:
+            columns = self.visibleColumns()
+            while lineno <= store.last and len(rows) < visible:
+                for row in range(self.lineRows(lineno)):
+                    rows.append((lineno, row * columns))
+                lineno += 1
+            del rows[visible:]
+
+        else:
+            column = self.horizontalScrollBar().value()
+            stop = min(lineno + visible, store.last + 1)
+            rows = [(lineno, column) for lineno in range(lineno, stop)]
+
+        return rows
+
+    def selectionRange(self):
+        if self.anchor is None or self.cursor is None or self.anchor == self.cursor:
+            return None
+        return (min(self.anchor, self.cursor), max(self.anchor, self.cursor))
+
+    def paintEvent(self, event):
+        painter = QPainter(self.viewport())
+        defaultPen = self.palette().color(QPalette.Text)
+        highlight = self.palette().color(QPalette.Highlight)
+        highlightedText = self.palette().color(QPalette.HighlightedText)
+        selection = self.selectionRange()
+        columns = self.visibleColumns() + 1
+        charWidth = self.charWidth
+
+        self.rows = self.layoutRows()
+
+        for index, (lineno, column) in enumerate(self.rows):
+            y = index * self.lineHeight
+            stop = column + columns
+
+            if selection is not None and selection[0][0] <= lineno <= selection[1][0]:
+                start = selection[0][1] if lineno == selection[0][0] else 0
+                end = selection[1][1] if lineno == selection[1][0] else stop + 1
+                start, end = max(start, column), min(end, stop + 1)
+                if end > start:
+                    painter.fillRect(QtCore.QRectF((start - column) * charWidth, y,
+                        (end - start) * charWidth, self.lineHeight), highlight)
+            else:
+                start = end = column
+
+            pos = 0
+            for text, style in self.store.fragments(lineno):
+                a, b = max(pos, column), min(pos + len(text), stop)
+                if b > a:
+                    foreground, background, font = self.styleFormat(style)
+                    x = (a - column) * charWidth
+                    if background is not None:
+                        painter.fillRect(QtCore.QRectF(x, y, (b - a) * charWidth, self.lineHeight), background)
+                    painter.setFont(font)
+                    painter.setPen(foreground if foreground is not None else defaultPen)
+                    painter.drawText(QtCore.QPointF(x, y + self.ascent), text[a - pos:b - pos])
+                    if start < b and end > a:
+                        # Redraw the selected part in the highlight color
+                        sa, sb = max(a, start), min(b, end)
+                        painter.setPen(highlightedText)
+                        painter.drawText(QtCore.QPointF((sa - column) * charWidth, y + self.ascent), text[sa - pos:sb - pos])
+                pos += len(text)
+                if pos >= stop:
+                    break
+
+        painter.end()
+
+    def positionAt(self, point):
+        """Return (line number, column) at a point of the viewport."""
+        if not self.rows:
+            self.rows = self.layoutRows()
+        if not self.rows:
+            return (self.store.last, 0)
+        index = int(point.y() / self.lineHeight)
+        index = min(max(index, 0), len(self.rows) - 1)
+        lineno, column = self.rows[index]
+        column += max(int(round(point.x() / self.charWidth)), 0)
+        if self.wrap and index + 1 < len(self.rows) and self.rows[index + 1][0] == lineno:
+            column = min(column, self.rows[index + 1][1])
+        return (lineno, min(column, self.store.line_length(lineno)))
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            position = self.positionAt(event.pos())
+            if not (event.modifiers() & Qt.ShiftModifier and self.anchor is not None):
+                self.anchor = position
+            self.cursor = position
+            self.viewport().update()
+        super().mousePressEvent(event)
+
+    def mouseMoveEvent(self, event):
+        if event.buttons() & Qt.LeftButton and self.anchor is not None:
+            if event.pos().y() < 0:
+                self.verticalScrollBar().triggerAction(QtWidgets.QAbstractSlider.SliderSingleStepSub)
+            elif event.pos().y() > self.viewport().height():
+                self.verticalScrollBar().triggerAction(QtWidgets.QAbstractSlider.SliderSingleStepAdd)
+            self.rows = self.layoutRows()
+            self.cursor = self.positionAt(event.pos())
+            self.viewport().update()
+
+    def mouseDoubleClickEvent(self, event):
+        lineno, column = self.positionAt(event.pos())
+        line = self.store.line(lineno)
+        start = stop = column
+        while start > 0 and (line[start - 1].isalnum() or line[start - 1] == '_'):
+            start -= 1
+        while stop < len(line) and (line[stop].isalnum() or line[stop] == '_'):
+            stop += 1
+        self.anchor, self.cursor = (lineno, start), (lineno, stop)
+        self.viewport().update()
+
+    def selectedText(self):
+        selection = self.selectionRange()
+        if selection is None:
+            return ''
+        (l0, c0), (l1, c1) = selection
+        l0 = max(l0, self.store.first)
+        if l0 > l1:
+            return ''
+        lines = [self.store.line(lineno) for lineno in range(l0, l1 + 1)]
+        lines[-1] = lines[-1][:c1]
+        if l0 == selection[0][0]:
+            lines[0] = lines[0][c0:]
+        return '\n'.join(lines)
+
+    def copy(self):
+        text = self.selectedText()
+        if text:
+            QApplication.clipboard().setText(text)
+
+    def selectAll(self):
+        self.anchor = (self.store.first, 0)
+        self.cursor = (self.store.last, self.store.length)
+        self.viewport().update()
+
+    def find(self, text=None, backward=False):
+        """Select the next occurrence of text and scroll to it."""
+        if text is not None:
+            self.findText = text
+        if not self.findText:
+            return False
+
+        selection = self.selectionRange()
+        if selection is None:
+            start = None
+        else:
+            start = selection[0] if backward else selection[1]
+
+        found = self.store.find(self.findText, start, backward)
+        if found is None:
+            return False
+
+        lineno, column, length = found
+        self.anchor, self.cursor = (lineno, column), (lineno, column + length)
+        self.ensureVisible(lineno, column, length)
+        self.viewport().update()
+        return True
+
+    def ensureVisible(self, lineno, column=0, length=0):
+        vbar = self.verticalScrollBar()
+        top = self.store.first + vbar.value()
+        visible = self.visibleLines()
+        if not top <= lineno < top + visible:
+            vbar.setValue(lineno - self.store.first - visible // 3)
+        if not self.wrap:
+            hbar = self.horizontalScrollBar()
+            columns = self.visibleColumns()
+            if not (hbar.value() <= column and column + length <= hbar.value() + columns):
+                hbar.setValue(column - columns // 3)
 
-        cursor.setBlockCharFormat(QTextCharFormat())
-        cursor.endEditBlock()
+    def keyPressEvent(self, event):
+        if event.matches(QtGui.QKeySequence.Copy):
+            self.copy()
+        elif event.matches(QtGui.QKeySequence.SelectAll):
+            self.selectAll()
+        elif event.matches(QtGui.QKeySequence.FindNext):
+            self.find()
+        elif event.matches(QtGui.QKeySequence.FindPrevious):
+            self.find(backward=True)
+        elif event.key() == Qt.Key_Home and event.modifiers() & Qt.ControlModifier:
+            self.verticalScrollBar().setValue(0)
+        elif event.key() == Qt.Key_End and event.modifiers() & Qt.ControlModifier:
+            self.verticalScrollBar().setValue(self.verticalScrollBar().maximum())
+        else:
+            super().keyPressEvent(event)
+
+    def wheelEvent(self, event):
+        if event.modifiers() & Qt.ControlModifier:
+            font = self.font()
+            if event.angleDelta().y() < 0:
+                font.setPointSize(max(font.pointSize() - 1, 1))
+            elif event.angleDelta().y() > 0:
+                font.setPointSize(font.pointSize() + 1)
+            self.setFont(font)
+            self.updateScrollBars()
+            self.viewport().update()
+        else:
+            super().wheelEvent(event)
+
+    def contextMenuEvent(self, event):
+        menu = QtWidgets.QMenu(self)
+        menu.addAction('Copy', self.copy).setEnabled(self.selectionRange() is not None)
+        menu.addAction('Select All', self.selectAll)
+        menu.addSeparator()
+        menu.addAction('Find...', self.panel.findText)
+        menu.addAction('Clear', self.clear)
+        menu.exec_(event.globalPos())
         
     def set_mode(self, mode='interprete'):
         pass 
@@ -668,6 +971,7 @@ class StdioFrame(QWidget):
         self.stdInputPanel = StdInputPanel(self, task, self.stdOutputPanel)
 
         task.set_flusher(self.stdOutputPanel.flush)
+        task.set_timing_logger(gui.qapp.history.logtiming)
 
         splitter = QSplitter(Qt.Vertical, self)
         splitter.addWidget(self.stdOutputPanel)
@@ -781,6 +1085,11 @@ class Console(BasePanel):
             statusTip="Print the trace of the current execution frame")
         self.addMenuItem(self.executionMenu, 'Print Locals', self.stdio.task.print_locals,
             statusTip="Print the locals of the current namespace")
+        self.addMenuItem(self.executionMenu, 'Start Sampling', self.startSampling,
+            statusTip="Sample the stack of the running commands at a fixed interval",
+            icon = QtGui.QIcon(str(respath / 'icons' / 'px16' / 'time_red.png')))
+        self.addMenuItem(self.executionMenu, 'Stop Sampling', self.stopSampling,
+            statusTip="Stop sampling and show the profile in a sampler panel")
         self.addMenuItem(self.executionMenu, 'Sync Break', self.syncBreak,
             statusTip="Send a synchronous break, tracing should be active",
             icon = QtGui.QIcon(str(respath / 'icons' / 'px16' / 'cog_stop.png')))
@@ -815,6 +1124,9 @@ class Console(BasePanel):
         self.addMenuItem(self.viewMenu, 'Auto Scroll', self.toggleAutoScroll,
             checkcall=lambda: self.stdio.stdOutputPanel.auto_scroll)
             
+        self.addMenuItem(self.viewMenu, 'Find...', self.findText,
+            statusTip="Find text in the output, F3 for the next one",
+            icon = QtGui.QIcon(str(respath / 'icons' / 'px16' / 'find.png')))
         self.addMenuItem(self.viewMenu, 'Clear', self.clear)
 
         scripMenu = self.menuBar().addMenu("&Script")
@@ -911,6 +1223,18 @@ class Console(BasePanel):
         if gui.dialog.question(f'Kill this following Process?\nExecutable: {proc.exe()}\nProcess id: {proc.pid} Cpu: {proc.cpu_percent(0.1)}% Mem: {mem:.4g}MB'):
             self.stdio.task.kill()
 
+    def startSampling(self):
+        self.task.start_sampling()
+
+    def stopSampling(self):
+        def callback(mode, error_code, result):
+            if error_code != 0:
+                logger.warning(result)
+                return
+            gui.sampler.show(result, f'Samples of {self.long_title}')
+
+        self.task.stop_sampling(callback)
+
     def syncBreak(self):
         self.stdio.task.sync_break()
 
@@ -1026,6 +1350,14 @@ class Console(BasePanel):
     def toggleAutoScroll(self):
         self.stdio.stdOutputPanel.auto_scroll = not self.stdio.stdOutputPanel.auto_scroll
             
+    def findText(self):
+        outputPanel = self.stdio.stdOutputPanel
+        text, ok = QtWidgets.QInputDialog.getText(self, 'Find', 'Text:', text=outputPanel.findText)
+        if not ok or not text:
+            return
+        if not outputPanel.find(text):
+            self.statusBar().showMessage(f'{text!r} not found', 3000)
+
     def clear(self):
         self.stdio.stdOutputPanel.clear()
 
@@ -127,6 +127,13 @@ class ConsoleGuiProxy(GuiProxyBase):
         return old_mode
 
 
+    @StaticGuiCall       
+    def show_progress(message, panid):
+        """Show a progress message in the status bar of a console."""
+        console = gui.qapp.panels['console'][panid]
+        console.statusBar().showMessage(message, 5000)
+
+
     @StaticGuiCall       
     def release_side_thread(panid):
         task = gui.qapp.panels['console'][panid].task
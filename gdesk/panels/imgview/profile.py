@@ -7,7 +7,7 @@ from qtpy.QtGui import QPen, QColor
 
 from ...graphics.plotview import PlotView
 from ...graphics.rulers import TickedRuler, Axis
-from ...graphics.items import createCurve
+from ...graphics.items import createCurve, setCurveStyle, LodCurve
 
 from ...utils.ticks import tickValues
 
@@ -108,7 +108,7 @@ class ProfilerPanel(QtWidgets.QWidget):
         top = bottom = left = right = None
         
         for mask, curve in self.profiles.items():
-            r = curve.boundingRect()
+            r = curve.dataRect() if isinstance(curve, LodCurve) else curve.boundingRect()
             top = r.top() if top is None else min(r.top(), top)
             bottom = r.bottom() if bottom is None else max(r.bottom(), bottom)
             left = r.left() if left is None else min(r.left(), left)
@@ -250,13 +250,13 @@ class ProfilerPanel(QtWidgets.QWidget):
 
     
     def drawMaskProfiles(self, roi_only=False, rois=None):        
-        self.removeMaskProfiles(roi_only, rois)
-            
         if self.direction == 0:
             axis = 0
         else:
             axis = 1
             
+        drawn = set()
+            
         for mask_name, chanstat in self.chanstats.items():
             if roi_only and not \
                 (mask_name.startswith('roi.') or (not rois is None and mask_name in rois)):
@@ -267,14 +267,33 @@ class ProfilerPanel(QtWidgets.QWidget):
             x, y = chanstat.profile(axis)
             color = chanstat.plot_color
             
-            profile = self.createCurve(x, y, color=color, z=1)
+            profile = self.profiles.get(mask_name)
+            
+            if isinstance(profile, LodCurve) and isinstance(x, np.ndarray) and isinstance(y, np.ndarray):
+                #Update the item in place, the scene is not changed
+                if self.direction == 0:
+                    profile.set_data(x, y)
+                else:
+                    profile.set_data(y, x)
+                setCurveStyle(profile, QtCore.Qt.blue if color is None else color, None)
+                
+            else:
+                if not profile is None:
+                    self.scene.removeItem(profile)
+                profile = self.createCurve(x, y, color=color, z=1)
+                self.scene.addItem(profile)
+                self.profiles[mask_name] = profile
             
             if chanstat.dim:
                 profile.setZValue(0)
                 profile.setOpacity(0.25)                
+            else:
+                profile.setZValue(1)
+                profile.setOpacity(1)
                 
-            self.scene.addItem(profile)
-            self.profiles[mask_name] = profile
+            drawn.add(mask_name)
+            
+        self.removeMaskProfiles(roi_only, rois, keep=drawn)
 
                 
     def selectProfiles(self, masksToSelect):
@@ -289,13 +308,15 @@ class ProfilerPanel(QtWidgets.QWidget):
         self.view.refresh()
             
             
-    def removeMaskProfiles(self, roi_only=False, rois=None):
+    def removeMaskProfiles(self, roi_only=False, rois=None, keep=()):
         profile_names = list(self.profiles)
         
         for mask_name in profile_names:
             if roi_only and not \
                 (mask_name.startswith('roi.') or (not rois is None and mask_name in rois)):
                 continue
+            if mask_name in keep:
+                continue
             profile = self.profiles[mask_name]
             self.scene.removeItem(profile)   
             self.profiles.pop(mask_name)
@@ -309,7 +330,7 @@ class ProfilerPanel(QtWidgets.QWidget):
             if self.direction == 0:
                 curve = createCurve(x, y, color, z, None, zero_ends=False)
             elif self.direction == 90:
-                curve = createCurve(y, x, color, z, None, zero_ends=False)
+                curve = createCurve(y, x, color, z, None, zero_ends=False, axis=1)
         else:
             #first create a Path        
             path = QtGui.QPainterPath()
@@ -7,7 +7,8 @@ from qtpy import QtCore, QtGui, QtWidgets
 from ... import config, gui
 
 from ...graphics.view import SceneView
-from ...graphics.items import createCurve, Indicator
+from ...graphics.items import LodCurve, StepCurve, createCurve, createStepCurve, setCurveStyle, Indicator
+from ...graphics.functions import stepVertices
 from ...graphics.rulers import TickedRuler, Grid
 from ..base import BasePanel, CheckMenu
 
@@ -174,23 +175,42 @@ class LevelPlot(QtWidgets.QWidget):
             self.curves.pop(curveid)
         
     def plot_curve(self, curveid=None, x=[], y=[], color = None, fill=50, dim=False, zero_ends=True):
-        oldcolor = None
+        return self.plot_item(curveid, color, fill, dim, LodCurve,
+            lambda color: createCurve(x, y, color = color, fill=fill, zero_ends=zero_ends),
+            lambda curve: curve.set_data(np.asarray(x), np.asarray(y), zero_ends))
+
+    def plot_steps(self, curveid=None, starts=[], values=[], stepwidth=1, color = None, fill=50, dim=False, zero_ends=True):
+        """Plot values as steps from starts to starts + stepwidth."""
+        return self.plot_item(curveid, color, fill, dim, StepCurve,
+            lambda color: createStepCurve(starts, values, stepwidth, color = color, fill=fill, zero_ends=zero_ends),
+            lambda curve: curve.set_steps(starts, values, stepwidth, zero_ends))
+
+    def plot_item(self, curveid, color, fill, dim, kind, create, update):
+        oldcurve = None
         
         if curveid in self.curves.keys():
             oldcurve = self.curves[curveid]
-            oldcolor = oldcurve.pen().color()
-            self.scene.removeItem(oldcurve)
             
         elif curveid is None:            
             curveid = len(self.curves)            
 
         if color is None:
-            if oldcolor is None:
+            if oldcurve is None:
                 color = COLORS[curveid]
             else:
-                color = oldcolor
+                color = oldcurve.pen().color()
+
+        if not oldcurve is None and type(oldcurve) is not kind:
+            self.scene.removeItem(oldcurve)
+            oldcurve = None
             
-        curve = createCurve(x, y, color = color, fill=fill, zero_ends=zero_ends)        
+        if oldcurve is None:
+            curve = create(color)
+        else:
+            #Update the item in place, the scene is not changed
+            curve = oldcurve
+            update(curve)
+            setCurveStyle(curve, color, fill)
         
         if dim:
             curve.setZValue(0)
@@ -198,9 +218,11 @@ class LevelPlot(QtWidgets.QWidget):
             
         else:
             curve.setZValue(0.5)            
+            curve.setOpacity(1)
         
-        self.curves[curveid] = curve                     
-        self.scene.addItem(curve)
+        if oldcurve is None:
+            self.curves[curveid] = curve                     
+            self.scene.addItem(curve)
         
         return curveid
         
@@ -213,10 +235,10 @@ class LevelPlot(QtWidgets.QWidget):
     def zoomFull(self, enforce_ymin=None):
         
         if len(self.curves) > 0:
-            self.xmin = min(min(curve.xvector) for curve in self.curves.values())
-            self.xmax = max(max(curve.xvector) for curve in self.curves.values())
-            self.ymin = min(min(curve.yvector) for curve in self.curves.values())
-            self.ymax = max(max(curve.yvector) for curve in self.curves.values())
+            self.xmin = min(curve.xvector.min() for curve in self.curves.values())
+            self.xmax = max(curve.xvector.max() for curve in self.curves.values())
+            self.ymin = min(curve.yvector.min() for curve in self.curves.values())
+            self.ymax = max(curve.yvector.max() for curve in self.curves.values())
 
         else:
             self.xmin = 0
@@ -352,11 +374,7 @@ class Levels(QtWidgets.QWidget):
        
     @staticmethod       
     def xy_as_steps(xvector, yvector, stepwidth):
-        yvector = yvector.reshape((yvector.shape[0], 1)).dot(np.ones((1, 2))).reshape(yvector.shape[0]*2)            
-        xvector = xvector.reshape((xvector.shape[0], 1)).dot(np.ones((1, 2)))
-        xvector[:,1] += stepwidth
-        xvector = xvector.flatten()
-        return xvector, yvector  
+        return stepVertices(xvector, yvector, stepwidth)
         
     def updateActiveHist(self):
         self.updateHistOfPanel(None)
@@ -428,8 +446,7 @@ class Levels(QtWidgets.QWidget):
             starts = chanstat.starts(stepmult)   
             if len(starts) == 0: continue
             stepsize = chanstat.stepsize(stepmult)
-            barstarts, histbar = self.xy_as_steps(starts, hist, stepsize)
-            self.levelplot.plot_curve(clr, barstarts, histbar, color, dim=dim, fill=fill, zero_ends=zero_ends)
+            self.levelplot.plot_steps(clr, starts, hist, stepsize, color, dim=dim, fill=fill, zero_ends=zero_ends)
             
             if self.panel.gaussview:
                 import scipy.signal
@@ -446,9 +463,7 @@ class Levels(QtWidgets.QWidget):
                 if self.panel.log:
                     yvec = semilog(yvec)
                     
-                xvec, yvec = self.xy_as_steps(xvec, yvec, stepsize)
-                
-                self.levelplot.plot_curve(f'{clr}_gv', xvec, yvec, color, fill=0)
+                self.levelplot.plot_steps(f'{clr}_gv', xvec, yvec, stepsize, color, fill=0)
                     
         self.levelplot.set_logscale(self.panel.log and not self.panel.cummulative)
         
@@ -0,0 +1,6 @@
+from .proxy import LinesGuiProxy
+
+from ... import config
+
+if config.get('qapp', False):
+    from .panel import LinesPanel
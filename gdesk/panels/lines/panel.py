@@ -0,0 +1,395 @@
+"""
+Line plot panel for streaming data.
+
+Every series keeps its points in ring buffers. The received points are
+only added and drawn at the next refresh, at most every 'refresh_interval'
+seconds. The curves are LodCurve items, so a long series is drawn as a
+min/max envelope per pixel column.
+
+The scene coordinates are in the units of the left y axis. The curves and
+labels of the other axes get a transform from their units to the scene.
+"""
+
+import time
+from pathlib import Path
+
+import numpy as np
+
+from qtpy import QtCore, QtGui, QtWidgets
+
+from ... import config
+from ...panels.base import BasePanel, CheckMenu
+from ...graphics.plotview import PlotView
+from ...graphics.rulers import TickedRuler, Axis
+from ...graphics.items import LodCurve, setCurveStyle
+from ...graphics.functions import intColor, mkColor
+from ...graphics.lod import is_sorted
+from ...utils.ringbuffer import RingBuffer
+from ...utils.ticks import tickValues
+
+respath = Path(config['respath'])
+
+#Pixels of the x ruler at the bottom and of each y axis
+RULER_HEIGHT = 20
+AXIS_WIDTH = 50
+
+
+class Series(object):
+
+    def __init__(self, name, capacity, axis=0, color=None):
+        self.name = name
+        self.x = RingBuffer(capacity)
+        self.y = RingBuffer(capacity)
+        self.axis = axis
+        self.color = color
+        self.sorted = True
+        self.incoming = []
+        self.curve = None
+
+    def add_incoming(self):
+        """Move the received points to the ring buffers, returns the number of points."""
+        count = 0
+        for x, y in self.incoming:
+            if x is None:
+                x = np.arange(self.x.total, self.x.total + len(y), dtype='f8')
+            if self.sorted:
+                self.sorted = is_sorted(x) and (len(self.x) == 0 or len(x) == 0 or x[0] >= self.x.view()[-1])
+            self.x.append(x)
+            self.y.append(y)
+            count += len(y)
+        self.incoming.clear()
+        return count
+
+    def clear(self):
+        self.x.clear()
+        self.y.clear()
+        self.sorted = True
+
+    def x_bounds(self):
+        x = self.x.view()
+        if self.sorted:
+            return x[0], x[-1]
+        return np.nanmin(x), np.nanmax(x)
+
+    def y_bounds(self, x0, x1):
+        """Minimum and maximum of y for x in the range x0 to x1, None if no points."""
+        x, y = self.x.view(), self.y.view()
+        if self.sorted:
+            start, stop = np.searchsorted(x, [x0, x1])
+            y = y[start:stop]
+        else:
+            y = y[(x >= x0) & (x <= x1)]
+        y = y[np.isfinite(y)]
+        if len(y) == 0:
+            return None
+        return y.min(), y.max()
+
+
+class LineView(PlotView):
+
+    panned = QtCore.Signal()
+    zoomed = QtCore.Signal()
+
+    def mouseMoveEvent(self, ev):
+        super().mouseMoveEvent(ev)
+        if ev.buttons() != QtCore.Qt.NoButton:
+            self.panned.emit()
+
+    def wheelEvent(self, ev):
+        super().wheelEvent(ev)
+        self.zoomed.emit()
+
+
+class LinePlot(QtWidgets.QWidget):
+    """
+    Plot of the series with auto scroll and auto range.
+
+    While Auto Zoom is checked, the view follows the last x value and fits
+    every y axis to the visible points. Dragging the view stops it, a
+    double click restarts it.
+    """
+
+    refreshed = QtCore.Signal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+        self.scene = QtWidgets.QGraphicsScene()
+        self.view = LineView(self)
+        self.view.setScene(self.scene)
+        self.view.scale[1] = -self.view.scale[1]
+        self.view.updateMatrix()
+
+        vbox = QtWidgets.QVBoxLayout(self)
+        vbox.setContentsMargins(0,0,0,0)
+        vbox.addWidget(self.view)
+        self.setLayout(vbox)
+
+        self.series = dict()
+        #Per y axis above 0: (a, b), scene y = a * y + b
+        self.transforms = dict()
+        self.capacity = int(config.get('lines', {}).get('capacity', 1000000))
+        self.window = None
+
+        self.ruler = None
+        #Per y axis: (ticks and color, Axis item)
+        self.yAxes = dict()
+        self.refreshing = False
+
+        self.rate = 0.0
+        self.last_refresh = time.perf_counter()
+
+        self.refreshTimer = QtCore.QTimer(self)
+        self.refreshTimer.setSingleShot(True)
+        self.refreshTimer.setInterval(int(config.get('lines', {}).get('refresh_interval', 0.04) * 1000))
+        self.refreshTimer.timeout.connect(self.refresh)
+
+        self.view.matrixUpdated.connect(self.redrawAxes)
+        self.view.panned.connect(lambda: self.view.autoAction.setChecked(False))
+        self.view.zoomed.connect(self.zoomedByUser)
+        self.view.doubleClicked.connect(self.zoomFull)
+
+    def append(self, name, x, y, axis=None, color=None):
+        series = self.series.get(name, None)
+
+        if series is None:
+            color = intColor(len(self.series)) if color is None else mkColor(color)
+            series = self.series[name] = Series(name, self.capacity, axis or 0, color)
+
+        else:
+            if not axis is None:
+                series.axis = axis
+            if not color is None:
+                series.color = mkColor(color)
+
+        series.incoming.append((x, y))
+
+        if not self.refreshTimer.isActive():
+            self.refreshTimer.start()
+
+    def clear(self, name=None):
+        names = list(self.series.keys()) if name is None else [name]
+        for name in names:
+            series = self.series.pop(name, None)
+            if series is None:
+                continue
+            if not series.curve is None:
+                self.scene.removeItem(series.curve)
+        self.refresh()
+
+    def setWindow(self, width=None):
+        self.window = width
+        self.view.autoAction.setChecked(True)
+        self.refresh()
+
+    def zoomedByUser(self):
+        if self.view.auto_zoom:
+            x0, x1 = self.view.getXLimits()
+            self.window = x1 - x0
+        self.refresh()
+
+    def zoomFull(self):
+        self.window = None
+        self.view.autoAction.setChecked(True)
+        self.refresh()
+
+    def refresh(self):
+        received = sum(series.add_incoming() for series in self.series.values())
+
+        now = time.perf_counter()
+        self.rate = 0.8 * self.rate + 0.2 * received / max(now - self.last_refresh, 1e-3)
+        self.last_refresh = now
+
+        series = [series for series in self.series.values() if len(series.x) > 0]
+
+        self.refreshing = True
+
+        try:
+            if self.view.auto_zoom and series:
+                self.scrollX(series)
+
+            #The curves are decimated for the new x range
+            for serie in series:
+                self.updateCurve(serie)
+
+            if self.view.auto_zoom and series:
+                self.fitY(series)
+
+        finally:
+            self.refreshing = False
+
+        self.redrawAxes()
+        self.refreshed.emit()
+
+    def scrollX(self, series):
+        bounds = [serie.x_bounds() for serie in series]
+        first = min(bound[0] for bound in bounds)
+        last = max(bound[1] for bound in bounds)
+
+        if self.window is None:
+            x0, x1 = first, last
+        elif last - self.window < first:
+            x0, x1 = first, first + self.window
+        else:
+            x0, x1 = last - self.window, last
+
+        if x1 <= x0:
+            x0, x1 = x0 - 0.5, x0 + 0.5
+
+        self.view.setXLimits(x0, x1)
+
+    def updateCurve(self, series):
+        if series.curve is None:
+            series.curve = LodCurve(series.x.view(), series.y.view(), zero_ends=False)
+            setCurveStyle(series.curve, series.color, None)
+            self.scene.addItem(series.curve)
+        else:
+            series.curve.set_data(series.x.view(), series.y.view())
+            setCurveStyle(series.curve, series.color, None)
+
+    def fitY(self, series):
+        x0, x1 = self.view.getXLimits()
+
+        limits = dict()
+        for serie in series:
+            bounds = serie.y_bounds(x0, x1)
+            if bounds is None:
+                continue
+            low, high = limits.get(serie.axis, bounds)
+            limits[serie.axis] = (min(low, bounds[0]), max(high, bounds[1]))
+
+        for axis, (low, high) in limits.items():
+            if high > low:
+                margin = (high - low) * 0.05
+            else:
+                margin = max(abs(low) * 0.05, 0.5)
+            limits[axis] = (low - margin, high + margin)
+
+        low, high = limits.get(0, (0, 1))
+        self.view.setYLimits(low, high, RULER_HEIGHT, 0)
+
+        #Axes without visible points keep their transform
+        for axis, (axis_low, axis_high) in limits.items():
+            if axis == 0:
+                continue
+            a = (high - low) / (axis_high - axis_low)
+            self.transforms[axis] = (a, low - a * axis_low)
+
+        for serie in series:
+            a, b = self.transforms.get(serie.axis, (1, 0))
+            serie.curve.setTransform(QtGui.QTransform(1, 0, 0, a, 0, b))
+
+    def redrawAxes(self):
+        if self.refreshing:
+            return
+
+        width, height = self.view.width(), self.view.height()
+        topLeft = self.view.mapToScene(0, 0)
+        bottomRight = self.view.mapToScene(width, height)
+
+        if self.ruler is None:
+            self.ruler = TickedRuler(0, topLeft.x(), bottomRight.x(), self.view.scale[0],
+                bg_color=self.palette().color(QtGui.QPalette.Base), noDecimals=False)
+            self.ruler.setZValue(1.2)
+            self.scene.addItem(self.ruler)
+        else:
+            self.ruler.update_labels(topLeft.x(), bottomRight.x(), self.view.scale[0])
+
+        self.ruler.setY(self.view.mapToScene(0, height - RULER_HEIGHT).y())
+
+        axes = sorted(set(series.axis for series in self.series.values()) | {0})
+
+        for axis in list(self.yAxes):
+            if not axis in axes:
+                self.scene.removeItem(self.yAxes.pop(axis)[1])
+
+        for index, axis in enumerate(axes):
+            a, b = self.transforms.get(axis, (1, 0))
+            start = (bottomRight.y() - b) / a
+            stop = (topLeft.y() - b) / a
+
+            if axis == 0:
+                x = self.view.mapToScene(AXIS_WIDTH, 0).x()
+                color = None
+            else:
+                x = self.view.mapToScene(width - 5 - AXIS_WIDTH * (index - 1), 0).x()
+                color = next(series.color for series in self.series.values() if series.axis == axis)
+
+            ticks = tickValues(start, stop, abs(self.view.scale[1] * a))
+
+            #The labels are only made again for other ticks, the transform places them
+            key = (tuple((spacing > 15, tuple(values)) for spacing, values in ticks), color)
+
+            if axis in self.yAxes and self.yAxes[axis][0] == key:
+                yAxis = self.yAxes[axis][1]
+                yAxis.setTransform(QtGui.QTransform(1, 0, 0, a, 0, b))
+                yAxis.setX(x)
+                continue
+
+            if axis in self.yAxes:
+                self.scene.removeItem(self.yAxes.pop(axis)[1])
+
+            yAxis = Axis(0, start, stop, ticks)
+            yAxis.setTransform(QtGui.QTransform(1, 0, 0, a, 0, b))
+            yAxis.setZValue(1.1)
+            yAxis.setX(x)
+
+            if not color is None:
+                for label in yAxis.childItems():
+                    label.label.setDefaultTextColor(color)
+
+            self.scene.addItem(yAxis)
+            self.yAxes[axis] = (key, yAxis)
+
+    def resizeEvent(self, ev):
+        super().resizeEvent(ev)
+        self.refresh()
+
+
+class LinesPanel(BasePanel):
+    panelCategory = 'lines'
+    panelShortName = 'basic'
+    userVisible = True
+
+    classIconFile = str(respath / 'icons' / 'px16' / 'chart_line.png')
+
+    def __init__(self, parent, panid):
+        super().__init__(parent, panid, type(self).panelCategory)
+
+        self.plot = LinePlot(self)
+        self.plot.refreshed.connect(self.showStatus)
+
+        self.initMenu()
+        self.setCentralWidget(self.plot)
+
+        self.statusBar().showMessage('Use gui.lines.append(name, x, y) in a console')
+
+    def initMenu(self):
+        self.fileMenu = self.menuBar().addMenu("&File")
+
+        self.addMenuItem(self.fileMenu, 'Close', self.close_panel,
+            statusTip="Close this lines panel",
+            icon = 'cross.png')
+
+        self.viewMenu = CheckMenu("&View", self.menuBar())
+        self.menuBar().addMenu(self.viewMenu)
+
+        self.addMenuItem(self.viewMenu, 'Auto Zoom', self.toggleAutoZoom,
+            checkcall=lambda: self.plot.view.auto_zoom,
+            statusTip="Follow the last points and fit the y axes")
+        self.addMenuItem(self.viewMenu, 'Zoom Full', self.plot.zoomFull,
+            statusTip="Show all points")
+        self.viewMenu.addSeparator()
+        self.addMenuItem(self.viewMenu, 'Clear', lambda: self.plot.clear(),
+            statusTip="Remove all series")
+
+        self.addBaseMenu()
+
+    def toggleAutoZoom(self):
+        self.plot.view.autoAction.setChecked(not self.plot.view.auto_zoom)
+        self.plot.refresh()
+
+    def showStatus(self):
+        points = sum(len(series.x) for series in self.plot.series.values())
+        self.statusBar().showMessage(f'{len(self.plot.series)} series, {points} points, '
+            f'{self.plot.rate:.0f} points/s')
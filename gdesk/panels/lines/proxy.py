@@ -0,0 +1,181 @@
+"""
+Console side of the lines panel.
+
+The appended points are collected and sent to the gui in batches, at most
+every 'flush_interval' seconds, without waiting for the gui. Points still
+pending after the interval are sent by a timer thread.
+From a child process, large batches are moved through shared memory if
+'queue_array_shared_mem' is set. The call then waits until the gui has
+copied them, so the shared memory is not released before.
+"""
+
+import time
+import threading
+
+import numpy as np
+
+from ...core.conf import config
+from ...core.gui_proxy import GuiProxyBase, StaticGuiCall, gui
+from ...utils.shared import SharedArray
+
+
+def lines_panel(panid=-1):
+    """The lines panel panid, a new one if it doesn't exist."""
+    panels = gui.qapp.panels
+
+    if not panid is None and panid < 0:
+        panel = panels.selected('lines', panid)
+    elif 'lines' in panels.keys():
+        panel = panels['lines'].get(panid, None)
+    else:
+        panel = None
+
+    if panel is None:
+        panel = panels.select_or_new('lines', panid)
+
+    return panel
+
+
+def merge_batches(batches):
+    """Concatenate the successive batches of the same series."""
+    merged = []
+    for panid, name, x, y, axis, color in batches:
+        if merged and merged[-1][:2] == [panid, name] and (merged[-1][2] is None) == (x is None):
+            last = merged[-1]
+            if not x is None:
+                last[2].append(x)
+            last[3].append(y)
+            #The axis and color are of the series, not of the points
+            last[4] = last[4] if axis is None else axis
+            last[5] = last[5] if color is None else color
+        else:
+            merged.append([panid, name, None if x is None else [x], [y], axis, color])
+
+    return [(panid, name, None if x is None else np.concatenate(x), np.concatenate(y), axis, color)
+        for panid, name, x, y, axis, color in merged]
+
+
+def receive_batches(batches):
+    """Gui side of LinesGuiProxy.flush."""
+    for panid, name, x, y, axis, color in batches:
+        if isinstance(x, SharedArray):
+            x = x.ndarray.copy()
+        if isinstance(y, SharedArray):
+            y = y.ndarray.copy()
+        lines_panel(panid).plot.append(name, x, y, axis, color)
+
+
+class LinesGuiProxy(GuiProxyBase):
+    category = 'lines'
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.pending = []
+        self.pending_bytes = 0
+        self.last_flush = 0.0
+        self.timer = None
+
+    def attach(self, gui):
+        gui.lines = self
+        #The timer thread has no gui of its own
+        self.gui = gui
+
+    def append(self, name, x, y=None, axis=None, color=None, panid=-1):
+        """
+        Append points to a series of a lines panel.
+
+        The points are sent in batches, use flush to send the pending points now.
+
+        :param str name: Name of the series, a new name makes a new series
+        :param x: The x value or values, the y values if y is None
+        :param y: The y value or values. If None, x is the sample number.
+        :param int axis: The y axis, 0 is the left axis, 1, 2, ... are at the right
+        :param color: Color of the curve
+        :param int panid: Panel id, -1 for the selected lines panel
+        """
+        if y is None:
+            x, y = None, np.array(x, dtype='f8', ndmin=1).ravel()
+            nbytes = y.nbytes
+        else:
+            x = np.array(x, dtype='f8', ndmin=1).ravel()
+            y = np.array(y, dtype='f8', ndmin=1).ravel()
+            if x.shape != y.shape:
+                raise ValueError(f'x and y have a different length: {len(x)} and {len(y)}')
+            nbytes = x.nbytes + y.nbytes
+
+        interval = config.get('lines', {}).get('flush_interval', 0.02)
+
+        with self.lock:
+            self.pending.append((panid, name, x, y, axis, color))
+            self.pending_bytes += nbytes
+
+            if time.perf_counter() - self.last_flush >= interval:
+                self.flush()
+
+            elif self.timer is None:
+                self.timer = threading.Timer(interval, self.flush, kwargs={'shared': False})
+                self.timer.daemon = True
+                self.timer.start()
+
+    def flush(self, shared=True):
+        """Send the pending points to the gui."""
+        with self.lock:
+            if not self.timer is None:
+                self.timer.cancel()
+                self.timer = None
+
+            self.last_flush = time.perf_counter()
+
+            if not self.pending:
+                return
+
+            batches = merge_batches(self.pending)
+            nbytes = self.pending_bytes
+            self.pending = []
+            self.pending_bytes = 0
+
+            if self.gui.is_main():
+                receive_batches(batches)
+
+            elif (shared and not self.gui.call_queue is None and config.get('lines', {}).get('queue_array_shared_mem', False)
+                    and nbytes >= config.get('lines', {}).get('shared_min_bytes', 65536)):
+                batches = [(panid, name, None if x is None else SharedArray.from_ndarray(x),
+                    SharedArray.from_ndarray(y), axis, color) for panid, name, x, y, axis, color in batches]
+                self.gui.gui_call(receive_batches, batches)
+
+            else:
+                self.gui._call_no_wait(receive_batches, batches)
+
+    def clear(self, name=None, panid=-1):
+        """
+        Remove a series, or all series if name is None.
+        """
+        self.flush()
+        return LinesGuiProxy._clear(name, panid)
+
+    @StaticGuiCall
+    def _clear(name=None, panid=-1):
+        panel = lines_panel(panid)
+        panel.plot.clear(name)
+        return panel.panid
+
+    @StaticGuiCall
+    def window(width=None, panid=-1):
+        """
+        Set the x range shown while scrolling.
+
+        :param float width: Width in x units, None to show all points
+        """
+        panel = lines_panel(panid)
+        panel.plot.setWindow(width)
+        return panel.panid
+
+    @StaticGuiCall
+    def select(panid=-1):
+        """
+        If panid < 0, -1: select the active panel, -2: selected before that, ...
+        panid == None: new panel
+        panid >= 0: select the panel if exists, otherwise a new with that number
+        """
+        panel = gui.qapp.panels.select_or_new('lines', panid)
+        return panel.panid
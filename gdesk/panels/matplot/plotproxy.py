@@ -63,6 +63,13 @@ class PlotGuiProxy(GuiProxyBase):
             figure = plt.gcf()            
        
         assert isinstance(figure, Figure)
+
+        mgr = figure.canvas.manager
+        if not hold and not getattr(mgr, 'remote', None) is None:
+            #Already shown, only send the changed data
+            mgr.show()
+            return mgr.remote.num
+
         return self.show_figure_box(FigureBox(figure), hold) 
         
     def prepareplot(self):
@@ -103,12 +110,13 @@ class PlotGuiProxy(GuiProxyBase):
         self.plx.show()
 
     @StaticGuiCall  
-    def show_figure_box(figurebox, hold=False):
+    def show_figure_box(figurebox, hold=False, panid=None):
         """
         Display the figure in the figurebox.
         The figure has to be added to the current pyplot backend.            
         
         :param bool hold: Replace the figure in the current selected panel by the new figure
+        :param int panid: Replace the figure in this panel, if it exists
         """
         #unpickling a figure will call show when interactive is on
         #But this will be on the backend of the pickling process 
@@ -146,7 +154,9 @@ class PlotGuiProxy(GuiProxyBase):
             from ...matplotbe import FigureCanvasGh2
             panids = gui.get_panel_ids('plot')                       
             
-            if not hold or len(panids) == 0:
+            if not panid is None and panid in panids:
+                num = panid
+            elif not hold or len(panids) == 0:
                 ignore, num = PlotGuiProxy.new()
             else:
                 num = panids[-1]
@@ -186,6 +196,27 @@ class PlotGuiProxy(GuiProxyBase):
             
         return num    
     
+    @StaticGuiCall
+    def update_figure(num, key, updates):
+        """
+        Apply data updates to a figure shown from a child process.
+
+        :param int num: The plot panel id
+        :param str key: The remote key of the figure
+        :param list updates: Data updates made by matplotbe.remote.collect_updates
+        :returns: False if the panel doesn't show that figure anymore
+        """
+        from ...matplotbe.remote import apply_updates
+
+        panels = gui.qapp.panels
+        panel = panels['plot'].get(num, None) if 'plot' in panels.keys() else None
+
+        if panel is None or getattr(panel.figure, '_gdesk_remote_key', None) != key:
+            return False
+
+        apply_updates(panel.figure, updates)
+        return True
+
     @StaticGuiCall
     def save(file):
         """
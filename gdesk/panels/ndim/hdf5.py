@@ -1,5 +1,9 @@
 """Saving and loading of hdf5 files in a ndim context"""
 
+import numpy as np
+
+from .lazy import LazyArray
+
 try:
     import h5py
     has_h5py = True
@@ -13,8 +17,10 @@ def load_ndim_from_hdf5(filepath):
     If multiple ndim arrays are found then it asks the user which one to load.
     It throws an ImportError when no dataset with more than 2 dims is found.
 
+    The dataset is not read, the ndim panel only reads the slices it shows.
+
     :param filepath: pathlib.Path uri to file to load
-    :return: ndarray, key_name, list with dim names, list with dim scales (name, scale)
+    :return: h5py.Dataset, key_name, list with dim names, list with dim scales (name, scale)
     """
     if not has_h5py:
         raise ModuleNotFoundError("h5py needs to be present for this to work")
@@ -46,14 +52,27 @@ def load_ndim_from_hdf5(filepath):
             dim_scales.append((d.keys()[0], d[0][:]))
         except IndexError:
             dim_scales.append((None, None))
-    return ds[...], key, dim_names, dim_scales
+    return ds, key, dim_names, dim_scales
+
+
+def plane_ndim(shape):
+    """Number of dimensions of one image plane, 3 for colour data"""
+    return 3 if len(shape) > 3 and shape[-1] in (3, 4) else 2
+
+
+def plane_chunks(shape):
+    """Chunk shape of one image plane, so showing a plane reads one chunk"""
+    if len(shape) <= 2:
+        return True
+    ndim = plane_ndim(shape)
+    return (1,) * (len(shape) - ndim) + tuple(shape[-ndim:])
 
 
 def save_ndim_to_hdf5(filepath, data, data_name=None, dim_names=None, dim_scales=None):
     """Save multi dim ndarray to hdf5 file
 
     :param filepath: pathlib.Path location to save the file
-    :param data: numpy ndarray
+    :param data: numpy ndarray or LazyArray, a LazyArray is copied plane by plane
     :param data_name: name to store the data under
     :param dim_names: list with names for each dimension
     :param dim_scales: tuple with (name, scale) for each dimension
@@ -69,7 +88,15 @@ def save_ndim_to_hdf5(filepath, data, data_name=None, dim_names=None, dim_scales
         dim_scales = [(None, None)] * data.ndim
 
     h = h5py.File(filepath, 'w')
-    h.create_dataset(data_name, data=data, compression='gzip')
+    chunks = plane_chunks(data.shape)
+    if isinstance(data, np.ndarray):
+        h.create_dataset(data_name, data=data, chunks=chunks, compression='gzip')
+    else:
+        dataset = h.create_dataset(data_name, shape=data.shape, dtype=data.dtype, chunks=chunks, compression='gzip')
+        # Read from the source, the copy should not flush the cache of the view
+        source = data.source if isinstance(data, LazyArray) else data
+        for index in np.ndindex(*data.shape[:-plane_ndim(data.shape)]):
+            dataset[index] = source[index]
     for dim in range(data.ndim):
         if dim_names[dim] is not None:
             h[data_name].dims[dim].label = dim_names[dim]
@@ -0,0 +1,198 @@
+"""
+Lazy access to ndim data which is not in memory.
+
+A LazyArray wraps any array like object with a shape, a dtype and numpy
+style indexing: h5py.Dataset, np.memmap, zarr arrays, xarray DataArrays
+of opened (not loaded) files, ...
+Only the indexed slices are read. Recently read slices are kept in a
+least recently used cache of at most 'plane_cache_size' bytes. After a
+read, the next slices along the slider dimension are read ahead by a
+background thread.
+"""
+
+import math
+import threading
+import collections
+from concurrent.futures import ThreadPoolExecutor, CancelledError
+
+import numpy as np
+
+from ... import config
+from .video import VideoSource
+
+
+def nbytes(data):
+    return math.prod(data.shape) * np.dtype(data.dtype).itemsize
+
+
+def as_ndim_data(data):
+    """
+    The data to use in the ndim panel.
+
+    Arrays in memory are used as they are. Other data larger than
+    'lazy_min_bytes' is wrapped in a LazyArray, smaller data is read.
+    """
+    if data is None or isinstance(data, LazyArray):
+        return data
+
+    if isinstance(data, np.ndarray) and not isinstance(data, np.memmap):
+        return data
+
+    if nbytes(data) < config.get('ndim', {}).get('lazy_min_bytes', 256e6):
+        array = np.asarray(data)
+        if isinstance(data, VideoSource):
+            # Release the decoder
+            data.close()
+        return array
+
+    return LazyArray(data)
+
+
+def index_key(index):
+    """Hashable key of a tuple of ints and slices."""
+    return tuple((item.start, item.stop, item.step) if isinstance(item, slice) else item for item in index)
+
+
+class LazyArray(object):
+    """
+    :param source: Array like object, indexing it reads the data
+    :param int cache_size: Maximum number of bytes kept in the cache
+    """
+
+    def __init__(self, source, cache_size=None):
+        ndim_config = config.get('ndim', {})
+        self.source = source
+        self.dtype = np.dtype(source.dtype)
+        self.cache_size = cache_size or ndim_config.get('plane_cache_size', 500e6)
+        self.read_ahead_count = ndim_config.get('read_ahead', 4)
+
+        self.cache = collections.OrderedDict()
+        self.cached_bytes = 0
+        self.lock = threading.RLock()
+        self.pending = dict()
+        self.executor = None
+
+    @property
+    def shape(self):
+        # A video source can find out it has less frames
+        return tuple(self.source.shape)
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    @property
+    def nbytes(self):
+        return nbytes(self)
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __array__(self, dtype=None, copy=None):
+        return np.asarray(self.source, dtype)
+
+    def __repr__(self):
+        return f'LazyArray({type(self.source).__name__}, shape={self.shape}, dtype={self.dtype})'
+
+    def __getitem__(self, index):
+        if not isinstance(index, tuple):
+            index = (index,)
+
+        key = index_key(index)
+
+        with self.lock:
+            value = self.cache.get(key)
+            if not value is None:
+                self.cache.move_to_end(key)
+                return value.copy()
+            future = self.pending.get(key)
+
+        if not future is None:
+            #Being read ahead, wait for it
+            try:
+                return future.result().copy()
+            except CancelledError:
+                pass
+
+        return self.read(index, key).copy()
+
+    def read(self, index, key):
+        """Read the slice from the source and cache it."""
+        value = np.asarray(self.source[index])
+        self.store(key, value)
+        return value
+
+    def store(self, key, value):
+        if value.nbytes > self.cache_size:
+            return
+
+        with self.lock:
+            if key in self.cache:
+                self.cached_bytes -= self.cache.pop(key).nbytes
+            self.cache[key] = value
+            self.cached_bytes += value.nbytes
+
+            while self.cached_bytes > self.cache_size:
+                self.cached_bytes -= self.cache.popitem(last=False)[1].nbytes
+
+    def read_ahead(self, index, dim, step=1):
+        """
+        Read the next slices along dim in the background.
+
+        :param tuple index: The index just read, dim has to be a slice
+        :param int dim: The dimension along which the next slices are read
+        :param int step: 1 to read ahead, -1 to read back
+        """
+        if self.read_ahead_count <= 0 or not isinstance(index[dim], slice):
+            return
+
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(1, thread_name_prefix='ndim-read-ahead')
+
+            #Only the latest read ahead is useful
+            for future in self.pending.values():
+                future.cancel()
+            self.pending.clear()
+
+            start = index[dim].start or 0
+
+            for k in range(1, self.read_ahead_count + 1):
+                pos = start + k * step
+                if not 0 <= pos < self.shape[dim]:
+                    break
+                next_index = index[:dim] + (slice(pos, pos + 1),) + index[dim+1:]
+                key = index_key(next_index)
+                if key in self.cache:
+                    continue
+                self.pending[key] = self.executor.submit(self._read_ahead, next_index, key)
+
+    def _read_ahead(self, index, key):
+        try:
+            return self.read(index, key)
+        finally:
+            with self.lock:
+                self.pending.pop(key, None)
+
+    def close(self):
+        """Stop the read ahead and close the source if it can be closed"""
+        with self.lock:
+            for future in self.pending.values():
+                future.cancel()
+            self.pending.clear()
+            if not self.executor is None:
+                self.executor.shutdown(wait=False)
+                self.executor = None
+        self.clear_cache()
+        close = getattr(self.source, 'close', None)
+        if callable(close):
+            close()
+
+    def clear_cache(self):
+        with self.lock:
+            self.cache.clear()
+            self.cached_bytes = 0
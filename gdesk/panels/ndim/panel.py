@@ -11,6 +11,7 @@ import imageio.v2
 from qtpy import QtGui
 
 from .hdf5 import load_ndim_from_hdf5, save_ndim_to_hdf5
+from .video import VIDEO_SUFFIXES, load_video
 from ... import config, gui
 
 from gdesk.panels import BasePanel
@@ -94,8 +95,12 @@ class NdimPanel(BasePanel):
         elif filepath.suffix.lower() in (".nc", ".nc4"):
             if xr is None:
                 raise ModuleNotFoundError("xarray is required to read netcdf files")
-            data = xr.load_dataarray(filepath)
+            data = xr.open_dataarray(filepath)
             self.load(data=data)  # all other info is in the xarray object
+        elif filepath.suffix.lower() in VIDEO_SUFFIXES:
+            # only the shown frames are decoded
+            data, name, dim_names, dim_scales = load_video(filepath)
+            self.load(data, name=name, dim_names=dim_names, dim_scales=dim_scales)
         else:
             data = np.array(imageio.v2.mimread(filepath))
             self.load(data)
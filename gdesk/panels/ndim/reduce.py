@@ -0,0 +1,154 @@
+"""
+Chunked reductions of ndim data.
+
+A reduction over one or more dimensions is split in chunks along the
+first reduced dimension. The chunks are read and reduced by a thread
+pool, and their partial results are combined as they come in. So the
+result of the chunks done so far can be shown while the others are
+still being processed.
+
+Mean is combined from (count, sum), std and var from (count, mean, sum
+of squared differences), min and max from the running min and max. Other
+reductions are done in one chunk.
+"""
+
+import math
+import threading
+
+import numpy as np
+
+from .lazy import LazyArray
+
+
+def partial_sum(chunk, axis):
+    return chunk.shape[axis], np.sum(chunk, axis=axis, keepdims=True, dtype=np.float64)
+
+
+def combine_sum(a, b):
+    return a[0] + b[0], a[1] + b[1]
+
+
+def partial_moments(chunk, axis):
+    mean = np.mean(chunk, axis=axis, keepdims=True, dtype=np.float64)
+    #One float64 temporary of the chunk size, the chunk can be a view of the data
+    diff = np.subtract(chunk, mean, dtype=np.float64)
+    np.square(diff, out=diff)
+    m2 = np.sum(diff, axis=axis, keepdims=True)
+    return chunk.shape[axis], mean, m2
+
+
+def combine_moments(a, b):
+    #Chan et al., parallel algorithm of the variance
+    count_a, mean_a, m2_a = a
+    count_b, mean_b, m2_b = b
+    count = count_a + count_b
+    delta = mean_b - mean_a
+    mean = mean_a + delta * (count_b / count)
+    m2 = m2_a + m2_b + np.square(delta) * (count_a * count_b / count)
+    return count, mean, m2
+
+
+#name: (partial, combine, final)
+ACCUMULATORS = {
+    'mean': (partial_sum, combine_sum, lambda state: state[1] / state[0]),
+    'var': (partial_moments, combine_moments, lambda state: state[2] / state[0]),
+    'std': (partial_moments, combine_moments, lambda state: np.sqrt(state[2] / state[0])),
+    'min': (lambda chunk, axis: np.min(chunk, axis=axis, keepdims=True), np.minimum, lambda state: state),
+    'max': (lambda chunk, axis: np.max(chunk, axis=axis, keepdims=True), np.maximum, lambda state: state),
+}
+
+
+class Reduction(object):
+    """
+    Reduce the indexed data in chunks.
+
+    :param data: ndarray or LazyArray
+    :param tuple indexes: Slices of the data, the reduced dimensions are not sliced
+    :param dict calcs: {dim: (name, func)} of the reduced dimensions
+    :param tuple keep_dims: The dimensions of the result (rows, columns and color)
+    :param executor: concurrent.futures executor to run the chunks
+    :param float chunk_bytes: Approximate size of a chunk
+    """
+
+    def __init__(self, data, indexes, calcs, keep_dims, executor, chunk_bytes=64e6):
+        self.data = data.source if isinstance(data, LazyArray) else data
+        self.dtype = data.dtype
+        self.indexes = indexes
+        self.calcs = calcs
+        self.keep_dims = keep_dims
+
+        self.chunk_dim = min(calcs)
+        self.name, self.func = calcs[self.chunk_dim]
+        length = data.shape[self.chunk_dim]
+
+        if self.name in ACCUMULATORS:
+            shape = [len(range(*index.indices(size))) for index, size in zip(indexes, data.shape)]
+            itemsize = data.dtype.itemsize
+            if self.name in ('var', 'std'):
+                #The differences to the mean are float64
+                itemsize = max(itemsize, np.dtype(np.float64).itemsize)
+            slice_bytes = math.prod(shape) // max(length, 1) * itemsize
+            chunk_len = max(1, int(chunk_bytes // max(slice_bytes, 1)))
+        else:
+            chunk_len = length
+
+        self.lock = threading.Lock()
+        self.state = None
+        self.chunks_done = 0
+        self.error = None
+        self.futures = [executor.submit(self.reduce_chunk, start, min(start + chunk_len, length))
+            for start in range(0, length, chunk_len)]
+
+    @property
+    def done(self):
+        return self.chunks_done == len(self.futures) or not self.error is None
+
+    def cancel(self):
+        for future in self.futures:
+            future.cancel()
+
+    def reduce_chunk(self, start, stop):
+        try:
+            index = list(self.indexes)
+            index[self.chunk_dim] = slice(start, stop)
+            chunk = np.asarray(self.data[tuple(index)])
+
+            #Same order as before chunking: the last dimension first
+            for dim in sorted(self.calcs, reverse=True):
+                if dim == self.chunk_dim:
+                    continue
+                chunk = np.expand_dims(self.calcs[dim][1](chunk, axis=dim), dim)
+
+            if self.name in ACCUMULATORS:
+                partial, combine, final = ACCUMULATORS[self.name]
+                state = partial(chunk, self.chunk_dim)
+            else:
+                combine = None
+                state = np.expand_dims(self.func(chunk, axis=self.chunk_dim), self.chunk_dim)
+
+            with self.lock:
+                self.state = state if self.state is None else combine(self.state, state)
+                self.chunks_done += 1
+
+        except Exception as error:
+            self.error = error
+            raise
+
+    def result(self):
+        """The reduction of the chunks done so far, None if there are none."""
+        with self.lock:
+            if not self.error is None:
+                raise self.error
+            if self.state is None:
+                return None
+            state = self.state
+
+        if self.name in ACCUMULATORS:
+            im = ACCUMULATORS[self.name][2](state)
+            if self.name in ('mean', 'var', 'std') and np.issubdtype(self.dtype, np.floating):
+                im = im.astype(self.dtype)
+        else:
+            im = state
+
+        drop = tuple(dim for dim in range(im.ndim) if not dim in self.keep_dims)
+        return im.squeeze(axis=drop)
@@ -0,0 +1,138 @@
+"""
+Frame indexed reading of video files in a ndim context.
+
+A VideoSource looks like an array of shape (frames, rows, columns, colors),
+but only decodes the frames which are indexed. The ndim panel wraps it in
+a LazyArray (see lazy.py), which caches the decoded frames and decodes
+the next frames in a background thread.
+"""
+
+import math
+import operator
+import pathlib
+import threading
+
+import numpy as np
+import imageio.v3 as iio
+
+VIDEO_SUFFIXES = ('.gif', '.mov', '.mp4')
+
+
+class VideoSource(object):
+    """
+    :param filepath: Path of the video file
+    """
+
+    def __init__(self, filepath):
+        self.filepath = pathlib.Path(filepath)
+        self.plugin = iio.imopen(self.filepath, 'r')
+        self.lock = threading.Lock()
+        self.fps = None
+        self.shape = (math.inf,)
+
+        if hasattr(self.plugin, 'legacy_get_reader'):
+            # Keep one reader, a new reader per frame would restart the decoding.
+            # Reading the next frame doesn't seek.
+            self.reader = self.plugin.legacy_get_reader()
+            meta = self.reader.get_meta_data()
+            self.fps = meta.get('fps')
+            frames = self.count_legacy_frames(meta)
+        else:
+            self.reader = None
+            frames = self.plugin.properties().n_images
+            try:
+                self.fps = self.plugin.metadata().get('fps')
+            except Exception:
+                pass
+
+        first = self.read_frame(0)
+        self.shape = (frames,) + first.shape
+        self.dtype = first.dtype
+
+    def count_legacy_frames(self, meta):
+        frames = meta.get('nframes', math.inf)
+        if math.isinf(frames):
+            # Counting the frames exactly decodes the whole file, it takes
+            # as long as playing it. So it is estimated from the duration,
+            # which is rounded to 10 ms. If the estimate is too high, the
+            # shape shrinks at the first read past the end.
+            frames = int(round(meta['duration'] * meta['fps']))
+        return frames
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __array__(self, dtype=None, copy=None):
+        return np.asarray(self[:], dtype)
+
+    def read_frame(self, index):
+        """Decode one frame"""
+        with self.lock:
+            try:
+                if self.reader is None:
+                    return np.asarray(self.plugin.read(index=index))
+                return np.asarray(self.reader.get_data(index))
+            except (IndexError, StopIteration):
+                if 0 < index < self.shape[0]:
+                    # The estimated number of frames was too high
+                    self.shape = (index,) + self.shape[1:]
+                raise IndexError(f'frame {index} is past the end of {self.filepath.name}')
+
+    def __getitem__(self, index):
+        if not isinstance(index, tuple):
+            index = (index,)
+
+        if len(index) == 0 or index[0] is Ellipsis:
+            frame_index, rest = slice(None), index
+        else:
+            frame_index, rest = index[0], index[1:]
+
+        if isinstance(frame_index, slice):
+            frames = range(*frame_index.indices(len(self)))
+            stack = np.empty((len(frames),) + self.shape[1:], self.dtype)
+            count = 0
+            for frame in frames:
+                if frame >= len(self):
+                    continue
+                try:
+                    stack[count] = self.read_frame(frame)
+                except IndexError:
+                    if frame < len(self):
+                        raise
+                    # The estimated number of frames was too high, the
+                    # frames read so far are returned
+                    continue
+                count += 1
+            return stack[:count][(slice(None),) + rest]
+
+        frame = operator.index(frame_index)
+        if frame < 0:
+            frame += len(self)
+        if not 0 <= frame < len(self):
+            raise IndexError(f'frame {frame_index} is out of range for {len(self)} frames')
+
+        return self.read_frame(frame)[rest]
+
+    def close(self):
+        with self.lock:
+            if not self.reader is None:
+                self.reader.close()
+            self.plugin.close()
+
+
+def load_video(filepath):
+    """Open a video file, without decoding it
+
+    :param filepath: pathlib.Path uri to file to load
+    :return: VideoSource, name, list with dim names, list with dim scales (name, scale)
+    """
+    source = VideoSource(filepath)
+    dim_names = ['frame', 'row', 'col', 'color'][:source.ndim]
+    dim_scales = [(None, None)] * source.ndim
+    if source.fps:
+        dim_scales[0] = ('time (s)', np.arange(len(source)) / source.fps)
+    return source, source.filepath.stem, dim_names, dim_scales
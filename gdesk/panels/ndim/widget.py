@@ -1,9 +1,14 @@
 import pathlib
+import collections
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 from qtpy.QtCore import Qt
 from qtpy import QtWidgets, QtGui, QtCore
 
 from ..imgview import ImageGuiProxy
+from .lazy import LazyArray, as_ndim_data, index_key
+from .reduce import Reduction
 from ... import config
 #
 respath = pathlib.Path(config['respath'])
@@ -17,6 +22,8 @@ class NdimWidget(QtWidgets.QWidget):
     """
 
     DIM_CALC = dict(step=None, mean=np.mean, min=np.min, max=np.max, std=np.std, var=np.var)
+    # Number of reduced images kept
+    REDUCED_CACHE_COUNT = 16
 
     def __init__(self, parent=None):
         super().__init__(parent=parent)
@@ -77,6 +84,15 @@ class NdimWidget(QtWidgets.QWidget):
         self.dim_names = None
         self.dim_scales = None
         self._cycling_dims = list()
+        self._previous_steps = dict()
+        self._slide_dim = None
+        self._slide_step = 1
+        self._reduced = collections.OrderedDict()
+        self._reduction = None
+        self._reduction_key = None
+        self._reduce_executor = None
+        self._reduce_timer = QtCore.QTimer(self)
+        self._reduce_timer.timeout.connect(self._show_reduction)
         self._play_labels = None
         self.play_icon = QtGui.QPixmap(str(respath / 'icons' / 'px16' / 'control_play.png'))
         self.pause_icon = QtGui.QPixmap(str(respath / 'icons' / 'px16' / 'control_pause.png'))
@@ -124,6 +140,7 @@ class NdimWidget(QtWidgets.QWidget):
         """
         self.dim_names = None
         self.dim_scales = None
+        self._clear_reduced()
         data_array = None
         def_row = None
         def_column = None
@@ -131,9 +148,11 @@ class NdimWidget(QtWidgets.QWidget):
 
         if type(data).__name__ == "DataArray":
             # Extract the bare numpy array, but also retain the xarray with extra metadata.
+            # A large DataArray of an opened file is not read, only the shown slices are.
             data_array = data
-            data = data.values
 
+        self._release_data(data)
+        data = as_ndim_data(data)
         self.data = data
         self.data_name = name
 
@@ -247,13 +266,23 @@ class NdimWidget(QtWidgets.QWidget):
 
         If data is still None or the shape of the current and new data is not the same then the load method is called.
         """
-        if self.data is not None and self.data.shape != data.shape:
-            self.load(data)
-        if self.data is None:
+        if self.data is None or self.data.shape != data.shape:
             self.load(data)
-        self.data = data
+            return
+        self._release_data(data)
+        self.data = as_ndim_data(data)
+        self._clear_reduced()
         self._update_image()
 
+    def _release_data(self, data):
+        """Close the lazy data, like an opened video, which is replaced by data"""
+        old = self.data
+        if not isinstance(old, LazyArray) or old is data:
+            return
+        if old.source is data or old.source is getattr(data, 'source', None):
+            return
+        old.close()
+
     def update_sliders(self):
         """Update the sliders after the x, y and color dims have changed"""
         self._sliders = dict()
@@ -263,6 +292,9 @@ class NdimWidget(QtWidgets.QWidget):
         self._dim_scale_labels = dict()
         self._play_labels = dict()
         self._cycling_dims = list()
+        self._previous_steps = dict()
+        self._slide_dim = None
+        self._slide_step = 1
         self.vbox.removeWidget(self.slider_widget)
         self.slider_widget.deleteLater()
         self.slider_widget = QtWidgets.QWidget(self)
@@ -374,17 +406,37 @@ class NdimWidget(QtWidgets.QWidget):
             else:
                 indexes[dim] = slice(None)  # for calculations, we need all the data
 
+        calcs = {dim: (combo.currentText(), self.DIM_CALC[combo.currentText()])
+                 for dim, combo in self._dim_combos.items() if combo.currentText() != 'step'}
+
+        if calcs:
+            # the calculations are done in chunks by a thread pool
+            self._reduce(tuple(indexes), calcs)
+            return
+
+        self._cancel_reduction()
+
         # do the actual indexing
-        im = self.data[tuple(indexes)]
+        try:
+            im = self.data[tuple(indexes)]
+        except IndexError:
+            if isinstance(self.data, LazyArray) and any(
+                    slider.maximum() >= self.data.shape[dim] for dim, slider in self._sliders.items()):
+                # The video has less frames than estimated
+                self.update_sliders()
+                return
+            raise
 
-        # perform any calculations if needed
-        for dim, combo in reversed(self._dim_combos.items()):
-            combo_text = combo.currentText()
-            if combo_text == 'step':
-                im = im.squeeze(axis=dim)
-            else:
-                im = self.DIM_CALC[combo_text](im, axis=dim)
+        if isinstance(self.data, LazyArray):
+            self._read_ahead(tuple(indexes))
+
+        for dim in reversed(self._dim_combos):
+            im = im.squeeze(axis=dim)
 
+        self._show_image(im)
+
+    def _show_image(self, im):
+        """Show the image of the row, column and color dims"""
         # move around the axis until we have row/col and optionally color in this particular order
         if self.color_dim is None:
             if self.row_dim > self.column_dim:
@@ -412,6 +464,93 @@ class NdimWidget(QtWidgets.QWidget):
                 # General number.
                 scale_label.setText(f"{value:.4g}")
 
+    def _reduce(self, indexes, calcs):
+        """Show the reduced image from the cache, or start the reduction
+
+        The cache is keyed by the slider indexes and the calculations,
+        so only moving a slider to a new position starts a new reduction.
+        """
+        keep_dims = tuple(dim for dim in (self.row_dim, self.column_dim, self.color_dim) if dim is not None)
+        key = (index_key(indexes), tuple((dim, name) for dim, (name, func) in calcs.items()), keep_dims)
+
+        if key == self._reduction_key and self._reduction is not None:
+            return
+
+        self._cancel_reduction()
+        self._reduction_key = key
+
+        if key in self._reduced:
+            self._reduced.move_to_end(key)
+            self._show_image(self._reduced[key])
+            return
+
+        if self._reduce_executor is None:
+            self._reduce_executor = ThreadPoolExecutor(config.get('ndim', {}).get('reduce_threads', 8),
+                                                       thread_name_prefix='ndim-reduce')
+
+        self._reduction = Reduction(self.data, indexes, calcs, keep_dims, self._reduce_executor,
+                                    config.get('ndim', {}).get('reduce_chunk_size', 64e6))
+        self._reduce_timer.start(100)
+
+    def _show_reduction(self):
+        """Show the result of the chunks reduced so far"""
+        reduction = self._reduction
+        if reduction is None:
+            self._reduce_timer.stop()
+            return
+
+        done = reduction.done
+
+        try:
+            im = reduction.result()
+        except Exception:
+            self._reduction = None
+            self._reduce_timer.stop()
+            raise
+
+        if done:
+            self._reduction = None
+            self._reduce_timer.stop()
+            self._reduced[self._reduction_key] = im
+            while len(self._reduced) > self.REDUCED_CACHE_COUNT:
+                self._reduced.popitem(last=False)
+
+        if im is not None:
+            self._show_image(im)
+
+    def _cancel_reduction(self):
+        if self._reduction is not None:
+            self._reduction.cancel()
+            self._reduction = None
+        self._reduce_timer.stop()
+        self._reduction_key = None
+
+    def _clear_reduced(self):
+        """Forget the reduced images, the data has changed"""
+        self._cancel_reduction()
+        self._reduced.clear()
+
+    def _read_ahead(self, indexes):
+        """Let the lazy data read the next planes along the slider which moved last"""
+        steps = {dim: slider.value() for dim, slider in self._sliders.items()
+                 if self._dim_combos[dim].currentText() == 'step'}
+
+        for dim, value in steps.items():
+            previous = self._previous_steps.get(dim, value)
+            if value != previous:
+                wrapped = value == 0 and previous == self._sliders[dim].maximum()
+                self._slide_dim = dim
+                self._slide_step = 1 if value > previous or wrapped else -1
+
+        self._previous_steps = steps
+
+        if self._slide_dim not in steps:
+            self._slide_dim = next(iter(steps), None)
+            self._slide_step = 1
+
+        if self._slide_dim is not None:
+            self.data.read_ahead(indexes, self._slide_dim, self._slide_step)
+
     def _combo_changed(self, dim):
         """Update the sliders behavior based on the combo selection
 
@@ -473,7 +612,6 @@ class NdimWidget(QtWidgets.QWidget):
 
     def clear_data(self):
         """Clear current data and put back in startup state"""
-        self.data = None
         self.load(data=None)
 
 def case_insensitive_index(tup, value):
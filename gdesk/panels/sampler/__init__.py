@@ -0,0 +1,6 @@
+from .proxy import SamplerGuiProxy
+
+from ... import config
+
+if config.get('qapp', False):
+    from .panel import SamplerPanel
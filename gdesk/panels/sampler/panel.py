@@ -0,0 +1,151 @@
+from pathlib import Path
+
+from qtpy import QtWidgets
+from qtpy.QtCore import Qt
+
+from ... import config
+from ...panels.base import BasePanel, CheckMenu
+from ...core.sampler import call_tree, hot_spots
+
+respath = Path(config['respath'])
+
+COLUMNS = ['Function', 'Total %', 'Self %', 'Total [s]', 'Self [s]', 'Location']
+
+
+class SampleItem(QtWidgets.QTreeWidgetItem):
+
+    """Tree item sorted on the numbers instead of the text."""
+
+    def __init__(self, key, total, own, samples, sample_time):
+        filename, function, lineno = key
+        super().__init__([
+            function,
+            f'{total / samples * 100:.1f}',
+            f'{own / samples * 100:.1f}',
+            f'{total * sample_time:.3f}',
+            f'{own * sample_time:.3f}',
+            f'{Path(filename).name}:{lineno}'])
+
+        self.sortKeys = [function, total, own, total, own, (filename, lineno)]
+        self.setToolTip(5, f'{filename}:{lineno}')
+
+        for column in range(1, 5):
+            self.setTextAlignment(column, Qt.AlignRight | Qt.AlignVCenter)
+
+    def __lt__(self, other):
+        column = self.treeWidget().sortColumn()
+        return self.sortKeys[column] < other.sortKeys[column]
+
+
+class SamplerPanel(BasePanel):
+    panelCategory = 'sampler'
+    panelShortName = 'basic'
+    userVisible = True
+
+    classIconFile = str(respath / 'icons' / 'px16' / 'time_red.png')
+
+    def __init__(self, parent, panid):
+        super().__init__(parent, panid, type(self).panelCategory)
+
+        self.profile = None
+        self.view = 'tree'
+
+        self.initMenu()
+
+        self.tree = QtWidgets.QTreeWidget()
+        self.tree.setColumnCount(len(COLUMNS))
+        self.tree.setHeaderLabels(COLUMNS)
+        self.tree.setUniformRowHeights(True)
+        self.tree.setSortingEnabled(True)
+        self.tree.setAlternatingRowColors(True)
+        self.setCentralWidget(self.tree)
+
+        self.statusBar().showMessage('Use Execution > Start Sampling in a console')
+
+    def initMenu(self):
+        self.fileMenu = self.menuBar().addMenu("&File")
+
+        self.addMenuItem(self.fileMenu, 'Close', self.close_panel,
+            statusTip="Close this sampler panel",
+            icon = 'cross.png')
+
+        self.viewMenu = CheckMenu("&View", self.menuBar())
+        self.menuBar().addMenu(self.viewMenu)
+
+        self.addMenuItem(self.viewMenu, 'Call Tree', lambda: self.setView('tree'),
+            checkcall=lambda: self.view == 'tree',
+            statusTip="Show the sampled stacks as a call tree")
+        self.addMenuItem(self.viewMenu, 'Hot Spots', lambda: self.setView('flat'),
+            checkcall=lambda: self.view == 'flat',
+            statusTip="Show every function once, with the time spent in the function itself")
+        self.viewMenu.addSeparator()
+        self.addMenuItem(self.viewMenu, 'Expand Hot Path', self.expandHotPath,
+            statusTip="Expand the calls with the largest total time")
+        self.addMenuItem(self.viewMenu, 'Collapse All', lambda: self.tree.collapseAll())
+
+        self.addBaseMenu()
+
+    def setProfile(self, profile, title=None):
+        self.profile = profile
+        if title is not None:
+            self.long_title = title
+        self.refresh()
+
+    def setView(self, view):
+        self.view = view
+        self.refresh()
+
+    def refresh(self):
+        self.tree.clear()
+        profile = self.profile
+        if profile is None or profile['samples'] == 0:
+            self.statusBar().showMessage('No samples')
+            return
+
+        samples = profile['samples']
+        sample_time = profile['duration'] / samples
+
+        self.tree.setSortingEnabled(False)
+
+        if self.view == 'tree':
+            root = call_tree(profile)
+            self.tree.setRootIsDecorated(True)
+            self.addNodes(self.tree.invisibleRootItem(), root, samples, sample_time)
+            self.tree.sortItems(1, Qt.DescendingOrder)
+            self.expandHotPath()
+
+        else:
+            self.tree.setRootIsDecorated(False)
+            items = [SampleItem(key, total, own, samples, sample_time)
+                for key, (own, total) in hot_spots(profile).items()]
+            self.tree.addTopLevelItems(items)
+            self.tree.sortItems(2, Qt.DescendingOrder)
+
+        self.tree.setSortingEnabled(True)
+
+        for column in range(len(COLUMNS)):
+            self.tree.resizeColumnToContents(column)
+
+        self.statusBar().showMessage(f'{samples} samples in {profile["duration"]:.2f} s, '
+            f'every {profile["interval"] * 1000:.1f} ms')
+
+    def addNodes(self, parentItem, node, samples, sample_time):
+        items = []
+        for child in node.children.values():
+            item = SampleItem(child.key, child.total, child.own, samples, sample_time)
+            self.addNodes(item, child, samples, sample_time)
+            items.append(item)
+        parentItem.addChildren(items)
+
+    def expandHotPath(self):
+        if self.view != 'tree':
+            return
+
+        parent = self.tree.invisibleRootItem()
+        while parent.childCount() > 0:
+            item = max((parent.child(i) for i in range(parent.childCount())), key=lambda item: item.sortKeys[1])
+            item.setExpanded(True)
+            parent = item
+
+        self.tree.scrollToItem(parent)
+        self.tree.setCurrentItem(parent)
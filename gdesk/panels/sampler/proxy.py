@@ -0,0 +1,19 @@
+from ...core.gui_proxy import GuiProxyBase, StaticGuiCall, gui
+        
+class SamplerGuiProxy(GuiProxyBase):    
+    category = 'sampler'
+    
+    def __init__(self):
+        pass
+        
+    def attach(self, gui):
+        gui.sampler = self
+        
+    @StaticGuiCall
+    def show(profile, title=None):
+        """
+        Show a profile of gdesk.core.sampler.StackSampler in a sampler panel.
+        """
+        panel = gui.qapp.panels.select_or_new('sampler')
+        panel.setProfile(profile, title)
+        return panel.panid
@@ -0,0 +1,143 @@
+"""
+Micro-benchmark of the ANSI escape code parsing of console output.
+
+Compares, on generated pytest, tqdm and coloured log output:
+
+- split: the regex split_string with a new QTextCharFormat per fragment
+- feed: the streaming parser with formats interned per graphics state
+- store: the streaming parser writing into the console LineStore
+
+The output is parsed in chunks, as received from the stdout queue.
+
+Usage:
+
+    python -m gdesk.test.bench_ansi
+    python -m gdesk.test.bench_ansi --lines 100000 --chunk 1024
+"""
+
+import time
+import argparse
+
+from ..utils.ansi_code_processor import QtAnsiCodeProcessor
+from ..utils.linestore import LineStore
+
+ESC = '\033['
+
+
+def pytest_output(lines):
+    out = []
+    for i in range(lines):
+        if i % 10 == 9:
+            out.append(f'tests/test_module_{i // 100}.py::test_case_{i} {ESC}31mFAILED{ESC}0m{ESC}31m [{i % 100:3d}%]{ESC}0m\n')
+        else:
+            out.append(f'tests/test_module_{i // 100}.py::test_case_{i} {ESC}32mPASSED{ESC}0m{ESC}32m [{i % 100:3d}%]{ESC}0m\n')
+    out.append(f'{ESC}31m{ESC}1m===== {lines // 10} failed, {lines - lines // 10} passed in 1.23s ====={ESC}0m\n')
+    return ''.join(out)
+
+
+def tqdm_output(lines):
+    out = []
+    for i in range(lines):
+        n = i % 1000
+        bar = '█' * (n // 40) + ' ' * (25 - n // 40)
+        out.append(f'\r{n / 10:5.1f}%|{bar}| {n}/1000 [00:{n // 60:02d}<00:10, 99.9it/s]')
+        if n == 999:
+            out.append('\n')
+    return ''.join(out)
+
+
+def log_output(lines):
+    levels = [('32', 'INFO'), ('33', 'WARNING'), ('39', 'DEBUG'), ('31', 'ERROR')]
+    out = []
+    for i in range(lines):
+        color, name = levels[i % 7 % 4]
+        out.append(f'{ESC}2m12:00:{i % 60:02d}{ESC}0m {ESC}{color}m{name:8s}{ESC}0m '
+                   f'{ESC}0mgdesk.module {i}: some message with a value {i * 3.14:.2f}{ESC}0m\n')
+    return ''.join(out)
+
+
+SAMPLES = {'pytest': pytest_output, 'tqdm': tqdm_output, 'log': log_output}
+
+
+def chunked(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def parse_split(chunks):
+    processor = QtAnsiCodeProcessor()
+    fragments = 0
+    for chunk in chunks:
+        for substring in processor.split_string(chunk):
+            processor.make_format()
+            fragments += 1
+    return fragments
+
+
+def parse_feed(chunks):
+    processor = QtAnsiCodeProcessor()
+    fragments = 0
+    for chunk in chunks:
+        for act in processor.feed(chunk):
+            if act.action == 'text':
+                processor.get_format()
+            fragments += 1
+    return fragments
+
+
+def parse_store(chunks):
+    processor = QtAnsiCodeProcessor()
+    store = LineStore()
+    fragments = 0
+    for chunk in chunks:
+        for act in processor.feed(chunk):
+            if act.action == 'text':
+                store.write(act.text, store.intern(act.state))
+            elif act.action == 'carriage-return':
+                store.carriage_return()
+            fragments += 1
+    return fragments
+
+
+METHODS = {'split': parse_split, 'feed': parse_feed, 'store': parse_store}
+
+
+def bench(method, chunks, repeat):
+    durations = []
+    for i in range(repeat):
+        t0 = time.perf_counter()
+        fragments = method(chunks)
+        durations.append(time.perf_counter() - t0)
+    return min(durations), fragments
+
+
+def argparser():
+    parser = argparse.ArgumentParser(prog='python -m gdesk.test.bench_ansi',
+        description='Benchmark the ANSI parsing of console output')
+    parser.add_argument('--lines', type=int, default=20000, help='Number of generated lines per sample')
+    parser.add_argument('--chunk', type=int, default=4096, help='Size of the received chunks')
+    parser.add_argument('--repeat', type=int, default=3, help='Best of this number of runs')
+    return parser
+
+
+def main(argv=None):
+    args = argparser().parse_args(argv)
+    report = dict()
+
+    for sample, generate in SAMPLES.items():
+        text = generate(args.lines)
+        chunks = chunked(text, args.chunk)
+        report[sample] = dict()
+        print(f'{sample}: {len(text) / 1e6:.1f} M characters in {len(chunks)} chunks')
+
+        for name, method in METHODS.items():
+            duration, fragments = bench(method, chunks, args.repeat)
+            report[sample][name] = {'duration_s': duration, 'fragments': fragments,
+                'mchar_per_s': len(text) / duration / 1e6}
+            print(f'  {name:6s}: {duration * 1e3:8.1f} ms, {fragments:8d} fragments, '
+                  f'{len(text) / duration / 1e6:6.1f} M char/s')
+
+    return report
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,497 @@
+"""
+Latency and throughput benchmark of the gui call transports.
+
+Measures for every transport:
+
+- the round trip latency of no-op gui calls
+- the stdout flush throughput of a console stream
+- the array transfer bandwidth, from KB to GB
+
+The gui side runs headless. By default, a thread stands in for the Qt
+event loop. Use ``--qt`` to use the real HandOver on a QCoreApplication.
+
+Usage:
+
+    python -m gdesk.test.bench_ipc
+    python -m gdesk.test.bench_ipc --max-size 1G --output ipc.json
+    python -m gdesk.test.bench_ipc --transports thread zmq --quick
+
+The results are written as json, to be compared across releases.
+"""
+
+import sys
+import os
+import time
+import json
+import queue
+import threading
+import platform
+import argparse
+import multiprocessing
+from pathlib import Path
+
+import numpy as np
+
+from ..core.conf import config, deep_update, load_config, FIRST_CONFIG_FILE
+from ..core.gui_proxy import GuiProxy
+from ..core.comm import CommQueues, ZmqQueues, NonDuplexQueue
+from ..core.stdinout import FlushPipeStream
+from ..utils.shared import SharedArray
+
+TRANSPORTS = ['thread', 'process', 'nonduplex', 'zmq']
+
+SIZE_UNITS = {'K': 2**10, 'M': 2**20, 'G': 2**30}
+
+# The stdout sink at the gui side of the transport being measured
+sink = None
+
+
+class ReturnLock:
+    """
+    Lock and return value object, see gdesk.gcore.threadcom.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.lock.acquire()
+        self.value = None
+
+    def waitOnReturn(self):
+        self.lock.acquire()
+        return self.value
+
+    def releaseReturn(self, value):
+        self.value = value
+        self.lock.release()
+
+
+class ThreadHandOver:
+    """
+    Stand-in for the HandOver of the Qt event loop.
+    A single thread executes the handed over calls.
+    """
+
+    def __init__(self):
+        self.signal_call_queue = queue.Queue()
+        self.thread = threading.Thread(target=self.loop, name='BenchEventLoop', daemon=True)
+        self.thread.start()
+
+    def send(self, block=True, func=None, *args, **kwargs):
+        returnlock = ReturnLock()
+        self.signal_call_queue.put((returnlock, func, args, kwargs))
+        if block:
+            return returnlock.waitOnReturn()
+        else:
+            return returnlock
+
+    def loop(self):
+        while True:
+            (returnlock, func, args, kwargs) = self.signal_call_queue.get()
+            returnvalue = None
+            try:
+                returnvalue = func(*args, **kwargs)
+            finally:
+                returnlock.releaseReturn(returnvalue)
+
+
+class BenchApp:
+    """
+    The minimal QApplication interface used by the GuiProxy.
+    """
+
+    def __init__(self, handover):
+        self.handover = handover
+
+
+class StdoutSink:
+    """
+    Gui side of the stdout stream.
+    Drains the stdout queue on every flush, as the console panel does.
+    """
+
+    def __init__(self, stdout_queue):
+        self.stdout_queue = stdout_queue
+        self.received = 0
+        self.flushes = 0
+
+    def flush(self):
+        self.flushes += 1
+        while not self.stdout_queue.empty():
+            mode, text = self.stdout_queue.get()
+            self.received += len(text)
+
+
+def noop():
+    return None
+
+
+def receive_array(array):
+    if isinstance(array, SharedArray):
+        array = array.ndarray
+    return array.nbytes
+
+
+def stdout_received():
+    #The flush request can overtake the text on the queue
+    sink.flush()
+    return sink.received
+
+
+def parse_size(text):
+    text = str(text).upper().rstrip('B')
+    if text[-1:] in SIZE_UNITS:
+        return int(float(text[:-1]) * SIZE_UNITS[text[-1]])
+    return int(text)
+
+
+def format_size(nbytes):
+    for unit in ['G', 'M', 'K']:
+        if nbytes >= SIZE_UNITS[unit]:
+            return f'{nbytes / SIZE_UNITS[unit]:g}{unit}B'
+    return f'{nbytes}B'
+
+
+def array_sizes(min_size, max_size):
+    sizes = []
+    size = min_size
+    while size <= max_size:
+        sizes.append(size)
+        size *= 16
+    return sizes
+
+
+def timing_stats(durations):
+    durations = np.array(durations)
+    return {
+        'count': len(durations),
+        'mean_us': float(durations.mean() * 1e6),
+        'median_us': float(np.median(durations) * 1e6),
+        'p90_us': float(np.percentile(durations, 90) * 1e6),
+        'p99_us': float(np.percentile(durations, 99) * 1e6),
+        'min_us': float(durations.min() * 1e6),
+        'calls_per_s': float(len(durations) / durations.sum())}
+
+
+def bench_latency(gui_proxy, calls):
+    #Warm up, also does the handshake of the interned function handle
+    for i in range(10):
+        gui_proxy._call(noop)
+
+    durations = []
+    for i in range(calls):
+        start = time.perf_counter()
+        gui_proxy._call(noop)
+        durations.append(time.perf_counter() - start)
+
+    return timing_stats(durations)
+
+
+def bench_stdout(gui_proxy, stream, lines, timeout=120):
+    line = 'Lorem ipsum dolor sit amet, consectetur adipiscing elit %08d\n'
+    expected = gui_proxy._call(stdout_received) + lines * len(line % 0)
+
+    start = time.perf_counter()
+
+    for i in range(lines):
+        stream.ansi(line % i)
+
+    written = time.perf_counter()
+
+    while gui_proxy._call(stdout_received) < expected:
+        if time.perf_counter() - start > timeout:
+            raise TimeoutError('Not all stdout was received by the gui side')
+        time.sleep(0.001)
+
+    end = time.perf_counter()
+
+    return {
+        'lines': lines,
+        'bytes': lines * len(line % 0),
+        'write_seconds': written - start,
+        'seconds': end - start,
+        'lines_per_s': lines / (end - start),
+        'mb_per_s': lines * len(line % 0) / (end - start) / 2**20}
+
+
+def bench_arrays(gui_proxy, sizes, shared=False, budget=2.0):
+    results = []
+
+    for size in sizes:
+        array = np.ones(size, 'uint8')
+        durations = []
+
+        if shared:
+            sharray = SharedArray(array.shape, array.dtype)
+
+        spent = 0
+        while len(durations) < 3 or (spent < budget and len(durations) < 100):
+            start = time.perf_counter()
+            if shared:
+                #As ImageGuiProxy.show, copy to shared memory and pass the reference
+                sharray[:] = array
+                nbytes = gui_proxy._call(receive_array, sharray)
+            else:
+                nbytes = gui_proxy._call(receive_array, array)
+            durations.append(time.perf_counter() - start)
+            spent += durations[-1]
+            assert nbytes == size
+
+        median = float(np.median(durations))
+        results.append({
+            'nbytes': size,
+            'size': format_size(size),
+            'repeats': len(durations),
+            'median_s': median,
+            'min_s': float(min(durations)),
+            'mb_per_s': size / median / 2**20})
+
+        del array
+        if shared: del sharray
+
+    return results
+
+
+def run_client(gui_proxy, stdout_queue, spec):
+    """
+    The console side of the benchmark.
+    """
+    stream = FlushPipeStream(stdout_queue, lambda: gui_proxy._call_no_wait(-1))
+
+    results = dict()
+    results['latency'] = bench_latency(gui_proxy, spec['calls'])
+    results['stdout'] = bench_stdout(gui_proxy, stream, spec['lines'])
+    results['arrays'] = bench_arrays(gui_proxy, spec['sizes'])
+
+    if spec['shared']:
+        try:
+            SharedArray((1,), 'uint8')
+
+        except Exception as ex:
+            results['arrays_shared'] = {'available': False, 'reason': f'{type(ex).__name__}: {ex}'}
+
+        else:
+            results['arrays_shared'] = bench_arrays(gui_proxy, spec['sizes'], shared=True)
+
+    return results
+
+
+def child_main(cqs, spec):
+    """
+    Entry point of the child process.
+    """
+    if isinstance(cqs, str):
+        cqs = ZmqQueues.from_json(cqs)
+        cqs.setup_as_client()
+
+    gui_proxy = GuiProxy(None, cqs.gui_call_queue, cqs.gui_return_queue)
+
+    try:
+        results = run_client(gui_proxy, cqs.stdout_queue, spec)
+
+    except Exception as ex:
+        results = {'error': f'{type(ex).__name__}: {ex}'}
+
+    cqs.return_queue.put(results)
+    #Give the queue feeder thread the time to send
+    time.sleep(0.5)
+
+
+def run_thread(app, spec):
+    global sink
+
+    cqs = CommQueues(queue.Queue)
+    sink = StdoutSink(cqs.stdout_queue)
+
+    gui_proxy = GuiProxy(app, cqs.gui_call_queue, cqs.gui_return_queue)
+    gui_proxy.set_func_hook(-1, sink.flush)
+
+    results = dict()
+
+    def client():
+        try:
+            spec_thread = dict(spec, shared=False)
+            results.update(run_client(gui_proxy, cqs.stdout_queue, spec_thread))
+        except Exception as ex:
+            results['error'] = f'{type(ex).__name__}: {ex}'
+
+    #The client may not run in the MainThread, gui calls would not be handed over
+    thread = threading.Thread(target=client, name='BenchConsole')
+    thread.start()
+    thread.join()
+
+    return results
+
+
+def run_process(app, spec, transport, timeout=600):
+    global sink
+
+    ctx = multiprocessing.get_context('spawn')
+
+    if transport == 'process':
+        cqs = CommQueues(ctx.Queue, process=True)
+        child_arg = cqs
+
+    elif transport == 'nonduplex':
+        if NonDuplexQueue is None:
+            return {'available': False, 'reason': f'NonDuplexQueue is not supported on {sys.platform}'}
+        cqs = CommQueues(NonDuplexQueue, process=True)
+        child_arg = cqs
+
+    elif transport == 'zmq':
+        cqs = ZmqQueues()
+        cqs.setup_as_server()
+        child_arg = cqs.to_json()
+
+    sink = StdoutSink(cqs.stdout_queue)
+    gui_proxy = GuiProxy(app, cqs.gui_call_queue, cqs.gui_return_queue)
+    gui_proxy.set_func_hook(-1, sink.flush)
+
+    process = ctx.Process(target=child_main, args=(child_arg, spec), daemon=True)
+    start = time.perf_counter()
+    process.start()
+
+    try:
+        results = cqs.return_queue.get(timeout=timeout)
+
+    except (queue.Empty, RuntimeError):
+        results = {'error': 'Timeout on the child process'}
+
+    results['process_seconds'] = time.perf_counter() - start
+    process.join(5)
+
+    if process.is_alive():
+        process.kill()
+
+    if transport == 'nonduplex':
+        cqs.close()
+
+    return results
+
+
+def run(transports, spec, app):
+    report = dict()
+    report['meta'] = meta_info(app)
+    report['spec'] = dict(spec)
+    report['results'] = dict()
+
+    for transport in transports:
+        print(f'Benchmarking {transport}...', flush=True)
+
+        if transport == 'thread':
+            results = run_thread(app, spec)
+        else:
+            results = run_process(app, spec, transport)
+
+        results.setdefault('available', True)
+        report['results'][transport] = results
+        print_results(transport, results)
+
+    return report
+
+
+def meta_info(app):
+    import gdesk
+
+    meta = dict()
+    meta['gdesk'] = gdesk.__version__
+    meta['python'] = platform.python_version()
+    meta['numpy'] = np.__version__
+    meta['platform'] = platform.platform()
+    meta['machine'] = platform.machine()
+    meta['cpu_count'] = os.cpu_count()
+    meta['handover'] = type(app.handover).__name__
+    meta['time'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+    return meta
+
+
+def print_results(transport, results):
+    if not results['available']:
+        print(f'  not available: {results["reason"]}')
+        return
+
+    if 'error' in results:
+        print(f'  error: {results["error"]}')
+        return
+
+    lat = results['latency']
+    print(f'  latency: median {lat["median_us"]:.1f} us, p99 {lat["p99_us"]:.1f} us, {lat["calls_per_s"]:.0f} calls/s')
+
+    out = results['stdout']
+    print(f'  stdout: {out["lines_per_s"]:.0f} lines/s, {out["mb_per_s"]:.1f} MB/s')
+
+    for key in ['arrays', 'arrays_shared']:
+        if not key in results: continue
+        arrays = results[key]
+
+        if isinstance(arrays, dict):
+            print(f'  {key}: not available: {arrays["reason"]}')
+            continue
+
+        for item in arrays:
+            print(f'  {key} {item["size"]:>6}: {item["median_s"] * 1e3:9.3f} ms, {item["mb_per_s"]:9.1f} MB/s')
+
+
+def argparser():
+    parser = argparse.ArgumentParser(prog='python -m gdesk.test.bench_ipc',
+        description='Latency and throughput benchmark of the gui call transports')
+    parser.add_argument('-t', '--transports', nargs='+', choices=TRANSPORTS, default=TRANSPORTS)
+    parser.add_argument('-o', '--output', help='Json file to write the results to')
+    parser.add_argument('--calls', type=int, default=2000, help='Number of no-op gui calls')
+    parser.add_argument('--lines', type=int, default=100000, help='Number of printed lines')
+    parser.add_argument('--min-size', default='1K', help='Smallest array size')
+    parser.add_argument('--max-size', default='256M', help='Largest array size, up to some G')
+    parser.add_argument('--no-shared', action='store_true', help='Skip the SharedArray path')
+    parser.add_argument('--quick', action='store_true', help='Small counts and sizes, for a smoke test')
+    parser.add_argument('--qt', action='store_true', help='Use the Qt event loop with the offscreen platform')
+    return parser
+
+
+def main(argv=None):
+    args = argparser().parse_args(argv)
+
+    if not 'zmq_queue_min_port' in config:
+        #Not configured by a running gdesk, use the defaults
+        deep_update(config, load_config(FIRST_CONFIG_FILE))
+
+    spec = dict()
+    spec['calls'] = 100 if args.quick else args.calls
+    spec['lines'] = 2000 if args.quick else args.lines
+    max_size = parse_size('1M' if args.quick else args.max_size)
+    spec['sizes'] = array_sizes(parse_size(args.min_size), max_size)
+    spec['shared'] = not args.no_shared
+
+    if args.qt:
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        from qtpy.QtCore import QCoreApplication
+        from ..gcore.threadcom import HandOver
+
+        qapp = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])
+        app = BenchApp(HandOver(qapp))
+        report = dict()
+
+        def worker():
+            try:
+                report.update(run(args.transports, spec, app))
+            finally:
+                app.handover.send(False, qapp.quit)
+
+        thread = threading.Thread(target=worker, name='BenchRunner', daemon=True)
+        thread.start()
+        qapp.exec_()
+        thread.join()
+
+    else:
+        app = BenchApp(ThreadHandOver())
+        report = run(args.transports, spec, app)
+
+    output = args.output or f'gdesk-ipcbench-{time.strftime("%Y%m%d-%H%M%S")}.json'
+
+    with open(output, 'w') as fp:
+        json.dump(report, fp, indent=2)
+
+    print(f'Results written to {Path(output).resolve()}')
+    return report
+
+
+if __name__ == '__main__':
+    main()
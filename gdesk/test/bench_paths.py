@@ -0,0 +1,100 @@
+"""
+Micro-benchmark of building the QPainterPath of a histogram step curve.
+
+Compares, for a number of bins:
+
+- dot: the former Levels.xy_as_steps with a matrix multiply, np.r_ for
+  the zero ends and arrayToQPath
+- vertices: stepVertices, np.r_ for the zero ends and arrayToQPath
+- direct: stepsToQPath, writing the vertices from the bins into a QPolygonF
+- copy: only copying a buffer of the same size, the lower bound
+
+Usage:
+
+    python -m gdesk.test.bench_paths
+    python -m gdesk.test.bench_paths --bins 256 65536 --repeat 20
+"""
+
+import time
+import argparse
+
+import numpy as np
+
+from ..graphics.functions import arrayToQPath, stepVertices, stepsToQPath
+
+
+def dot_steps(xvector, yvector, stepwidth):
+    yvector = yvector.reshape((yvector.shape[0], 1)).dot(np.ones((1, 2))).reshape(yvector.shape[0]*2)
+    xvector = xvector.reshape((xvector.shape[0], 1)).dot(np.ones((1, 2)))
+    xvector[:,1] += stepwidth
+    xvector = xvector.flatten()
+    return xvector, yvector
+
+
+def zero_ends_path(x, y):
+    zero = np.zeros(1, y.dtype)
+    return arrayToQPath(np.r_[x[:1], x, x[-1:]], np.r_[zero, y, zero])
+
+
+def path_dot(starts, hist, stepwidth):
+    return zero_ends_path(*dot_steps(starts, hist, stepwidth))
+
+
+def path_vertices(starts, hist, stepwidth):
+    return zero_ends_path(*stepVertices(starts, hist, stepwidth))
+
+
+def path_direct(starts, hist, stepwidth):
+    return stepsToQPath(starts, hist, stepwidth)
+
+
+def buffer_copy(starts, hist, stepwidth):
+    source = np.empty(20 * (2 * len(starts) + 4), np.ubyte)
+    return source.copy()
+
+
+METHODS = {'dot': path_dot, 'vertices': path_vertices, 'direct': path_direct, 'copy': buffer_copy}
+
+
+def histogram(bins):
+    starts = np.arange(bins, dtype=np.float64) - bins // 2
+    hist = np.random.default_rng(0).poisson(1000, bins).astype(np.float64)
+    return starts, hist
+
+
+def bench(method, starts, hist, repeat):
+    durations = []
+    for i in range(repeat):
+        t0 = time.perf_counter()
+        method(starts, hist, 1.0)
+        durations.append(time.perf_counter() - t0)
+    return min(durations)
+
+
+def argparser():
+    parser = argparse.ArgumentParser(prog='python -m gdesk.test.bench_paths',
+        description='Benchmark the path building of histogram step curves')
+    parser.add_argument('--bins', type=int, nargs='+', default=[256, 4096, 65536], help='Numbers of bins')
+    parser.add_argument('--repeat', type=int, default=10, help='Best of this number of runs')
+    return parser
+
+
+def main(argv=None):
+    args = argparser().parse_args(argv)
+    report = dict()
+
+    for bins in args.bins:
+        starts, hist = histogram(bins)
+        report[bins] = dict()
+        print(f'{bins} bins')
+
+        for name, method in METHODS.items():
+            duration = bench(method, starts, hist, args.repeat)
+            report[bins][name] = {'duration_s': duration}
+            print(f'  {name:8s}: {duration * 1e3:8.3f} ms')
+
+    return report
+
+
+if __name__ == '__main__':
+    main()
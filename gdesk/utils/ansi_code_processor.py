@@ -43,6 +43,9 @@ BackSpaceAction = namedtuple('BackSpaceAction', ['action'])
 # An action for backspace
 SetTitleAction = namedtuple('SetTitleAction', ['action', 'title'])
 
+# Text, including newlines, to print in the graphics state of state
+TextAction = namedtuple('TextAction', ['action', 'text', 'state'])
+
 # Regular expressions.
 CSI_COMMANDS = 'ABCDEFGHJKSTfmnsu'
 CSI_DOS = 'X'
@@ -51,8 +54,13 @@ OSC_SUBPATTERN = r'\](.*?)[\x07\x1b]'
 ANSI_PATTERN = ('\x01?\x1b(%s|%s)\x02?' % \
                 (CSI_SUBPATTERN, OSC_SUBPATTERN))
 ANSI_OR_SPECIAL_PATTERN = re.compile('(\a|\b|\r(?!\n)|\r?\n)|(?:%s)' % ANSI_PATTERN)
+ANSI_OR_CONTROL_PATTERN = re.compile('(\a|\b|\r)|(?:%s)' % ANSI_PATTERN)
+ANSI_ESCAPE_PATTERN = re.compile('\x1b(%s|%s)' % (CSI_SUBPATTERN, OSC_SUBPATTERN))
 SPECIAL_PATTERN = re.compile('([\f])')
 
+# Longest unterminated escape sequence to hold back for the next chunk
+MAX_PENDING_ESCAPE = 256
+
 #-----------------------------------------------------------------------------
 # Classes
 #-----------------------------------------------------------------------------
@@ -79,6 +87,8 @@ class AnsiCodeProcessor:
 
     def __init__(self):
         self.actions = []
+        self.pending = ''
+        self.sgr_transitions = dict()
         self.color_map = self.default_color_map.copy()
         self.reset_sgr()
 
@@ -92,6 +102,18 @@ class AnsiCodeProcessor:
         self.foreground_color = None
         self.background_color = None
 
+    def get_sgr_state(self):
+        """ Returns a hashable tuple of the current graphics attributes.
+        """
+        return (self.foreground_color, self.background_color, self.intensity,
+                self.bold, self.italic, self.underline)
+
+    def set_sgr_state(self, state):
+        """ Set the graphics attributes from a tuple of get_sgr_state.
+        """
+        (self.foreground_color, self.background_color, self.intensity,
+         self.bold, self.italic, self.underline) = state
+
     def split_string(self, string):
         """ Yields substrings for which the same escape code applies.
         """
@@ -156,6 +178,102 @@ class AnsiCodeProcessor:
             self.actions.append(NewLineAction('newline'))
             yield last_char
 
+    def feed(self, string):
+        """ Parses the next chunk of a stream into a list of actions.
+
+        Unlike split_string, the parsing state is kept between calls: an
+        escape sequence or a \r\n split over two chunks is held back
+        until the next chunk arrives. Text, including newlines, is
+        returned as TextAction items. Consecutive text in the same
+        graphics state is joined into one item, whatever escape codes
+        were in between.
+        """
+        string = self.pending + string
+        self.pending = ''
+
+        escape = string.rfind('\x1b')
+        if escape >= 0 and len(string) - escape < MAX_PENDING_ESCAPE \
+                and ANSI_ESCAPE_PATTERN.match(string, escape) is None:
+            self.pending = string[escape:]
+            string = string[:escape]
+
+        if string.endswith('\r'):
+            self.pending = '\r' + self.pending
+            string = string[:-1]
+
+        string = string.replace('\r\n', '\n').replace('\f', '')
+
+        items = []
+        parts = []
+        state = current = self.get_sgr_state()
+        transitions = self.sgr_transitions
+
+        def flush_text():
+            if parts:
+                items.append(TextAction('text', ''.join(parts), state))
+                parts.clear()
+
+        start = 0
+        for match in ANSI_OR_CONTROL_PATTERN.finditer(string):
+            if match.start() > start:
+                if parts and current != state:
+                    flush_text()
+                state = current
+                parts.append(string[start:match.start()])
+            start = match.end()
+
+            control = match.group(1)
+            if control == '\a':
+                self.actions = [BeepAction('beep')]
+            elif control == '\r':
+                self.actions = [CarriageReturnAction('carriage-return')]
+            elif control == '\b':
+                self.actions = [BackSpaceAction('backspace')]
+            else:
+                # Most codes are graphics codes, remember their effect
+                code = match.group(0)
+                key = (current, code)
+                if key in transitions:
+                    current = transitions[key]
+                    self.set_sgr_state(current)
+                    continue
+
+                self.actions = []
+                groups = [x for x in match.groups() if x is not None]
+                g0 = groups[0]
+                params = [ param for param in groups[1].split(';') if param ]
+                if g0.startswith('['):
+                    try:
+                        params = list(map(int, params))
+                    except ValueError:
+                        # Silently discard badly formed codes.
+                        pass
+                    else:
+                        self.set_csi_code(groups[2], params)
+                        if groups[2] == 'm':
+                            if len(transitions) > 4096:
+                                transitions.clear()
+                            transitions[key] = self.get_sgr_state()
+
+                elif g0.startswith(']'):
+                    self.set_osc_code(params)
+
+                current = self.get_sgr_state()
+
+            if self.actions:
+                flush_text()
+                items.extend(self.actions)
+                self.actions = []
+
+        if start < len(string):
+            if parts and current != state:
+                flush_text()
+            state = current
+            parts.append(string[start:])
+
+        flush_text()
+        return items
+
     def set_csi_code(self, command, params=[]):
         """ Set attributes based on CSI (Control Sequence Introducer) code.
 
@@ -573,6 +691,14 @@ class QtAnsiCodeProcessor(AnsiCodeProcessor):
     default_color_map = xterm256_colors.copy()
     bold_text_enabled = True
 
+    def __init__(self):
+        super().__init__()
+        self.formats = dict()
+
+    def set_osc_code(self, params):
+        super().set_osc_code(params)
+        self.formats.clear()
+
     def get_color(self, color, intensity=0):
         """ Returns a QColor for a given color code, or None if one cannot be
             constructed.
@@ -599,7 +725,16 @@ class QtAnsiCodeProcessor(AnsiCodeProcessor):
 
     def get_format(self):
         """ Returns a QTextCharFormat that encodes the current style attributes.
+
+        One format is made per distinct graphics state.
         """
+        state = self.get_sgr_state()
+        format = self.formats.get(state)
+        if format is None:
+            format = self.formats[state] = self.make_format()
+        return format
+
+    def make_format(self):
         format = QtGui.QTextCharFormat()
 
         # Set foreground color
@@ -640,3 +775,4 @@ class QtAnsiCodeProcessor(AnsiCodeProcessor):
 
         # Update the current color map with the new defaults.
         self.color_map.update(self.default_color_map)
+        self.formats.clear()
@@ -0,0 +1,286 @@
+"""Compact storage of console output lines with a bounded scrollback.
+
+Complete lines are grouped per chunk of a fixed number of lines.
+A chunk stores all its text as one string, an array of line offsets into
+that string and a run-length table of style changes. The scrollback is
+bounded by dropping the oldest chunk as a whole.
+
+Lines are addressed by their line number, counted from the first line
+written after the last clear. Line numbers stay valid when older lines
+are dropped; the first available line number is LineStore.first.
+"""
+
+import re
+import bisect
+from array import array
+
+
+class LineChunk(object):
+
+    """A group of complete lines, each line terminated by a newline."""
+
+    __slots__ = ('start', 'parts', '_text', 'size', 'offsets', 'run_pos', 'run_style', 'last_style')
+
+    def __init__(self, start):
+        self.start = start
+        self.parts = []
+        self._text = ''
+        self.size = 0
+        self.offsets = array('L', [0])
+        self.run_pos = array('L')
+        self.run_style = array('L')
+        self.last_style = None
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    @property
+    def text(self):
+        if self.parts:
+            self.parts.insert(0, self._text)
+            self._text = ''.join(self.parts)
+            self.parts = []
+        return self._text
+
+    def append(self, fragments):
+        for text, style in fragments:
+            if not text:
+                continue
+            if style != self.last_style:
+                self.run_pos.append(self.size)
+                self.run_style.append(style)
+                self.last_style = style
+            self.parts.append(text)
+            self.size += len(text)
+        self.parts.append('\n')
+        self.size += 1
+        self.offsets.append(self.size)
+
+    def line_length(self, index):
+        return self.offsets[index + 1] - self.offsets[index] - 1
+
+    def line(self, index):
+        return self.text[self.offsets[index]:self.offsets[index + 1] - 1]
+
+    def fragments(self, index):
+        text = self.text
+        start, stop = self.offsets[index], self.offsets[index + 1] - 1
+        run = bisect.bisect_right(self.run_pos, start) - 1
+        style = self.run_style[run] if run >= 0 else 0
+        run += 1
+        result = []
+        pos = start
+        while run < len(self.run_pos) and self.run_pos[run] < stop:
+            change = self.run_pos[run]
+            if change > pos:
+                result.append((text[pos:change], style))
+            pos = change
+            style = self.run_style[run]
+            run += 1
+        if stop > pos or not result:
+            result.append((text[pos:stop], style))
+        return result
+
+    def locate(self, offset):
+        """Index of the line containing the character at offset."""
+        return bisect.bisect_right(self.offsets, offset) - 1
+
+
+def cut_fragments(fragments, start, stop=None):
+    """Return the fragments covering the columns start up to stop."""
+    result = []
+    pos = 0
+    for text, style in fragments:
+        end = pos + len(text)
+        if stop is not None and pos >= stop:
+            break
+        if end > start:
+            a = max(start - pos, 0)
+            b = len(text) if stop is None else min(stop - pos, len(text))
+            result.append([text[a:b], style])
+        pos = end
+    return result
+
+
+class LineStore(object):
+
+    """Bounded scrollback of styled text lines.
+
+    The last line is not complete yet. It is kept as a list of
+    [text, style] fragments so a carriage return or backspace can
+    overwrite it.
+
+    :param int max_lines: Keep at least this number of complete lines.
+    :param int chunk_lines: Number of lines per chunk.
+    """
+
+    def __init__(self, max_lines=20000, chunk_lines=1024):
+        self.max_lines = max_lines
+        self.chunk_lines = chunk_lines
+        self.styles = [None]
+        self.style_ids = {None: 0}
+        self.clear()
+
+    def clear(self):
+        self.chunks = [LineChunk(0)]
+        self.current = []
+        self.length = 0
+        self.column = 0
+        self.width = 0
+
+    @property
+    def first(self):
+        """Line number of the oldest line still available."""
+        return self.chunks[0].start
+
+    @property
+    def last(self):
+        """Line number of the current, unfinished line."""
+        return self.chunks[-1].start + len(self.chunks[-1])
+
+    def __len__(self):
+        return self.last - self.first + 1
+
+    def intern(self, key):
+        """Return the style id for a hashable style key."""
+        style = self.style_ids.get(key)
+        if style is None:
+            style = self.style_ids[key] = len(self.styles)
+            self.styles.append(key)
+        return style
+
+    def _chunk(self, lineno):
+        return self.chunks[(lineno - self.first) // self.chunk_lines]
+
+    def line_length(self, lineno):
+        if lineno == self.last:
+            return self.length
+        chunk = self._chunk(lineno)
+        return chunk.line_length(lineno - chunk.start)
+
+    def line(self, lineno):
+        if lineno == self.last:
+            return ''.join(text for text, style in self.current)
+        chunk = self._chunk(lineno)
+        return chunk.line(lineno - chunk.start)
+
+    def fragments(self, lineno):
+        """List of (text, style) tuples of one line."""
+        if lineno == self.last:
+            return [tuple(frag) for frag in self.current] or [('', 0)]
+        chunk = self._chunk(lineno)
+        return chunk.fragments(lineno - chunk.start)
+
+    def text(self, start=None, stop=None):
+        """The plain text of the lines start up to stop."""
+        if start is None and stop is None:
+            return ''.join(chunk.text for chunk in self.chunks) + self.line(self.last)
+        start = self.first if start is None else max(start, self.first)
+        stop = self.last + 1 if stop is None else min(stop, self.last + 1)
+        return '\n'.join(self.line(lineno) for lineno in range(start, stop))
+
+    def write(self, text, style=0):
+        """Write text, a newline character completes the current line."""
+        lines = text.split('\n')
+        for line in lines[:-1]:
+            self.put(line, style)
+            self.newline()
+        self.put(lines[-1], style)
+
+    def put(self, text, style=0):
+        """Write text without newlines at the current column."""
+        if not text:
+            return
+        if self.column > self.length:
+            self.current.append([' ' * (self.column - self.length), 0])
+            self.length = self.column
+        if self.column == self.length:
+            if self.current and self.current[-1][1] == style:
+                self.current[-1][0] += text
+            else:
+                self.current.append([text, style])
+        else:
+            stop = self.column + len(text)
+            self.current = cut_fragments(self.current, 0, self.column) + [[text, style]] \
+                + cut_fragments(self.current, stop)
+        self.column += len(text)
+        self.length = max(self.length, self.column)
+
+    def newline(self):
+        chunk = self.chunks[-1]
+        chunk.append(self.current)
+        self.width = max(self.width, self.length)
+        self.current = []
+        self.length = 0
+        self.column = 0
+        if len(chunk) == self.chunk_lines:
+            self.chunks.append(LineChunk(chunk.start + len(chunk)))
+            complete = self.last - self.first
+            while len(self.chunks) > 1 and complete - len(self.chunks[0]) >= self.max_lines:
+                complete -= len(self.chunks.pop(0))
+
+    def carriage_return(self):
+        self.column = 0
+
+    def backspace(self):
+        self.column = max(self.column - 1, 0)
+
+    def erase_line(self, erase_to='end'):
+        """Erase the current line from the column to the 'end', 'start' or 'all'."""
+        if erase_to == 'end':
+            self.current = cut_fragments(self.current, 0, self.column)
+            self.length = min(self.length, self.column)
+        elif erase_to == 'start':
+            blank = [' ' * min(self.column, self.length), 0]
+            self.current = [blank] + cut_fragments(self.current, self.column)
+        elif erase_to == 'all':
+            self.current = []
+            self.length = 0
+
+    def find(self, pattern, start=None, backward=False, case_sensitive=False, regex=False):
+        """Find the next occurrence of pattern.
+
+        :param tuple start: (line number, column) to start searching from.
+        :returns: (line number, column, length) or None.
+        """
+        flags = 0 if case_sensitive else re.IGNORECASE
+        exp = re.compile(pattern if regex else re.escape(pattern), flags)
+
+        segments = [(chunk.start, chunk.text, chunk.offsets, chunk.locate) for chunk in self.chunks]
+        current = self.line(self.last)
+        segments.append((self.last, current, [0, len(current) + 1], lambda offset: 0))
+
+        if start is None:
+            start = (self.last, self.length) if backward else (self.first, 0)
+        lineno, column = start
+        lineno = min(max(lineno, self.first), self.last)
+
+        if backward:
+            segments = segments[::-1]
+
+        for first, text, offsets, locate in segments:
+            if not backward and lineno >= first + len(offsets) - 1:
+                continue
+            if backward and lineno < first:
+                continue
+
+            local = lineno - first
+            if local < 0:
+                pos = 0
+            elif local >= len(offsets) - 1:
+                pos = len(text)
+            else:
+                pos = offsets[local] + column
+
+            if backward:
+                match = None
+                for match in exp.finditer(text, 0, min(pos, len(text))):
+                    pass
+            else:
+                match = exp.search(text, pos)
+
+            if match is not None and match.end() > match.start():
+                index = locate(match.start())
+                return (first + index, match.start() - offsets[index], match.end() - match.start())
+
+        return None
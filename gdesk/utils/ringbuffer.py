@@ -0,0 +1,54 @@
+"""
+Ring buffer of which the content is always one contiguous array.
+
+The buffer has room for twice the capacity. New values are written after
+the last value. Only when the end of the room is reached, the values to
+keep are moved to the start. So the content can be used without copy,
+and every value is moved at most once on average.
+"""
+
+import numpy as np
+
+
+class RingBuffer(object):
+    """
+    :param int capacity: Maximum number of values, the oldest values are dropped
+    :param dtype: Data type of the values
+    """
+
+    def __init__(self, capacity, dtype=float):
+        self.capacity = capacity
+        self.buffer = np.empty(2 * capacity, dtype)
+        self.start = 0
+        self.stop = 0
+        #Number of values ever appended
+        self.total = 0
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def append(self, values):
+        values = np.atleast_1d(np.asarray(values, self.buffer.dtype))
+        n = len(values)
+        self.total += n
+
+        if n >= self.capacity:
+            self.buffer[:self.capacity] = values[n - self.capacity:]
+            self.start, self.stop = 0, self.capacity
+            return
+
+        if self.stop + n > len(self.buffer):
+            keep = min(len(self), self.capacity - n)
+            self.buffer[:keep] = self.buffer[self.stop - keep:self.stop]
+            self.start, self.stop = 0, keep
+
+        self.buffer[self.stop:self.stop + n] = values
+        self.stop += n
+        self.start = max(self.start, self.stop - self.capacity)
+
+    def view(self):
+        """The content, oldest first. Not a copy, only valid until the next append."""
+        return self.buffer[self.start:self.stop]
+
+    def clear(self):
+        self.start = self.stop = 0
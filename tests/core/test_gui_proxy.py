@@ -0,0 +1,78 @@
+from queue import Queue
+
+import numpy as np
+import pytest
+
+from gdesk.core.gui_proxy import GuiProxy
+
+
+class HandOver:
+    """Stand-in for the Qt event loop handover."""
+
+    def send(self, block=True, func=None, *args, **kwargs):
+        return func(*args, **kwargs)
+
+
+class QApp:
+    handover = HandOver()
+
+
+def add(a, b):
+    return a + b
+
+
+def total(arr):
+    return arr.sum()
+
+
+class Receiver:
+
+    def __init__(self):
+        self.received = []
+
+    def callback(self, *args):
+        self.received.append(args)
+
+
+@pytest.fixture
+def proxies():
+    call_queue, return_queue = Queue(), Queue()
+    gui_side = GuiProxy(QApp(), call_queue, return_queue)
+    child_side = GuiProxy(None, call_queue, return_queue)
+    return gui_side, child_side
+
+
+def test_static_function_is_interned_once(proxies):
+    gui_side, child_side = proxies
+
+    assert child_side._call(add, 1, 2) == 3
+    assert child_side._call(add, 3, 4) == 7
+
+    handle = child_side.remote_handles[add]
+    assert isinstance(handle, int) and handle > 0
+    assert len(gui_side.handles) == 1
+    assert gui_side.decode_func(handle) is add
+
+
+def test_callback_handle_is_released_after_decoding(proxies):
+    gui_side, child_side = proxies
+    receiver = Receiver()
+
+    first = gui_side.encode_func(receiver.callback, register=True)
+    second = gui_side.encode_func(receiver.callback, register=True)
+    assert first == second
+
+    # The child passes the callback handle back as is
+    child_side._call(first, 'func', 0, None)
+    assert len(gui_side.handles) == 1
+    child_side._call(second, 'func', 0, None)
+    assert len(gui_side.handles) == 0
+    assert receiver.received == [('func', 0, None)] * 2
+
+
+def test_ipc_bytes_are_counted(proxies):
+    gui_side, child_side = proxies
+    data = np.zeros(1000, 'uint8')
+
+    assert child_side._call(total, data) == 0
+    assert child_side.ipc_bytes == data.nbytes
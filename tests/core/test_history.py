@@ -0,0 +1,56 @@
+from gdesk.core.history import History
+
+
+def timing(cmd, wall):
+    return {'cmd': cmd, 'wall': wall, 'cpu': wall / 2, 'peak_rss': 0, 'ipc_bytes': 0, 'error_code': 0}
+
+
+def test_timing_of_recurring_command():
+    history = History(None)
+    history.logtiming(timing('process_day(1)', 1.0))
+    history.logtiming(timing('print(1)', 0.1))
+    history.logtiming(timing('process_day(2)', 2.0))
+
+    rows = history.timing('process_day%')
+    assert [row[1] for row in rows] == ['process_day(1)', 'process_day(2)']
+    assert [row[2] for row in rows] == [1.0, 2.0]
+
+    assert history.timing('process_day%', count=1)[0][1] == 'process_day(2)'
+
+
+def test_retrieve_distinct_commands_from_file(tmp_path):
+    history = History(tmp_path)
+    assert history.writer is not None
+
+    for cmd in ['a = 1', 'print(a)', 'a = 2', 'print(a)', 'plot_all(a)']:
+        history.logcmd(cmd)
+    history.logcmd('y', 'input')
+
+    cmdid, cmd = history.retrievecmd()
+    assert cmd == 'plot_all(a)'
+    cmdid, cmd = history.retrievecmd('', cmdid)
+    assert cmd == 'print(a)'
+    cmdid, cmd = history.retrievecmd('', cmdid)
+    assert cmd == 'a = 2'
+    assert history.retrievecmd('', cmdid)[1] == 'a = 1'
+
+    assert history.retrievecmd('pri')[1] == 'print(a)'
+    assert history.retrievecmd('ALL', prefix=False)[1] == 'plot_all(a)'
+    assert [row[1] for row in history.tail(10, 'a', distinct=True, prefix=False)] == ['a = 1', 'a = 2', 'print(a)', 'plot_all(a)']
+    assert history.retrievecmd(logtype='input')[1] == 'y'
+
+    history.close()
+
+
+def test_compact_keeps_the_last_entries(tmp_path):
+    history = History(tmp_path)
+    for i in range(10):
+        history.logcmd(f'x = {i}')
+        history.storepath(f'image_{i}.png')
+    history.storepath('image_9.png')
+
+    history.compact(keep_commands=3, keep_paths=2)
+    assert history.item_count() == 3
+    assert [row[2] for row in history.yield_recent_paths()] == ['image_9.png', 'image_8.png']
+    assert history.retrievecmd('x', prefix=False)[1] == 'x = 9'
+    history.close()
@@ -0,0 +1,78 @@
+import sys
+import threading
+import time
+import traceback
+import types
+
+import pytest
+
+from gdesk.core.interpreter import SyncBreaker, SyncBreaked
+
+
+def test_sync_breaker_stops_a_running_loop():
+    result = dict()
+    started = threading.Event()
+
+    def work():
+        count = 0
+        started.set()
+        try:
+            while True:
+                count += 1
+        except SyncBreaked:
+            result['count'] = count
+
+    thread = threading.Thread(target=work, daemon=True)
+    thread.start()
+    started.wait()
+    time.sleep(0.05)
+
+    command = types.SimpleNamespace(thread_id=thread.ident, breakable=True, break_sent=False)
+    try:
+        SyncBreaker.request(command)
+        thread.join(5)
+    finally:
+        SyncBreaker.cancel(thread.ident)
+
+    assert not thread.is_alive()
+    assert result['count'] > 0
+
+
+@pytest.mark.skipif(not hasattr(sys, 'monitoring'), reason='sys.monitoring needs Python 3.12')
+def test_sync_break_does_not_interrupt_the_cleanup():
+    result = dict()
+    started = threading.Event()
+
+    def work():
+        started.set()
+        try:
+            try:
+                while True:
+                    pass
+            finally:
+                cleanup = []
+                for i in range(100):
+                    cleanup.append(i)
+                result['cleanup'] = len(cleanup)
+        except SyncBreaked:
+            result['breaked'] = True
+            result['traceback'] = traceback.format_exc()
+
+    thread = threading.Thread(target=work, daemon=True)
+    thread.start()
+    started.wait()
+    time.sleep(0.05)
+
+    command = types.SimpleNamespace(thread_id=thread.ident, breakable=True, break_sent=False)
+    try:
+        SyncBreaker.request(command)
+        thread.join(5)
+    finally:
+        SyncBreaker.cancel(thread.ident)
+
+    assert not thread.is_alive()
+    assert result['cleanup'] == 100
+    assert result['breaked']
+    assert 'SyncBreaked' in result['traceback']
+    assert not SyncBreaker.pending
+    assert sys.monitoring.get_events(SyncBreaker.tool_id) == 0
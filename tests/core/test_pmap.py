@@ -0,0 +1,91 @@
+import types
+import threading
+
+import pytest
+
+from gdesk import config, configure
+from gdesk.core.pmap import PoolMap, encode_func
+
+
+@pytest.fixture
+def configured():
+    if not 'console' in config:
+        configure(matplotlib={'backend': 'svg'})
+
+
+def square(x, offset=0):
+    return x * x + offset
+
+
+def test_live_script_function_is_send_by_name():
+    module = types.ModuleType('not_imported_live_script')
+    exec('def func(x): return x', module.__dict__)
+    assert encode_func(module.func) == ('live', 'not_imported_live_script', 'func')
+
+
+def test_results_are_ordered(configured):
+    progress = []
+    results = list(PoolMap(square, range(12), workers=2, kwargs={'offset': 1},
+        progress=lambda done, count: progress.append((done, count))))
+
+    assert results == [x * x + 1 for x in range(12)]
+    assert progress[-1] == (12, 12)
+
+
+def test_standby_processes_start_on_the_gui_thread(configured, monkeypatch):
+    QtWidgets = pytest.importorskip('qtpy.QtWidgets')
+    from gdesk.core import tasks
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    started = []
+
+    class FakeStandby(object):
+        def __init__(self, config_files):
+            started.append(threading.current_thread())
+
+        def stop(self):
+            pass
+
+    class FakeGui(object):
+        def valid(self):
+            return True
+
+        def is_main(self):
+            return True
+
+    monkeypatch.setattr(tasks, 'StandbyProcess', FakeStandby)
+    monkeypatch.setattr(tasks, 'gui', FakeGui())
+    pool = tasks.ProcessPool()
+    pool.start(2)
+    assert started == []
+
+    for i in range(3):
+        app.processEvents()
+    assert started == [threading.main_thread()] * 2
+    pool.stop()
+
+
+def test_missing_workers_start_on_the_gui_thread(configured, monkeypatch):
+    from gdesk.core import tasks
+
+    calls = []
+
+    class FakeGui(object):
+        _qapp = object()
+
+        def valid(self):
+            return True
+
+        def is_main(self):
+            return False
+
+        def gui_call(self, func, *args):
+            calls.append(func)
+            return func(*args)
+
+    monkeypatch.setattr(tasks, 'StandbyProcess', lambda config_files: 'standby')
+    monkeypatch.setattr(tasks, 'gui', FakeGui())
+    pool = tasks.ProcessPool()
+
+    assert pool.claim_or_start() == 'standby'
+    assert calls == [tasks.start_standby_process]
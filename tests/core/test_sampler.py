@@ -0,0 +1,32 @@
+import threading
+import time
+
+from gdesk.core.sampler import StackSampler, call_tree, hot_spots
+
+
+def busy(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_stack_sampler_finds_the_busy_function():
+    stop = threading.Event()
+    thread = threading.Thread(target=busy, args=(stop,), daemon=True)
+    thread.start()
+
+    sampler = StackSampler(thread.ident, interval=0.001)
+    sampler.start()
+    time.sleep(0.2)
+    profile = sampler.stop()
+    stop.set()
+    thread.join()
+
+    assert profile['samples'] > 0
+    spots = hot_spots(profile)
+    busy_key = next(key for key in spots if key[1] == 'busy')
+    own, total = spots[busy_key]
+    assert total == profile['samples']
+
+    root = call_tree(profile)
+    assert root.total == profile['samples']
+    assert sum(node.total for node in root.children.values()) == root.total
@@ -0,0 +1,45 @@
+import queue
+
+from gdesk.core.stdinout import StreamRing, FlushPipeStream
+
+
+def test_stream_ring_coalesces_chunks_of_the_same_mode():
+    ring = StreamRing()
+    ring.put('ansi', 'a\n')
+    ring.put('ansi', 'b\n')
+    ring.put('raw', 'c\n')
+    ring.put('ansi', 'd\n')
+
+    assert ring.take() == [('ansi', 'a\nb\n'), ('raw', 'c\n'), ('ansi', 'd\n')]
+    assert len(ring) == 0
+
+
+def test_stream_ring_take_respects_the_budget():
+    ring = StreamRing()
+    for i in range(10):
+        ring.put('ansi', f'{i}\n')
+
+    assert ring.take(4) == [('ansi', '0\n1\n')]
+    assert len(ring) == 16
+
+
+def test_stream_ring_drops_and_summarizes_the_oldest_lines():
+    ring = StreamRing(max_size=10)
+    for i in range(10):
+        ring.put('ansi', f'{i}\n')
+
+    [(mode, text)] = ring.take()
+    assert '5 lines (10 characters) dropped' in text
+    assert text.endswith('5\n6\n7\n8\n9\n')
+
+
+def test_flush_pushes_right_away():
+    streamqueue = queue.Queue()
+    stream = FlushPipeStream(streamqueue, lambda: None)
+    #A slow reducer, only the explicit flush can push in time
+    stream.flusher.interval = 0.5
+    stream.ansi('last words\n')
+    stream.flush()
+
+    assert streamqueue.get_nowait() == ('ansi', 'last words\n')
+    stream.close()
@@ -0,0 +1,26 @@
+import numpy as np
+
+from gdesk.graphics.lod import decimate_minmax
+
+
+def test_envelope_keeps_extremes_per_column():
+    pos = np.arange(100000, dtype='f8')
+    val = np.sin(pos / 1000)
+    val[51234] = 5
+
+    dec_pos, dec_val = decimate_minmax(pos, val, 0, 99999, 500)
+    assert len(dec_pos) <= 4 * 500
+    assert dec_val.max() == 5
+    assert dec_val.min() == val.min()
+    assert np.all(np.diff(dec_pos) >= 0)
+
+
+def test_range_keeps_curve_ends():
+    pos = np.arange(100000, dtype='f8')
+    val = pos % 7
+
+    dec_pos, dec_val = decimate_minmax(pos, val, 40000, 41000, 100)
+    assert (dec_pos[0], dec_pos[-1]) == (0, 99999)
+    assert dec_pos[1] == 39999
+    assert dec_pos[-2] == 41001
+    assert len(dec_pos) <= 4 * 100 + 2
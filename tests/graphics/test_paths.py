@@ -0,0 +1,28 @@
+import numpy as np
+
+from gdesk.graphics import functions
+from gdesk.graphics.functions import arrayToQPath, stepVertices, stepsToQPath
+
+
+def path_points(path):
+    return np.array([(path.elementAt(i).x, path.elementAt(i).y) for i in range(path.elementCount())])
+
+
+def test_step_vertices():
+    x, y = stepVertices(np.array([0, 2, 4]), np.array([5, 6, 7]), 2)
+    assert x.tolist() == [0, 2, 2, 4, 4, 6]
+    assert y.tolist() == [5, 5, 6, 6, 7, 7]
+
+
+def test_steps_path_equals_vertex_path(monkeypatch):
+    starts = np.arange(-10, 10, 0.5)
+    values = np.random.default_rng(0).random(len(starts))
+    x, y = stepVertices(starts, values, 0.5)
+
+    expected = path_points(arrayToQPath(np.r_[x[:1], x, x[-1:]], np.r_[0, y, 0]))
+    assert np.array_equal(path_points(stepsToQPath(starts, values, 0.5)), expected)
+    assert np.array_equal(path_points(stepsToQPath(starts, values, 0.5, zero_ends=False)), expected[1:-1])
+
+    #Binding without access to the QPolygonF memory
+    monkeypatch.setattr(functions, 'polygonBuffer', lambda n: None)
+    assert np.array_equal(path_points(stepsToQPath(starts, values, 0.5)), expected)
@@ -0,0 +1,51 @@
+from gdesk.live.codecache import CodeCache
+
+
+def test_cached_code_is_reused_until_the_source_changes(tmp_path):
+    cache = CodeCache(tmp_path / 'cache')
+    path = tmp_path / 'script.py'
+    source = b'value = 1\n'
+
+    first = cache.compile(source, path, 1.0, len(source))
+    second = cache.compile(source, path, 1.0, len(source))
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert second.co_filename == str(path)
+
+    namespace = dict()
+    exec(second, namespace)
+    assert namespace['value'] == 1
+
+    source = b'value = 2\n'
+    cache.compile(source, path, 1.0, len(source))
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert len(cache.entries()) == 1
+
+
+def test_cache_size_is_bounded(tmp_path):
+    cache = CodeCache(tmp_path / 'cache', max_bytes=2000)
+    for i in range(50):
+        source = f'value = {i}\n'.encode()
+        cache.compile(source, tmp_path / f'script{i}.py', 1.0, len(source))
+    assert sum(entry.stat().st_size for entry in cache.entries()) <= 2000
+
+
+def test_cache_is_scanned_only_to_trim(tmp_path, monkeypatch):
+    cache = CodeCache(tmp_path / 'cache', max_bytes=2000)
+    scans = []
+    entries = cache.entries
+    monkeypatch.setattr(cache, 'entries', lambda: scans.append(1) or entries())
+
+    sources = [f'value = {i}\n'.encode() for i in range(50)]
+    for i, source in enumerate(sources):
+        cache.compile(source, tmp_path / f'script{i}.py', 1.0, len(source))
+    assert 1 < len(scans) < 25
+    assert cache.total_bytes == sum(entry.stat().st_size for entry in entries())
+
+    # A hit makes the entry the most recently used
+    survivor = tmp_path / 'script40.py'
+    for i in range(41, 50):
+        cache.compile(sources[40], survivor, 1.0, len(sources[40]))
+        cache.compile(sources[i], tmp_path / f'other{i}.py', 1.0, len(sources[i]))
+    hits = cache.hits
+    cache.compile(sources[40], survivor, 1.0, len(sources[40]))
+    assert cache.hits == hits + 1
@@ -1,3 +1,5 @@
+import weakref
+
 import pytest
 
 from gdesk.live.completer import Completer
@@ -111,3 +113,64 @@ def test_completer_on_object_with_custom_dir_and_hidden_class_level_attributes_r
 def test_completer_with_double_underscore_on_hidden_class_level_attributes_also_offers_dunder_class(completer):
     completed_attributes = _get_all_completions(completer, "with_dir_and_hide_class._")
     assert "with_dir_and_hide_class.__class__(" in completed_attributes
+
+
+class CountingDir:
+
+    def __init__(self):
+        self.dir_calls = 0
+        self.alpha = 1
+        self.alphabet = 2
+        self.beta = 3
+
+    def __dir__(self):
+        self.dir_calls += 1
+        return [name for name in self.__dict__ if name != 'dir_calls']
+
+
+def test_completer_caches_attributes_per_namespace_version():
+    obj = CountingDir()
+    completer = Completer(namespace={'obj': obj})
+    completer.namespace_version = 1
+
+    assert completer.completions('obj.al') == ['obj.alpha', 'obj.alphabet']
+    assert completer.completions('obj.b') == ['obj.beta']
+    assert obj.dir_calls == 1
+
+    completer.namespace_version = 2
+    completer.completions('obj.b')
+    assert obj.dir_calls == 2
+
+
+def test_completer_cache_releases_objects():
+    namespace = {'obj': CountingDir()}
+    ref = weakref.ref(namespace['obj'])
+    completer = Completer(namespace=namespace)
+    completer.namespace_version = 1
+    completer.completions('obj.al')
+
+    del namespace['obj']
+    completer.clear_cache()
+    assert ref() is None
+
+
+def test_completer_narrows_previous_completions():
+    obj = CountingDir()
+    completer = Completer(namespace={'obj': obj})
+    completer.namespace_version = 1
+
+    completer.completions('obj.a')
+    obj.alphanumeric = 4
+    # Narrowed from the previous completions, the namespace did not change
+    assert completer.completions('obj.alph') == ['obj.alpha', 'obj.alphabet']
+
+    completer.namespace_version = 2
+    assert completer.completions('obj.alph') == ['obj.alpha', 'obj.alphabet', 'obj.alphanumeric']
+
+
+def test_completer_wild_ranks_fuzzy_matches():
+    namespace = {'xbeta_sum': 1, 'beta': 2, 'be_ta': 3, 'Beta_max': 4}
+    completer = Completer(namespace=namespace)
+
+    matches = completer.completions('beta', wild=True)
+    assert matches[:4] == ['beta', 'Beta_max', 'xbeta_sum', 'be_ta']
@@ -0,0 +1,65 @@
+import os
+import sqlite3
+
+from gdesk.live.index import ScriptIndex
+from gdesk.live.manage import LiveScriptManager
+
+
+def test_index_updates_only_modified_scripts(tmp_path):
+    (tmp_path / 'pkg').mkdir()
+    (tmp_path / 'first.py').write_text('def find_me():\n    return "needle"\n')
+    (tmp_path / 'pkg' / 'second.py').write_text('class FindMe:\n    pass\n')
+
+    index = ScriptIndex()
+    assert index.update([tmp_path]) == 2
+    assert index.update([tmp_path]) == 0
+
+    names = [(name, kind) for path, name, kind, lineno in index.definitions('find')]
+    assert sorted(names) == [('FindMe', 'class'), ('find_me', 'function')]
+    assert [os.path.basename(path) for path, body in index.content('needle')] == ['first.py']
+
+    path = tmp_path / 'first.py'
+    path.write_text('def renamed():\n    return "other"\n')
+    mtime = os.path.getmtime(path) + 1
+    os.utime(path, (mtime, mtime))
+    (tmp_path / 'pkg' / 'second.py').unlink()
+
+    assert index.update([tmp_path]) == 1
+    assert index.definitions('find') == []
+    assert index.content('needle') == []
+
+
+def test_old_index_is_rebuilt(tmp_path):
+    db_path = tmp_path / 'index.db'
+    server = sqlite3.connect(str(db_path))
+    server.execute('CREATE TABLE FILES (PATH TEXT PRIMARY KEY, ROOT TEXT, RELPATH TEXT, MTIME REAL, SIZE INTEGER)')
+    server.execute("INSERT INTO FILES VALUES ('gone.py', 'root', 'gone.py', 0, 0)")
+    server.commit()
+    server.close()
+
+    (tmp_path / 'scripts').mkdir()
+    (tmp_path / 'scripts' / 'first.py').write_text('needle = 1\n')
+
+    index = ScriptIndex(db_path)
+    assert index.update([tmp_path / 'scripts']) == 1
+    assert [os.path.basename(path) for path, root, relpath in index.files([tmp_path / 'scripts'])] == ['first.py']
+    assert len(index.content('needle')) == 1
+
+
+def test_index_is_walked_once_per_interval(tmp_path, monkeypatch):
+    manager = LiveScriptManager()
+    manager.append_path(tmp_path)
+    manager._index = ScriptIndex()
+    manager.index_interval = 60
+    walks = []
+    update = manager.index.update
+    monkeypatch.setattr(manager.index, 'update', lambda roots: walks.append(roots) or update(roots))
+
+    (tmp_path / 'first.py').write_text('value = 1\n')
+    assert len(manager.indexed_scripts()) == 1
+    (tmp_path / 'second.py').write_text('value = 2\n')
+    assert len(manager.indexed_scripts()) == 1
+    assert len(walks) == 1
+
+    manager.update_index(force=True)
+    assert len(manager.indexed_scripts()) == 2
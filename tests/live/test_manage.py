@@ -0,0 +1,154 @@
+import os
+import sys
+import time
+
+import pytest
+
+from gdesk.live.manage import LiveScriptManager, LiveScriptScan
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.02)
+    return condition()
+
+
+@pytest.mark.parametrize('method', ['inotify', 'poll'])
+def test_only_changed_scripts_are_checked(tmp_path, method):
+    for name in ['first', 'second']:
+        (tmp_path / f'{name}.py').write_text('value = 1\n')
+
+    manager = LiveScriptManager()
+    manager.append_path(tmp_path)
+    manager.watch_method = method
+    manager.watch_interval = 0.05
+    use = LiveScriptScan(manager)
+
+    try:
+        assert use.first.value == use.second.value == 1
+        manager.mark_for_update()
+        manager.mark_for_update()
+        first, second = manager.modules['first'], manager.modules['second']
+        assert use.first.value == use.second.value == 1
+        checks = second.check_count
+
+        path = tmp_path / 'first.py'
+        path.write_text('value = 2\n')
+        mtime = os.path.getmtime(path) + 1
+        os.utime(path, (mtime, mtime))
+
+        assert wait_for(lambda: manager.watcher.changed)
+        manager.mark_for_update()
+        assert use.first.value == 2
+        assert use.second.value == 1
+        assert second.check_count == checks
+        assert manager.reload_stats()['first']['loads'] == 2
+
+    finally:
+        manager.stop_watch()
+
+
+def test_network_paths_are_polled(tmp_path, monkeypatch):
+    watch = pytest.importorskip('gdesk.live.watch')
+    if not sys.platform.startswith('linux'):
+        pytest.skip('inotify only on Linux')
+    monkeypatch.setattr(watch.InotifyWatcher, 'fs_type', lambda self, path: 'nfs')
+    (tmp_path / 'remote.py').write_text('value = 1\n')
+
+    manager = LiveScriptManager()
+    manager.append_path(tmp_path)
+    manager.watch_method = 'inotify'
+    manager.watch_interval = 0.05
+    use = LiveScriptScan(manager)
+
+    try:
+        assert use.remote.value == 1
+        manager.mark_for_update()
+        assert isinstance(manager.watcher, watch.InotifyWatcher)
+        assert not manager.watcher.dirs
+
+        touch(tmp_path / 'remote.py', 'value = 2\n')
+        assert wait_for(lambda: manager.watcher.changed)
+        manager.mark_for_update()
+        assert use.remote.value == 2
+
+    finally:
+        manager.stop_watch()
+
+
+def test_symlinked_directories_are_watched(tmp_path):
+    if not sys.platform.startswith('linux'):
+        pytest.skip('inotify only on Linux')
+    live, elsewhere = tmp_path / 'live', tmp_path / 'elsewhere'
+    live.mkdir()
+    elsewhere.mkdir()
+    (elsewhere / 'linked_script.py').write_text('value = 1\n')
+    (live / 'linked').symlink_to(elsewhere)
+    # A loop back to the live path is walked once
+    (elsewhere / 'loop').symlink_to(live)
+
+    manager = LiveScriptManager()
+    manager.append_path(live)
+    manager.watch_method = 'inotify'
+    manager.watch_interval = 0.05
+    use = LiveScriptScan(manager)
+
+    try:
+        assert use.linked.linked_script.value == 1
+        manager.mark_for_update()
+        assert sorted(manager.watcher.dirs.values()) == [str(live), str(live / 'linked')]
+
+        touch(elsewhere / 'linked_script.py', 'value = 2\n')
+        assert wait_for(lambda: manager.watcher.changed)
+        manager.mark_for_update()
+        assert use.linked.linked_script.value == 2
+
+    finally:
+        manager.stop_watch()
+
+
+def touch(path, text):
+    path.write_text(text)
+    mtime = os.path.getmtime(path) + 1
+    os.utime(path, (mtime, mtime))
+
+
+def test_dependents_are_reloaded_in_order(tmp_path):
+    from gdesk.live import manager, use
+
+    (tmp_path / 'dep_base.py').write_text('VALUE = 1\n')
+    (tmp_path / 'dep_user.py').write_text('from gdesk.live import using\nVALUE = using.dep_base.VALUE * 10\n')
+    (tmp_path / 'dep_other.py').write_text('VALUE = 5\n')
+
+    watch_method = manager.watch_method
+    manager.watch_method = 'off'
+    manager.append_path(tmp_path)
+
+    try:
+        assert use.dep_user.VALUE == 10
+        assert use.dep_other.VALUE == 5
+        assert manager.dependencies['dep_user'] == {'dep_base'}
+
+        touch(tmp_path / 'dep_base.py', 'VALUE = 2\n')
+        assert list(manager.update_now()) == ['dep_base', 'dep_user']
+        assert use.dep_user.VALUE == 20
+
+        # Lazy update, only the using module is accessed
+        touch(tmp_path / 'dep_base.py', 'VALUE = 3\n')
+        manager.mark_for_update()
+        assert use.dep_user.VALUE == 30
+
+        # The dependency is dropped when it is not used anymore
+        touch(tmp_path / 'dep_user.py', 'VALUE = 7\n')
+        assert list(manager.update_now()) == ['dep_user']
+        assert 'dep_base' not in manager.dependencies.get('dep_user', ())
+        touch(tmp_path / 'dep_base.py', 'VALUE = 4\n')
+        assert list(manager.update_now()) == ['dep_base']
+
+    finally:
+        manager.watch_method = watch_method
+        manager.path.remove(str(tmp_path.resolve()))
+        for name in ['dep_base', 'dep_user', 'dep_other']:
+            manager.modules.pop(name, None)
+            manager.dependencies.pop(name, None)
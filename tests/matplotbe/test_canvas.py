@@ -0,0 +1,22 @@
+import numpy as np
+import pytest
+from matplotlib import cbook
+
+#The gdesk backend needs the Qt bindings of matplotlib
+pytest.importorskip('qtpy')
+pytest.importorskip('matplotlib.backends.backend_qt5')
+
+from gdesk.matplotbe import unmultiplied_rgba8888_to_premultiplied_argb32
+
+
+def test_conversion_reuses_storage():
+    rgba = np.random.default_rng(0).integers(0, 256, (30, 40, 4), dtype=np.uint8)
+
+    argb, storage = unmultiplied_rgba8888_to_premultiplied_argb32(rgba)
+    assert np.array_equal(argb, cbook._unmultiplied_rgba8888_to_premultiplied_argb32(rgba))
+
+    region = rgba[5:15, 10:30].copy()
+    argb, reused = unmultiplied_rgba8888_to_premultiplied_argb32(region, storage)
+    assert reused is storage
+    assert argb.flags.c_contiguous
+    assert np.array_equal(argb, cbook._unmultiplied_rgba8888_to_premultiplied_argb32(region))
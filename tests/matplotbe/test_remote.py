@@ -0,0 +1,71 @@
+import pickle
+
+import numpy as np
+import pytest
+from matplotlib.figure import Figure
+
+#The gdesk backend needs the Qt bindings of matplotlib
+pytest.importorskip('qtpy')
+pytest.importorskip('matplotlib.backends.backend_qt5')
+
+from gdesk.matplotbe.remote import collect_updates, apply_updates, mark_sent, figure_signature
+
+
+def make_figure():
+    figure = Figure()
+    ax = figure.add_subplot()
+    ax.plot(np.arange(10), np.zeros(10), label='line')
+    ax.scatter([0, 1], [0, 1], c=[0.0, 1.0])
+    ax.imshow(np.zeros((4, 4)))
+    return figure
+
+
+def test_updates_applied_to_copy():
+    child = make_figure()
+    state = dict()
+    mark_sent(child, state)
+    gui_side = pickle.loads(pickle.dumps(child))
+    signature = figure_signature(child)
+
+    assert collect_updates(child, state) == []
+
+    ax = child.axes[0]
+    ax.lines[0].set_ydata(np.arange(10.0))
+    ax.collections[0].set_array(np.array([2.0, 3.0]))
+    ax.images[0].set_data(np.ones((4, 4)))
+    ax.set_ylim(-1, 20)
+
+    updates = collect_updates(child, state)
+    assert sorted(update[1] for update in updates) == ['collection', 'image', 'limits', 'line']
+    assert figure_signature(child) == signature
+    apply_updates(gui_side, updates)
+
+    ax = gui_side.axes[0]
+    assert ax.lines[0].get_ydata().tolist() == list(range(10))
+    assert ax.collections[0].get_array().tolist() == [2.0, 3.0]
+    assert ax.images[0].get_array().tolist() == np.ones((4, 4)).tolist()
+    assert ax.get_ylim() == (-1, 20)
+
+    assert collect_updates(child, state) == []
+
+
+def test_style_change_changes_signature():
+    figure = make_figure()
+    signature = figure_signature(figure)
+    figure.axes[0].lines[0].set_color('red')
+    assert figure_signature(figure) != signature
+
+
+@pytest.mark.parametrize('change', [
+    lambda ax: ax.bar([0, 1], [1, 2]),
+    lambda ax: ax.hist(np.arange(10.0)),
+    lambda ax: ax.grid(True),
+    lambda ax: ax.set_facecolor('red'),
+    lambda ax: ax.set_xticks([0, 5]),
+])
+def test_other_artists_change_signature(change):
+    figure = make_figure()
+    mark_sent(figure, dict())
+    signature = figure_signature(figure)
+    change(figure.axes[0])
+    assert figure_signature(figure) != signature
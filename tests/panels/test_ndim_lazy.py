@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from gdesk.panels.ndim.lazy import LazyArray, as_ndim_data
+
+
+class CountingSource(object):
+    """Array like source counting its reads"""
+
+    def __init__(self, array):
+        self.array = array
+        self.shape = array.shape
+        self.dtype = array.dtype
+        self.reads = []
+
+    def __getitem__(self, index):
+        self.reads.append(index)
+        return self.array[index]
+
+
+def test_cache_and_read_ahead():
+    source = CountingSource(np.arange(6 * 4 * 5).reshape(6, 4, 5))
+    lazy = LazyArray(source, cache_size=source.array.nbytes)
+
+    index = (slice(1, 2), slice(None), slice(None))
+    assert np.array_equal(lazy[index], source.array[index])
+    assert np.array_equal(lazy[index], source.array[index])
+    assert len(source.reads) == 1
+
+    lazy.read_ahead(index, 0)
+    lazy.executor.shutdown(wait=True)
+    assert len(source.reads) == 5
+
+    assert np.array_equal(lazy[(slice(5, 6), slice(None), slice(None))], source.array[5:6])
+    assert len(source.reads) == 5
+
+
+def test_cache_size_is_limited():
+    source = CountingSource(np.zeros((10, 8, 8)))
+    lazy = LazyArray(source, cache_size=3 * 8 * 8 * 8)
+
+    for i in range(10):
+        lazy[i]
+
+    assert lazy.cached_bytes == 3 * 8 * 8 * 8
+    assert list(lazy.cache.keys()) == [(7,), (8,), (9,)]
+
+
+def test_memory_arrays_are_not_wrapped(tmp_path):
+    array = np.ones((3, 4, 5))
+    assert as_ndim_data(array) is array
+
+    memmap = np.lib.format.open_memmap(tmp_path / 'data.npy', 'w+', np.float64, (3, 4, 5))
+    assert type(as_ndim_data(memmap)) is np.ndarray
+
+
+def test_colour_cube_is_saved_plane_by_plane(tmp_path):
+    h5py = pytest.importorskip('h5py')
+    from gdesk.panels.ndim.hdf5 import save_ndim_to_hdf5
+
+    source = CountingSource(np.arange(2 * 3 * 4 * 5 * 3, dtype=np.uint16).reshape(2, 3, 4, 5, 3))
+    lazy = LazyArray(source)
+    save_ndim_to_hdf5(tmp_path / 'cube.h5', lazy)
+
+    assert len(source.reads) == 6
+    assert lazy.cached_bytes == 0
+    with h5py.File(tmp_path / 'cube.h5') as file:
+        assert np.array_equal(file['gdesk_ndim_data'][:], source.array)
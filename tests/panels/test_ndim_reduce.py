@@ -0,0 +1,50 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from gdesk.panels.ndim.reduce import Reduction
+
+CALCS = dict(mean=np.mean, min=np.min, max=np.max, std=np.std, var=np.var, median=np.median)
+
+
+@pytest.mark.parametrize('name', list(CALCS))
+def test_chunked_equals_direct(name):
+    data = np.random.default_rng(0).normal(size=(7, 50, 6, 5)).astype(np.float32)
+    indexes = (slice(2, 3), slice(None), slice(None), slice(None))
+    calcs = {1: (name, CALCS[name])}
+
+    with ThreadPoolExecutor(4) as executor:
+        #About 3 planes per chunk
+        reduction = Reduction(data, indexes, calcs, (2, 3), executor, chunk_bytes=3 * 6 * 5 * 4)
+    assert reduction.done
+
+    expected = CALCS[name](data[2], axis=0)
+    assert reduction.result().dtype == expected.dtype
+    assert np.allclose(reduction.result(), expected, rtol=1e-5, atol=1e-6)
+
+
+def test_two_reduced_dims():
+    data = np.random.default_rng(1).integers(0, 100, (10, 4, 6, 5))
+    indexes = (slice(None), slice(None), slice(None), slice(None))
+    calcs = {0: ('mean', np.mean), 1: ('max', np.max)}
+
+    with ThreadPoolExecutor(4) as executor:
+        reduction = Reduction(data, indexes, calcs, (2, 3), executor, chunk_bytes=1)
+
+    assert len(reduction.futures) == 10
+    assert np.allclose(reduction.result(), np.mean(np.max(data, axis=1), axis=0))
+
+
+def test_moment_chunks_sized_on_float64():
+    data = np.random.default_rng(2).integers(0, 255, (16, 10, 10), dtype=np.uint8)
+    indexes = (slice(None), slice(None), slice(None))
+
+    with ThreadPoolExecutor(2) as executor:
+        std = Reduction(data, indexes, {0: ('std', np.std)}, (1, 2), executor, chunk_bytes=2 * 10 * 10 * 8)
+        mean = Reduction(data, indexes, {0: ('mean', np.mean)}, (1, 2), executor, chunk_bytes=2 * 10 * 10 * 8)
+
+    assert len(std.futures) == 8
+    assert len(mean.futures) == 1
+    assert np.allclose(std.result(), np.std(data, axis=0))
+    assert np.allclose(mean.result(), np.mean(data, axis=0))
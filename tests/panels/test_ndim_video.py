@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+import imageio.v3 as iio
+
+from gdesk.panels.ndim.lazy import LazyArray, as_ndim_data
+from gdesk.panels.ndim.video import VideoSource, load_video
+
+
+def frames(count):
+    return (np.arange(count)[:, None, None, None] * 6 + np.zeros((count, 32, 48, 3))).astype(np.uint8)
+
+
+def test_gif_frames(tmp_path):
+    filepath = tmp_path / 'frames.gif'
+    iio.imwrite(filepath, frames(10), loop=0)
+
+    source = VideoSource(filepath)
+    assert source.shape == (10, 32, 48, 3)
+    assert source[3].mean() == pytest.approx(18, abs=1)
+    assert source[-1].mean() == pytest.approx(54, abs=1)
+    assert source[2:5, :4].shape == (3, 4, 48, 3)
+
+    lazy = LazyArray(source)
+    assert np.array_equal(lazy[(slice(7, 8),)], source[7:8])
+
+
+def test_mp4_frames(tmp_path):
+    pytest.importorskip('imageio_ffmpeg')
+    filepath = tmp_path / 'frames.mp4'
+    iio.imwrite(filepath, frames(40), fps=10)
+
+    source, name, dim_names, dim_scales = load_video(filepath)
+    assert source.shape == (40, 32, 48, 3)
+    assert dim_names == ['frame', 'row', 'col', 'color']
+    assert dim_scales[0][1][10] == pytest.approx(1.0)
+
+    # Forward, then seeking back
+    assert source[30].mean() == pytest.approx(180, abs=3)
+    assert source[5].mean() == pytest.approx(30, abs=3)
+    source.close()
+
+
+def test_frame_count_of_odd_frame_rate(tmp_path):
+    pytest.importorskip('imageio_ffmpeg')
+    filepath = tmp_path / 'frames.mp4'
+    iio.imwrite(filepath, frames(40), fps=7)
+
+    source = VideoSource(filepath)
+    assert len(source) == 40
+    assert source[39].mean() == pytest.approx(234, abs=3)
+
+    # A too high estimate shrinks at the first read past the end
+    source.shape = (45,) + source.shape[1:]
+    with pytest.raises(IndexError):
+        source[40]
+    assert len(source) == 40
+    source.close()
+
+
+def test_overestimated_frame_count_reads_all_frames(tmp_path, monkeypatch):
+    pytest.importorskip('imageio_ffmpeg')
+    filepath = tmp_path / 'frames.mp4'
+    iio.imwrite(filepath, frames(20), fps=10)
+
+    # Like a container duration which includes a longer audio track
+    count_legacy_frames = VideoSource.count_legacy_frames
+    monkeypatch.setattr(VideoSource, 'count_legacy_frames', lambda self, meta: count_legacy_frames(self, meta) + 1)
+
+    source = VideoSource(filepath)
+    assert len(source) == 21
+    array = as_ndim_data(source)
+    assert array.shape == (20, 32, 48, 3)
+    assert array[19].mean() == pytest.approx(114, abs=3)
+    assert len(source) == 20
+
+
+def test_small_video_is_read_and_closed(tmp_path, monkeypatch):
+    filepath = tmp_path / 'frames.gif'
+    iio.imwrite(filepath, frames(4), loop=0)
+    source = VideoSource(filepath)
+    closed = []
+    monkeypatch.setattr(source, 'close', lambda: closed.append(True))
+
+    array = as_ndim_data(source)
+    assert type(array) is np.ndarray
+    assert array.shape == (4, 32, 48, 3)
+    assert closed
@@ -0,0 +1,28 @@
+from gdesk.utils.ansi_code_processor import AnsiCodeProcessor
+
+RED = (1, None, 0, False, False, False)
+DEFAULT = (None, None, 0, False, False, False)
+
+
+def test_feed_holds_back_an_escape_code_split_over_chunks():
+    processor = AnsiCodeProcessor()
+    first = processor.feed('ok \033[3')
+    second = processor.feed('1mred\033[0m\n')
+
+    assert [(act.text, act.state) for act in first] == [('ok ', DEFAULT)]
+    assert [(act.text, act.state) for act in second] == [('red', RED), ('\n', DEFAULT)]
+
+
+def test_feed_joins_text_of_the_same_state():
+    processor = AnsiCodeProcessor()
+    items = processor.feed('\033[31ma\033[0m\033[31mb\nc\033[0m')
+
+    assert [(act.text, act.state) for act in items] == [('ab\nc', RED)]
+
+
+def test_feed_returns_control_actions_in_order():
+    processor = AnsiCodeProcessor()
+    items = processor.feed(' 10%\r 20%\r\n')
+
+    assert [act.action for act in items] == ['text', 'carriage-return', 'text']
+    assert items[-1].text == ' 20%\n'
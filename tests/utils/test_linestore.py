@@ -0,0 +1,34 @@
+from gdesk.utils.linestore import LineStore
+
+
+def test_line_store_keeps_style_runs_per_line():
+    store = LineStore()
+    red = store.intern(('red',))
+    store.put('error: ', red)
+    store.put('file not found')
+    store.newline()
+    store.write('done\n')
+
+    assert store.fragments(0) == [('error: ', red), ('file not found', 0)]
+    assert store.fragments(1) == [('done', 0)]
+    assert store.text() == 'error: file not found\ndone\n'
+
+
+def test_line_store_carriage_return_overwrites_the_current_line():
+    store = LineStore()
+    store.write('progress 10% done')
+    store.carriage_return()
+    store.write('progress 20%\n')
+
+    assert store.line(0) == 'progress 20% done'
+
+
+def test_line_store_drops_the_oldest_chunks():
+    store = LineStore(max_lines=10, chunk_lines=4)
+    for i in range(30):
+        store.write(f'line {i}\n')
+
+    assert store.first == 16
+    assert store.line(store.first) == 'line 16'
+    assert store.find('line 2') == (20, 0, 6)
+    assert store.find('LINE', backward=True) == (29, 0, 4)
@@ -0,0 +1,25 @@
+import numpy as np
+
+from gdesk.utils.ringbuffer import RingBuffer
+
+
+def test_keeps_last_values_contiguous():
+    ring = RingBuffer(10)
+    values = np.arange(57, dtype='f8')
+
+    for start in range(0, 57, 3):
+        ring.append(values[start:start + 3])
+        view = ring.view()
+        assert view.flags.c_contiguous
+        assert view.tolist() == values[max(start + 3 - 10, 0):start + 3].tolist()
+
+    assert ring.total == 57
+
+
+def test_append_more_than_capacity():
+    ring = RingBuffer(4)
+    ring.append([1, 2])
+    ring.append(np.arange(10))
+    assert ring.view().tolist() == [6, 7, 8, 9]
+    ring.append(5)
+    assert ring.view().tolist() == [7, 8, 9, 5]